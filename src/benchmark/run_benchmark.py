@@ -0,0 +1,318 @@
+"""Benchmark harness for the depth, detection and tracking hot paths"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import cv2
+import numpy as np
+from .synthetic import make_stereo_pair, resize_stereo_pair, make_boxes, jitter_boxes
+from ..config.benchmark_config import BENCHMARK_CONFIG
+from ..config.depth_config import SGBM_CONFIG
+from ..config.model_config import TRACKER_CONFIG
+from ..depth.sgbm_processor import SGBMProcessor
+from ..depth.stereo_depth import StereoDepth
+from ..depth.distance_estimator import DistanceEstimator
+from ..config.camera_config import CAMERA_CONFIG
+from ..tracking.tracker import ObjectTracker
+from ..utils.visualization import create_depth_visualization, FrameRenderer
+
+
+def measure(fn, warmup, iterations):
+    """
+    Time repeated calls of fn.
+
+    Returns:
+        dict with p50/p95/p99/mean latency in milliseconds and frames/sec
+    """
+    for _ in range(warmup):
+        fn()
+    samples = np.empty(iterations, dtype=np.float64)
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+    return summarize(samples)
+
+
+def summarize(samples):
+    """
+    Latency statistics of per-iteration samples in seconds.
+
+    Returns:
+        dict with p50/p95/p99/mean latency in milliseconds and frames/sec
+    """
+    samples = np.asarray(samples, dtype=np.float64) * 1000.0
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    mean = float(samples.mean())
+    return {
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'mean_ms': mean,
+        'fps': 1000.0 / mean if mean > 0 else float('inf'),
+        'iterations': len(samples)
+    }
+
+
+def accumulate_time(obj, names, elapsed):
+    """Wrap the named methods of obj so their run time is added to elapsed[0]"""
+    def wrap(method):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed[0] += time.perf_counter() - start
+        return timed
+    for name in names:
+        setattr(obj, name, wrap(getattr(obj, name)))
+
+
+class BenchmarkRunner:
+    def __init__(self, config=None, recording=None, run_detection=True):
+        """
+        Args:
+            config: benchmark matrix, defaults to BENCHMARK_CONFIG
+            recording: optional recorded container used instead of synthetic pairs
+            run_detection: whether to time YOLODetector.detect
+        """
+        self.config = config or BENCHMARK_CONFIG
+        self.rng = np.random.default_rng(self.config['seed'])
+        self.run_detection = run_detection
+        self.detector = None
+        self.recorded_frame = None
+        if recording is not None:
+            from ..camera.frame_recorder import open_recording
+            records, _ = open_recording(recording)
+            self.recorded_frame = (
+                np.array(records['left'][0]),
+                np.array(records['right'][0]),
+                np.array(records['color'][0])
+            )
+        self.results = []
+        self.budget_failures = []
+
+    def frame_set(self, width, height):
+        if self.recorded_frame is not None:
+            return resize_stereo_pair(*self.recorded_frame, width, height)
+        return make_stereo_pair(width, height, self.config['true_disparity'], self.rng)
+
+    def record(self, name, params, stats):
+        entry = {'name': name, 'params': params}
+        entry.update(stats)
+        self.results.append(entry)
+        print(f"{name:<28} {json.dumps(params):<60} "
+              f"p50 {stats['p50_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms  "
+              f"{stats['fps']:8.1f} fps")
+
+    def timeit(self, fn):
+        return measure(fn, self.config['warmup'], self.config['iterations'])
+
+    def bench_sgbm(self, width, height, left, right):
+        for num_disp in self.config['num_disparities']:
+            for window_size in self.config['window_sizes']:
+                processor = SGBMProcessor(dict(
+                    SGBM_CONFIG,
+                    num_disparities=num_disp,
+                    window_size=window_size
+                ))
+                stats = self.timeit(lambda: processor.compute_depth(left, right))
+                self.record('sgbm.compute_depth', {
+                    'width': width, 'height': height,
+                    'num_disparities': num_disp, 'window_size': window_size
+                }, stats)
+
+    def bench_stereo_depth(self, width, height, left, right):
+        stereo = StereoDepth()
+        stats = self.timeit(lambda: stereo.compute_depth(left, right))
+        self.record('stereo_depth.compute_depth', {'width': width, 'height': height}, stats)
+
+    def bench_visualization(self, width, height, left, right, color):
+        _, disparity_normalized = SGBMProcessor(normalize_output=True).compute_depth(left, right)
+        stats = self.timeit(
+            lambda: create_depth_visualization(disparity_normalized, color, None)
+        )
+        self.record('create_depth_visualization', {'width': width, 'height': height}, stats)
+
+        disparity, _ = SGBMProcessor().compute_depth(left, right)
+        renderer = FrameRenderer(SGBM_CONFIG['min_disparity'], SGBM_CONFIG['num_disparities'])
+
+        def render():
+            renderer.begin(color)
+            renderer.compose(disparity)
+
+        stats = self.timeit(render)
+        self.record('frame_renderer.compose', {'width': width, 'height': height}, stats)
+
+    def bench_tracker(self, width, height, color):
+        for count in self.config['object_counts']:
+            tracker = ObjectTracker(
+                max_disappeared=TRACKER_CONFIG['max_disappeared'],
+                max_distance=TRACKER_CONFIG['max_distance']
+            )
+            state = {'boxes': make_boxes(count, width, height, self.rng)}
+
+            def update():
+                state['boxes'] = jitter_boxes(state['boxes'], width, height, self.rng)
+                tracker.update([tuple(b) for b in state['boxes']])
+
+            stats = self.timeit(update)
+            self.record('tracker.update', {
+                'width': width, 'height': height, 'objects': count
+            }, stats)
+
+            canvas = color.copy()
+            stats = self.timeit(lambda: tracker.draw_tracks(canvas))
+            self.record('tracker.draw_tracks', {
+                'width': width, 'height': height, 'objects': count,
+                'path_length': self.config['warmup'] + self.config['iterations']
+            }, stats)
+
+    def bench_association(self):
+        """
+        大量同時存在物體時的追蹤關聯耗時，並檢查是否符合時間預算
+
+        每次 update 拆成卡爾曼預測與修正（tracker.kalman）與其餘的代價矩陣、
+        指派與狀態更新（tracker.association），各自對照 kalman_budget_ms 與
+        association_budget_ms。association_budget_objects 是支援的最大物體數，
+        一定會測到；不超過此值時設定中指派方式的 p99 超出預算會記錄在
+        budget_failures，main 以非零狀態結束。更多物體的結果只供參考
+        """
+        width, height = 1920, 1080
+        budgets = {
+            'tracker.association': self.config['association_budget_ms'],
+            'tracker.kalman': self.config['kalman_budget_ms'],
+        }
+        budget_objects = self.config['association_budget_objects']
+        warmup, iterations = self.config['warmup'], self.config['iterations']
+        counts = sorted(set(self.config['association_object_counts']) | {budget_objects})
+        for count in counts:
+            for assignment in ('hungarian', 'greedy'):
+                tracker = ObjectTracker(
+                    max_disappeared=TRACKER_CONFIG['max_disappeared'],
+                    max_distance=TRACKER_CONFIG['max_distance'],
+                    assignment=assignment
+                )
+                # 預先產生每幀的檢測框，計時只包含追蹤器本身
+                boxes = make_boxes(count, width, height, self.rng, 10, 40)
+                frames = []
+                for _ in range(warmup + iterations + 1):
+                    boxes = jitter_boxes(boxes, width, height, self.rng)
+                    frames.append([tuple(b) for b in boxes.tolist()])
+                tracker.update(frames[0])
+
+                kalman = [0.0]
+                accumulate_time(tracker, ['_predict'], kalman)
+                accumulate_time(tracker.motion_model, ['update'], kalman)
+                samples = {name: [] for name in budgets}
+                for i, rects in enumerate(frames[1:]):
+                    kalman[0] = 0.0
+                    start = time.perf_counter()
+                    tracker.update(rects)
+                    total = time.perf_counter() - start
+                    if i >= warmup:
+                        samples['tracker.association'].append(total - kalman[0])
+                        samples['tracker.kalman'].append(kalman[0])
+
+                params = {'objects': count, 'assignment': assignment}
+                for name, budget in budgets.items():
+                    stats = summarize(samples[name])
+                    stats['budget_ms'] = budget
+                    stats['within_budget'] = stats['p99_ms'] <= budget
+                    self.record(name, params, stats)
+                    if (not stats['within_budget'] and count <= budget_objects
+                            and assignment == TRACKER_CONFIG['assignment']):
+                        self.budget_failures.append(
+                            dict(params, stage=name, budget_ms=budget, p99_ms=stats['p99_ms'])
+                        )
+
+    def bench_distance(self, width, height, left, right):
+        disparity, _ = SGBMProcessor().compute_depth(left, right)
+        estimator = DistanceEstimator(CAMERA_CONFIG['focal_length_px'], CAMERA_CONFIG['baseline_m'])
+        for count in self.config['object_counts']:
+            boxes = [tuple(b) for b in make_boxes(count, width, height, self.rng)]
+            stats = self.timeit(lambda: estimator.estimate(disparity, boxes))
+            self.record('distance.estimate', {
+                'width': width, 'height': height, 'objects': count
+            }, stats)
+
+    def bench_detection(self, width, height, color):
+        if self.detector is None:
+            try:
+                from ..detection.yolo_detector import YOLODetector
+                self.detector = YOLODetector()
+            except Exception as e:
+                print(f"跳過偵測基準測試: {str(e)}")
+                self.run_detection = False
+                return
+        stats = self.timeit(lambda: self.detector.detect(color))
+        self.record('yolo.detect', {'width': width, 'height': height}, stats)
+
+    def run(self):
+        for width, height in self.config['resolutions']:
+            left, right, color = self.frame_set(width, height)
+            self.bench_sgbm(width, height, left, right)
+            self.bench_stereo_depth(width, height, left, right)
+            self.bench_visualization(width, height, left, right, color)
+            self.bench_tracker(width, height, color)
+            self.bench_distance(width, height, left, right)
+            if self.run_detection:
+                self.bench_detection(width, height, color)
+        self.bench_association()
+        return self.results
+
+    def save(self, output_path):
+        report = {
+            'meta': {
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'platform': platform.platform(),
+                'processor': platform.processor(),
+                'cpu_count': os.cpu_count(),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'opencv': cv2.__version__,
+                'opencv_threads': cv2.getNumThreads(),
+                'source': 'recording' if self.recorded_frame is not None else 'synthetic',
+                'config': self.config
+            },
+            'results': self.results
+        }
+        with open(output_path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='深度、偵測與追蹤效能基準測試')
+    parser.add_argument('--output', type=str, default=BENCHMARK_CONFIG['output_path'],
+                        help='JSON 結果輸出路徑')
+    parser.add_argument('--recording', type=str, default=None,
+                        help='使用錄製容器的第一幀取代合成影像')
+    parser.add_argument('--iterations', type=int, default=None, help='每項測試的迭代次數')
+    parser.add_argument('--skip-detection', action='store_true', help='略過 YOLO 偵測測試')
+    args = parser.parse_args()
+
+    config = dict(BENCHMARK_CONFIG)
+    if args.iterations is not None:
+        config['iterations'] = args.iterations
+
+    runner = BenchmarkRunner(
+        config,
+        recording=args.recording,
+        run_detection=not args.skip_detection
+    )
+    runner.run()
+    runner.save(args.output)
+    print(f"\n結果已儲存至: {args.output}")
+    if runner.budget_failures:
+        for failure in runner.budget_failures:
+            print(f"{failure['stage']} 超出時間預算 {failure['budget_ms']} ms: "
+                  f"{failure['objects']} 物體 ({failure['assignment']}) "
+                  f"p99 {failure['p99_ms']:.2f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""Synthetic inputs for benchmarks"""
+import cv2
+import numpy as np
+
+
+def make_stereo_pair(width, height, disparity, rng):
+    """
+    Build a textured left image and a right image shifted by a constant disparity.
+
+    Returns:
+        (left_ir, right_ir, color_image)
+    """
+    noise = rng.integers(0, 256, size=(height, width + disparity), dtype=np.uint8)
+    texture = cv2.GaussianBlur(noise, (3, 3), 0)
+    left = np.ascontiguousarray(texture[:, :width])
+    right = np.ascontiguousarray(texture[:, disparity:])
+    color = cv2.cvtColor(left, cv2.COLOR_GRAY2BGR)
+    return left, right, color
+
+
+def resize_stereo_pair(left, right, color, width, height):
+    """Scale a recorded frame set to a benchmark resolution"""
+    size = (width, height)
+    return (
+        cv2.resize(left, size, interpolation=cv2.INTER_AREA),
+        cv2.resize(right, size, interpolation=cv2.INTER_AREA),
+        cv2.resize(color, size, interpolation=cv2.INTER_AREA)
+    )
+
+
+def make_boxes(count, width, height, rng, min_size=20, max_size=120):
+    """Random (x1, y1, x2, y2) boxes that fit inside the frame"""
+    sizes = rng.integers(min_size, max_size, size=(count, 2))
+    x1 = rng.integers(0, width - sizes[:, 0])
+    y1 = rng.integers(0, height - sizes[:, 1])
+    return np.stack([x1, y1, x1 + sizes[:, 0], y1 + sizes[:, 1]], axis=1)
+
+
+def jitter_boxes(boxes, width, height, rng, step=4):
+    """Move boxes by a small random offset to emulate object motion between frames"""
+    offsets = rng.integers(-step, step + 1, size=(len(boxes), 2))
+    moved = boxes + np.concatenate([offsets, offsets], axis=1)
+    dx = np.clip(moved[:, 0], 0, None) - moved[:, 0] + \
+        np.clip(moved[:, 2], None, width - 1) - moved[:, 2]
+    dy = np.clip(moved[:, 1], 0, None) - moved[:, 1] + \
+        np.clip(moved[:, 3], None, height - 1) - moved[:, 3]
+    return moved + np.stack([dx, dy, dx, dy], axis=1)
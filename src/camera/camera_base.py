@@ -1,5 +1,6 @@
 """Base camera interface"""
 from abc import ABC, abstractmethod
+from ..config.camera_config import CAMERA_CONFIG
 
 class CameraBase(ABC):
     @abstractmethod
@@ -16,4 +17,22 @@ class CameraBase(ABC):
     
     @abstractmethod
     def is_opened(self):
-        pass
\ No newline at end of file
+        pass
+
+    def get_stereo_calibration(self):
+        """Return (focal_length_px, baseline_m) of the left/right IR pair"""
+        return CAMERA_CONFIG['focal_length_px'], CAMERA_CONFIG['baseline_m']
+
+    def get_intrinsics(self):
+        """Return (fx, fy, cx, cy) of the left IR camera, in pixels"""
+        focal_length_px = CAMERA_CONFIG['focal_length_px']
+        # Without device calibration assume square pixels and a centred principal point
+        return (focal_length_px, focal_length_px,
+                (CAMERA_CONFIG['width'] - 1) / 2.0, (CAMERA_CONFIG['height'] - 1) / 2.0)
+
+    def get_color_projection(self):
+        """
+        Return ((fx, fy, cx, cy), R, t) mapping left IR coordinates into the color camera,
+        or None when the color image is taken as pixel-aligned with the left IR image
+        """
+        return None
@@ -0,0 +1,79 @@
+"""Preallocated frame buffers with explicit ownership"""
+import threading
+import numpy as np
+
+
+class FrameSet(tuple):
+    """
+    (left_ir, right_ir, color_image) tuple backed by pool buffers.
+
+    The holder owns the buffers until release() is called; after that they may
+    be overwritten by a later frame. release() is idempotent, and frames that
+    did not come from a pool release nothing.
+    """
+    owned = True
+
+    def __new__(cls, left_ir, right_ir, color_image, timestamp=None,
+                frame_number=None, pool=None, slot=None):
+        frame_set = super().__new__(cls, (left_ir, right_ir, color_image))
+        frame_set.timestamp = timestamp
+        frame_set.frame_number = frame_number
+        frame_set._pool = pool
+        frame_set._slot = slot
+        return frame_set
+
+    def release(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.release(self._slot)
+
+
+def release_frames(frames):
+    """Release frames returned by any camera; plain tuples are ignored"""
+    release = getattr(frames, 'release', None)
+    if release is not None:
+        release()
+
+
+class FrameBufferPool:
+    """
+    Fixed set of left/right/color buffers reused across frames.
+
+    acquire() hands out a free slot; when every slot is still held, a fresh
+    FrameSet is allocated instead so capture never stalls, and the miss is
+    counted so an undersized pool or a consumer that forgets to release shows
+    up in the stats.
+    """
+    def __init__(self, size, width, height):
+        self.size = size
+        self.width = width
+        self.height = height
+        self.left = np.empty((size, height, width), dtype=np.uint8)
+        self.right = np.empty((size, height, width), dtype=np.uint8)
+        self.color = np.empty((size, height, width, 3), dtype=np.uint8)
+        self._free = list(range(size - 1, -1, -1))
+        self._lock = threading.Lock()
+        self.misses = 0
+
+    def acquire(self, timestamp=None, frame_number=None):
+        with self._lock:
+            slot = self._free.pop() if self._free else None
+            if slot is None:
+                self.misses += 1
+        if slot is None:
+            return FrameSet(
+                np.empty((self.height, self.width), dtype=np.uint8),
+                np.empty((self.height, self.width), dtype=np.uint8),
+                np.empty((self.height, self.width, 3), dtype=np.uint8),
+                timestamp, frame_number
+            )
+        return FrameSet(self.left[slot], self.right[slot], self.color[slot],
+                        timestamp, frame_number, pool=self, slot=slot)
+
+    def release(self, slot):
+        with self._lock:
+            self._free.append(slot)
+
+    def available(self):
+        with self._lock:
+            return len(self._free)
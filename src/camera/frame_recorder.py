@@ -0,0 +1,127 @@
+"""Compact memory-mapped frame container and background recorder"""
+import json
+import queue
+import threading
+from pathlib import Path
+import numpy as np
+from ..utils.exceptions import CameraError
+
+META_FILE = 'meta.json'
+FRAMES_FILE = 'frames.bin'
+FORMAT_VERSION = 1
+
+
+def frame_record_dtype(width, height):
+    """Fixed-size record holding one synchronized left IR / right IR / color set"""
+    return np.dtype([
+        ('timestamp', np.float64),
+        ('left', np.uint8, (height, width)),
+        ('right', np.uint8, (height, width)),
+        ('color', np.uint8, (height, width, 3))
+    ])
+
+
+def open_recording(path):
+    """
+    Open a recorded container read-only as a memory map.
+
+    Returns:
+        (records, meta): structured memmap of frame records and the metadata dict
+    """
+    path = Path(path)
+    try:
+        meta = json.loads((path / META_FILE).read_text())
+        dtype = frame_record_dtype(meta['width'], meta['height'])
+        frames_path = path / FRAMES_FILE
+        count = frames_path.stat().st_size // dtype.itemsize
+        if count == 0:
+            raise CameraError(f"Recording is empty: {path}")
+        records = np.memmap(frames_path, dtype=dtype, mode='r', shape=(count,))
+        return records, meta
+    except CameraError:
+        raise
+    except Exception as e:
+        raise CameraError(f"Failed to open recording {path}: {str(e)}")
+
+
+class FrameRecorder:
+    """
+    Appends frame sets to a container from a background writer thread.
+
+    A write error stops the writer; later frames are counted as dropped and
+    stop() reports the error so a truncated recording is not mistaken for
+    a complete one.
+    """
+    def __init__(self, path, width, height, queue_size=64):
+        self.path = Path(path)
+        self.width = width
+        self.height = height
+        self.dtype = frame_record_dtype(width, height)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._file = None
+        self._error = None
+        self.frames_written = 0
+        self.frames_dropped = 0
+
+    def start(self):
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            (self.path / META_FILE).write_text(json.dumps({
+                'version': FORMAT_VERSION,
+                'width': self.width,
+                'height': self.height
+            }))
+            self._file = open(self.path / FRAMES_FILE, 'wb')
+        except Exception as e:
+            raise CameraError(f"Failed to create recording {self.path}: {str(e)}")
+        self._thread = threading.Thread(target=self._write_loop, name='recorder', daemon=True)
+        self._thread.start()
+
+    def write(self, left_image, right_image, color_image, timestamp):
+        """Copy a frame set into a record and queue it; never blocks the caller"""
+        record = np.empty((), dtype=self.dtype)
+        record['timestamp'] = timestamp
+        record['left'] = left_image
+        record['right'] = right_image
+        record['color'] = color_image
+        if self._error is not None:
+            self.frames_dropped += 1
+            return
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.frames_dropped += 1
+
+    def _write_loop(self):
+        try:
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    break
+                self._file.write(record.tobytes())
+                self.frames_written += 1
+            self._file.flush()
+        except Exception as e:
+            self._error = e
+
+    def stop(self):
+        """Write out the queued frames and close the container; raises CameraError if writing failed"""
+        if self._thread is None:
+            return
+        # A writer that died on an error no longer empties the queue
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self._thread.join()
+        self._thread = None
+        try:
+            self._file.close()
+        except Exception as e:
+            self._error = self._error or e
+        if self._error is not None:
+            raise CameraError(f"Recording {self.path} is incomplete after "
+                              f"{self.frames_written} frames: {str(self._error)}")
@@ -0,0 +1,139 @@
+"""Capture synchronized frame sets from several cameras"""
+import threading
+import time
+from queue import Empty
+from ..config.camera_config import MULTI_CAMERA_CONFIG
+from .frame_buffer_pool import release_frames
+from ..pipeline.frame_pipeline import DropOldestQueue
+from ..utils.exceptions import CameraError
+
+
+class MultiCameraManager:
+    """
+    Runs one capture thread per camera and groups their frames by timestamp.
+
+    Each camera feeds its own bounded drop-oldest queue, so a slow consumer
+    never stalls the devices. get_frame_set() returns one frame per camera
+    whose timestamps all lie within the sync tolerance, discarding frames
+    that are too old to be matched.
+    """
+    def __init__(self, cameras, sync_tolerance_ms=None, queue_size=2):
+        """
+        Args:
+            cameras: list of CameraBase instances, started by start()
+            sync_tolerance_ms: max timestamp spread within one frame set
+            queue_size: per-camera frame queue capacity
+        """
+        if not cameras:
+            raise CameraError("No cameras configured")
+        if sync_tolerance_ms is None:
+            sync_tolerance_ms = MULTI_CAMERA_CONFIG['sync_tolerance_ms']
+        self.cameras = cameras
+        self.tolerance = sync_tolerance_ms / 1000.0
+        self.queues = [
+            DropOldestQueue(queue_size, on_drop=lambda item: release_frames(item[1]))
+            for _ in cameras
+        ]
+        self._pending = [None] * len(cameras)
+        self._stopped = threading.Event()
+        self._error = None
+        self._threads = []
+        self.unmatched_frames = 0
+
+    def __len__(self):
+        return len(self.cameras)
+
+    @property
+    def dropped_frames(self):
+        return sum(q.dropped for q in self.queues) + self.unmatched_frames
+
+    def start(self):
+        for camera in self.cameras:
+            camera.start()
+        for i, camera in enumerate(self.cameras):
+            thread = threading.Thread(
+                target=self._capture, args=(camera, self.queues[i]),
+                name=f'capture-{i}', daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _capture(self, camera, out_queue):
+        while not self._stopped.is_set():
+            try:
+                frames = camera.get_frames()
+            except Exception as e:
+                self._fail(e)
+                return
+            # Prefer the device timestamp; fall back to host arrival time
+            timestamp = getattr(camera, 'last_timestamp', None)
+            if timestamp is None:
+                timestamp = time.time()
+            out_queue.put((timestamp, frames))
+
+    def _fail(self, error):
+        """Record the first capture error and wake up the consumer"""
+        if self._error is None:
+            self._error = error
+        self._stopped.set()
+        for q in self.queues:
+            q.close()
+
+    def _fill_pending(self, deadline):
+        for i, q in enumerate(self.queues):
+            if self._pending[i] is None:
+                self._pending[i] = q.get(timeout=max(deadline - time.monotonic(), 0.0))
+
+    def get_frame_set(self, timeout=None):
+        """
+        Return a list of (left_ir, right_ir, color_image), one per camera,
+        or None if no synchronized set arrived within the timeout.
+        Pooled frames in the set must be released by the caller.
+
+        Re-raises any exception raised by a capture thread.
+        """
+        deadline = time.monotonic() + (timeout if timeout is not None else 1e9)
+        try:
+            while True:
+                if self._error is not None:
+                    raise self._error
+                self._fill_pending(deadline)
+                newest = max(timestamp for timestamp, _ in self._pending)
+                synced = True
+                for i, (timestamp, _) in enumerate(self._pending):
+                    if newest - timestamp > self.tolerance:
+                        # Too old to match the newest frame: wait for the next one
+                        release_frames(self._pending[i][1])
+                        self._pending[i] = None
+                        self.unmatched_frames += 1
+                        synced = False
+                if synced:
+                    frame_set = [frames for _, frames in self._pending]
+                    self._pending = [None] * len(self.cameras)
+                    return frame_set
+        except Empty:
+            if self._error is not None:
+                raise self._error
+            return None
+
+    def get_stereo_calibrations(self):
+        return [camera.get_stereo_calibration() for camera in self.cameras]
+
+    def stop(self):
+        self._stopped.set()
+        for q in self.queues:
+            q.close()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        for i, item in enumerate(self._pending):
+            if item is not None:
+                release_frames(item[1])
+                self._pending[i] = None
+        errors = []
+        for camera in self.cameras:
+            try:
+                camera.stop()
+            except CameraError as e:
+                errors.append(str(e))
+        if errors:
+            raise CameraError("; ".join(errors))
@@ -1,19 +1,59 @@
 """Intel RealSense D435 camera implementation"""
-import pyrealsense2 as rs
 import numpy as np
 from .camera_base import CameraBase
-from ..config.camera_config import CAMERA_CONFIG
+from .frame_recorder import FrameRecorder
+from .frame_buffer_pool import FrameBufferPool
+from ..config.camera_config import CAMERA_CONFIG, RECORD_CONFIG, FRAME_QUEUE_CONFIG
 from ..utils.exceptions import CameraError
 
 class RealSenseCamera(CameraBase):
-    def __init__(self):
+    """
+    D435 stereo IR + color camera.
+
+    In 'wait' capture mode get_frames returns arrays that view librealsense
+    buffers and are only valid until the SDK recycles them. In 'queue' mode
+    frames arrive through an rs.frame_queue and are copied once into a
+    preallocated FrameBufferPool; get_frames then returns a FrameSet the caller
+    owns until it calls release().
+    """
+    def __init__(self, record_path=None, serial=None, capture_mode=None):
+        # Imported lazily so tools that never open a device skip the SDK load
+        import pyrealsense2 as rs
+        self._rs = rs
         self.pipeline = rs.pipeline()
         self.config = rs.config()
+        self.serial = serial
+        self.capture_mode = capture_mode or FRAME_QUEUE_CONFIG['capture_mode']
         self._is_running = False
+        self.last_timestamp = None
+        self.dropped_frames = 0
+        self._last_frame_number = None
+        self.frame_queue = None
+        self.pool = None
+        if self.capture_mode == 'queue':
+            self.frame_queue = rs.frame_queue(FRAME_QUEUE_CONFIG['queue_size'], keep_frames=True)
+            self.pool = FrameBufferPool(
+                FRAME_QUEUE_CONFIG['pool_size'],
+                CAMERA_CONFIG['width'],
+                CAMERA_CONFIG['height']
+            )
+        elif self.capture_mode != 'wait':
+            raise CameraError(f"Unknown capture mode: {self.capture_mode}")
+        self.recorder = None
+        if record_path is not None:
+            self.recorder = FrameRecorder(
+                record_path,
+                CAMERA_CONFIG['width'],
+                CAMERA_CONFIG['height'],
+                queue_size=RECORD_CONFIG['queue_size']
+            )
         self._configure_streams()
         
     def _configure_streams(self):
+        rs = self._rs
         try:
+            if self.serial is not None:
+                self.config.enable_device(self.serial)
             # Configure streams
             self.config.enable_stream(
                 rs.stream.infrared, 1,
@@ -41,17 +81,29 @@ class RealSenseCamera(CameraBase):
         
     def start(self):
         try:
-            self.pipeline.start(self.config)
+            if self.frame_queue is not None:
+                # The SDK pushes every frameset into the queue from its own thread
+                self.pipeline.start(self.config, self.frame_queue)
+            else:
+                self.pipeline.start(self.config)
+            self._last_frame_number = None
             self._is_running = True
         except Exception as e:
             raise CameraError(f"Failed to start RealSense camera: {str(e)}")
+        if self.recorder is not None:
+            self.recorder.start()
         
     def get_frames(self):
         if not self._is_running:
             raise CameraError("Camera is not running")
             
         try:
-            frames = self.pipeline.wait_for_frames()
+            if self.frame_queue is not None:
+                frames = self.frame_queue.wait_for_frame(
+                    FRAME_QUEUE_CONFIG['timeout_ms']
+                ).as_frameset()
+            else:
+                frames = self.pipeline.wait_for_frames()
             left_ir_frame = frames.get_infrared_frame(1)
             right_ir_frame = frames.get_infrared_frame(2)
             color_frame = frames.get_color_frame()
@@ -62,12 +114,85 @@ class RealSenseCamera(CameraBase):
             left_image = np.asanyarray(left_ir_frame.get_data())
             right_image = np.asanyarray(right_ir_frame.get_data())
             color_image = np.asanyarray(color_frame.get_data())
+            self.last_timestamp = frames.get_timestamp() / 1000.0
+            self._count_dropped(frames.get_frame_number())
             
-            return left_image, right_image, color_image
+            result = (left_image, right_image, color_image)
+            if self.pool is not None:
+                # Copy once into buffers the caller owns, so the SDK frame is freed now
+                result = self.pool.acquire(self.last_timestamp, self._last_frame_number)
+                for dst, src in zip(result, (left_image, right_image, color_image)):
+                    np.copyto(dst, src)
+                del frames, left_ir_frame, right_ir_frame, color_frame
+                del left_image, right_image, color_image
+            
+            if self.recorder is not None:
+                self.recorder.write(*result, self.last_timestamp)
+            
+            return result
             
         except Exception as e:
             raise CameraError(f"Error getting frames: {str(e)}")
     
+    def _count_dropped(self, frame_number):
+        """Frame number gaps mean the SDK or the frame queue discarded frames"""
+        if self._last_frame_number is not None and frame_number > self._last_frame_number + 1:
+            self.dropped_frames += frame_number - self._last_frame_number - 1
+        self._last_frame_number = frame_number
+    
+    def get_capture_stats(self):
+        """Return dropped frames and, in queue mode, buffer pool usage"""
+        stats = {'dropped_frames': self.dropped_frames}
+        if self.pool is not None:
+            stats['pool_misses'] = self.pool.misses
+            stats['pool_available'] = self.pool.available()
+        return stats
+    
+    def get_stereo_calibration(self):
+        if not self._is_running:
+            return super().get_stereo_calibration()
+        rs = self._rs
+        try:
+            profile = self.pipeline.get_active_profile()
+            left = profile.get_stream(rs.stream.infrared, 1).as_video_stream_profile()
+            right = profile.get_stream(rs.stream.infrared, 2).as_video_stream_profile()
+            extrinsics = right.get_extrinsics_to(left)
+            return left.get_intrinsics().fx, abs(extrinsics.translation[0])
+        except Exception as e:
+            raise CameraError(f"Failed to read stereo calibration: {str(e)}")
+    
+    def _stream_profiles(self):
+        rs = self._rs
+        profile = self.pipeline.get_active_profile()
+        left = profile.get_stream(rs.stream.infrared, 1).as_video_stream_profile()
+        color = profile.get_stream(rs.stream.color).as_video_stream_profile()
+        return left, color
+    
+    def get_intrinsics(self):
+        if not self._is_running:
+            return super().get_intrinsics()
+        try:
+            left, _ = self._stream_profiles()
+            intrinsics = left.get_intrinsics()
+            return intrinsics.fx, intrinsics.fy, intrinsics.ppx, intrinsics.ppy
+        except Exception as e:
+            raise CameraError(f"Failed to read IR intrinsics: {str(e)}")
+    
+    def get_color_projection(self):
+        if not self._is_running:
+            return super().get_color_projection()
+        try:
+            left, color = self._stream_profiles()
+            intrinsics = color.get_intrinsics()
+            extrinsics = left.get_extrinsics_to(color)
+            # librealsense stores the rotation column-major
+            rotation = np.array(extrinsics.rotation, dtype=np.float32).reshape(3, 3).T
+            translation = np.array(extrinsics.translation, dtype=np.float32)
+            return ((intrinsics.fx, intrinsics.fy, intrinsics.ppx, intrinsics.ppy),
+                    rotation, translation)
+        except Exception as e:
+            raise CameraError(f"Failed to read color calibration: {str(e)}")
+    
     def stop(self):
         if self._is_running:
             try:
@@ -75,6 +200,9 @@ class RealSenseCamera(CameraBase):
                 self._is_running = False
             except Exception as e:
                 raise CameraError(f"Failed to stop camera: {str(e)}")
+            finally:
+                if self.recorder is not None:
+                    self.recorder.stop()
     
     def is_opened(self):
         return self._is_running
\ No newline at end of file
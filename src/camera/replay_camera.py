@@ -0,0 +1,115 @@
+"""Replay camera for recorded RealSense .bag files and frame containers"""
+import time
+from pathlib import Path
+import numpy as np
+from .camera_base import CameraBase
+from .frame_recorder import open_recording
+from ..utils.exceptions import CameraError
+
+REPLAY_MODES = ('realtime', 'fast')
+
+
+class ReplayCamera(CameraBase):
+    def __init__(self, path, mode='realtime', loop=False):
+        """
+        Args:
+            path: RealSense .bag file or frame container directory
+            mode: 'realtime' paces frames by their recorded timestamps,
+                  'fast' returns frames as fast as they are requested
+            loop: restart from the first frame when the recording ends
+        """
+        if mode not in REPLAY_MODES:
+            raise CameraError(f"Unsupported replay mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.loop = loop
+        self._is_running = False
+        self._is_bag = self.path.suffix == '.bag'
+        self._pipeline = None
+        self._records = None
+        self._index = 0
+        self._start_wall = None
+        self._start_ts = None
+
+    def start(self):
+        if self._is_bag:
+            self._start_bag()
+        else:
+            self._records, _ = open_recording(self.path)
+            self._index = 0
+            self._start_wall = None
+        self._is_running = True
+
+    def _start_bag(self):
+        try:
+            import pyrealsense2 as rs
+            self._pipeline = rs.pipeline()
+            config = rs.config()
+            config.enable_device_from_file(str(self.path), repeat_playback=self.loop)
+            profile = self._pipeline.start(config)
+            playback = profile.get_device().as_playback()
+            playback.set_real_time(self.mode == 'realtime')
+        except Exception as e:
+            raise CameraError(f"Failed to open bag file {self.path}: {str(e)}")
+
+    def get_frames(self):
+        if not self._is_running:
+            raise CameraError("Camera is not running")
+        if self._is_bag:
+            return self._get_bag_frames()
+        return self._get_recorded_frames()
+
+    def _get_bag_frames(self):
+        try:
+            frames = self._pipeline.wait_for_frames()
+            left_ir_frame = frames.get_infrared_frame(1)
+            right_ir_frame = frames.get_infrared_frame(2)
+            color_frame = frames.get_color_frame()
+
+            if not left_ir_frame or not right_ir_frame or not color_frame:
+                raise CameraError("Failed to get valid frames")
+
+            left_image = np.asanyarray(left_ir_frame.get_data())
+            right_image = np.asanyarray(right_ir_frame.get_data())
+            color_image = np.asanyarray(color_frame.get_data())
+
+            return left_image, right_image, color_image
+
+        except Exception as e:
+            raise CameraError(f"Error getting frames: {str(e)}")
+
+    def _get_recorded_frames(self):
+        if self._index >= len(self._records):
+            if not self.loop:
+                raise CameraError("Replay finished")
+            self._index = 0
+            self._start_wall = None
+
+        records = self._records
+        i = self._index
+        timestamp = float(records['timestamp'][i])
+
+        if self.mode == 'realtime':
+            if self._start_wall is None:
+                self._start_wall = time.perf_counter()
+                self._start_ts = timestamp
+            delay = (timestamp - self._start_ts) - (time.perf_counter() - self._start_wall)
+            if delay > 0:
+                time.sleep(delay)
+
+        self._index += 1
+        return records['left'][i], records['right'][i], records['color'][i]
+
+    def stop(self):
+        if self._is_running:
+            if self._pipeline is not None:
+                try:
+                    self._pipeline.stop()
+                except Exception as e:
+                    raise CameraError(f"Failed to stop replay: {str(e)}")
+                self._pipeline = None
+            self._records = None
+            self._is_running = False
+
+    def is_opened(self):
+        return self._is_running
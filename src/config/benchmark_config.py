@@ -0,0 +1,17 @@
+"""Benchmark configuration parameters"""
+
+BENCHMARK_CONFIG = {
+    'resolutions': [(640, 360), (848, 480), (1280, 720)],
+    'num_disparities': [64, 112, 160],  # 必須為 16 的倍數
+    'window_sizes': [3, 5, 7],
+    'object_counts': [1, 5, 20, 50],
+    'association_object_counts': [50, 100, 200, 300],
+    'association_budget_ms': 2.0,  # 追蹤關聯（代價矩陣、指派與狀態更新）每幀 p99 的時間預算
+    'kalman_budget_ms': 1.0,       # 卡爾曼預測與修正每幀 p99 的時間預算，與關聯分開計算
+    'association_budget_objects': 200,  # 支援的最大同時物體數：不超過此值的每個物體數 p99 都必須在預算內，否則基準測試失敗；更多物體只記錄不檢查
+    'true_disparity': 32,     # 合成立體影像的視差
+    'warmup': 3,
+    'iterations': 30,
+    'seed': 0,
+    'output_path': 'benchmark_results.json'
+}
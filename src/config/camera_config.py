@@ -5,5 +5,36 @@ CAMERA_CONFIG = {
     'height': 480,
     'fps': 30,
     'ir_format': 'y8',
-    'color_format': 'bgr8'
-}
\ No newline at end of file
+    'color_format': 'bgr8',
+    'focal_length_px': 424.0,  # 左 IR 焦距（像素），相機啟動後以裝置內參覆蓋
+    'baseline_m': 0.05,        # 左右 IR 基線（公尺）
+    'source': 'realsense'  # 'realsense' 或 'replay'
+}
+
+# 擷取模式：'wait' 直接等待 pipeline 幀, 'queue' 以 rs.frame_queue 接收並複製到預先配置的緩衝池
+FRAME_QUEUE_CONFIG = {
+    'capture_mode': 'wait',
+    'queue_size': 4,     # rs.frame_queue 容量，滿了丟棄最舊的幀
+    'pool_size': 12,     # 緩衝池幀數，需大於管線中同時處理的幀數
+    'timeout_ms': 1000   # 等待下一幀的毫秒數
+}
+
+# 錄製設定：path 為 None 時不錄製
+RECORD_CONFIG = {
+    'path': None,
+    'queue_size': 64
+}
+
+# 回放設定：path 可為 .bag 檔或錄製容器目錄
+REPLAY_CONFIG = {
+    'path': None,
+    'mode': 'realtime',  # 'realtime' 依時間戳播放, 'fast' 盡可能快
+    'loop': False
+}
+
+
+# 多相機設定：serials 為空時使用單一相機
+MULTI_CAMERA_CONFIG = {
+    'serials': [],             # 例如 ['123456789012', '234567890123']
+    'sync_tolerance_ms': 20.0  # 同一組幀之間允許的最大時間差
+}
@@ -8,4 +8,53 @@ SGBM_CONFIG = {
     'speckle_range': 32,
     'uniqueness_ratio': 10,
     'disp12_max_diff': 1
-}
\ No newline at end of file
+}
+
+# 深度計算模式: 'full' 全幅計算, 'roi' 僅計算偵測區域, 'pyramid' 由粗到細,
+# 'incremental' 僅重算畫面有變化的區塊（固定安裝的相機）
+DEPTH_CONFIG = {
+    'mode': 'full',
+    'normalize_output': False  # compute_depth 是否同時輸出 min/max 正規化的 uint8 視差圖（顯示改用固定範圍色彩表）
+}
+
+# ROI 模式設定
+ROI_DEPTH_CONFIG = {
+    'padding': 8,                # ROI 四周額外擴張的像素，容納物體移動與 SGBM 聚合邊界
+    'full_refresh_interval': 30  # 每 N 幀做一次全幅計算，0 表示停用
+}
+
+
+# 金字塔 (coarse-to-fine) 模式設定
+PYRAMID_CONFIG = {
+    'levels': 1,                    # 降採樣層數，每層寬高減半
+    'refinement': 'band',           # 'none' 僅上採樣, 'band' 全幅窄帶精修, 'low_confidence' 只精修低置信度區域
+    'band': 4,                      # 精修時在粗估視差上下各保留的搜尋範圍（全解析度像素）
+    'strip_height': 48,             # 精修時每條水平帶的高度
+    'low_confidence_ratio': 0.2,    # 低置信度像素比例超過此值的水平帶才精修
+    'low_confidence_gradient': 2.0  # 粗估視差梯度超過此值視為低置信度（粗解析度像素）
+}
+
+
+# 增量 (incremental) 模式設定
+INCREMENTAL_DEPTH_CONFIG = {
+    'tile_size': 32,              # 變化偵測的區塊大小（像素）
+    'threshold': 12,              # 像素灰階差超過此值視為變化
+    'min_changed_pixels': 16,     # 區塊內變化像素數達此值才重算
+    'padding': 8,                 # 重算區域四周額外擴張的像素
+    'full_refresh_interval': 60   # 每 N 幀做一次全幅計算，0 表示停用
+}
+
+
+# 點雲輸出設定
+POINT_CLOUD_CONFIG = {
+    'enabled': False,
+    'format': 'f16',         # 'f16' 所有幀附加寫入同一個 float16 串流檔, 'ply' 每幀一個 binary PLY
+    'output_dir': 'pointclouds',
+    'stride': 2,             # 每隔幾列/行取一個像素，2 時點數為 1/4
+    'voxel_size': None,      # 體素降採樣邊長（公尺），None 表示不降採樣；每幀約多花數十毫秒
+    'max_depth': 5.0,        # 超過此距離（公尺）的點捨棄，None 表示不限制
+    'crop_to_rois': False,   # 只輸出檢測/追蹤框內的點
+    'color': True,           # 是否附帶彩色影像的 RGB
+    'every_n_frames': 1,     # 每 N 幀輸出一次
+    'queue_size': 4          # 背景寫入佇列長度，寫入跟不上時丟棄最舊的幀
+}
@@ -4,4 +4,17 @@ YOLO_CONFIG = {
     'model_path': 'yolov8n.pt',
     'confidence_threshold': 0.25,
     'nms_threshold': 0.45
-}
\ No newline at end of file
+}
+
+# 檢測排程：每 N 幀執行一次 YOLO，其餘幀以追蹤器運動模型預測
+DETECTION_SCHEDULE_CONFIG = {
+    'detect_interval': 1,           # 1 表示每幀都檢測
+    'uncertainty_threshold': 15.0   # 追蹤位置標準差（像素）超過此值時提前檢測
+}
+
+
+# ONNX Runtime / OpenVINO 後端設定
+RUNTIME_CONFIG = {
+    'imgsz': 640,      # 匯出與推論的輸入尺寸
+    'num_threads': 4   # intra-op 執行緒數
+}
@@ -0,0 +1,9 @@
+"""Display configuration parameters"""
+
+DISPLAY_CONFIG = {
+    'enabled': True,     # False 時不做任何繪圖與顯示
+    'fps': 15.0,         # 顯示更新率上限，與處理速率無關；0 表示每幀都顯示
+    'scale': 0.8,        # 顯示縮放比例
+    'show_ir': True,     # 是否顯示左右 IR 影像
+    'colormap': 'JET'    # OpenCV 色彩表名稱 (cv2.COLORMAP_<name>)
+}
@@ -0,0 +1,13 @@
+"""Runtime metrics configuration parameters"""
+
+# 每幀各階段耗時、佇列深度與丟幀統計；關閉時不做任何計時
+METRICS_CONFIG = {
+    'enabled': False,
+    'window': 300,                 # 滾動統計的幀數，用於百分位數與 FPS
+    'buckets_ms': (1, 2, 5, 10, 20, 33, 50, 100, 200, 500, 1000),
+    'prometheus_file': None,       # 例如 'stereo.prom'，定期以 Prometheus 文字格式覆寫
+    'http_port': None,             # 例如 9108，於 127.0.0.1:<port>/metrics 提供 Prometheus 格式
+    'export_interval': 1.0,        # 寫入 prometheus_file 的間隔秒數
+    'csv_path': None,              # 例如 'trace.csv'，每幀一列各階段耗時
+    'overlay': True                # 在顯示畫面上繪製 FPS 與延遲
+}
@@ -1,22 +1,27 @@
 """Model configuration and registry"""
 
 # 支援的模型配置
+# backend: 'torch' 使用 ultralytics, 'onnx' / 'openvino' 在 CPU 上以匯出的模型推論
 SUPPORTED_MODELS = {
     'yolo': {
         'yolov8n': {
             'path': 'yolov8n.pt',
+            'backend': 'torch',
             'description': 'YOLOv8 Nano - 快速但精度較低'
         },
         'yolov8s': {
             'path': 'yolov8s.pt',
+            'backend': 'torch',
             'description': 'YOLOv8 Small - 平衡速度和精度'
         },
         'yolov8m': {
             'path': 'yolov8m.pt',
+            'backend': 'torch',
             'description': 'YOLOv8 Medium - 較高精度'
         },
         'yolov8l': {
             'path': 'yolov8l.pt',
+            'backend': 'torch',
             'description': 'YOLOv8 Large - 高精度'
         }
     },
@@ -36,5 +41,21 @@ SUPPORTED_MODELS = {
 TRACKER_CONFIG = {
     'max_disappeared': 30,  # 物體消失多少幀後停止追蹤
     'max_distance': 50,    # 最大匹配距離
-    'min_confidence': 0.3  # 最小檢測置信度
-}
\ No newline at end of file
+    'min_confidence': 0.3,  # 最小檢測置信度
+    'cost_metric': 'centroid',  # 匹配代價: 'centroid', 'iou', '3d'
+    'assignment': 'hungarian',  # 指派方式: 'hungarian' 最佳指派, 'greedy' 貪婪匹配
+    'min_iou': 0.1,        # 'iou' 代價的最小匹配 IoU
+    'depth_weight': 100.0,  # '3d' 代價中每公尺深度差換算的像素距離
+    'history_length': 64,   # 每個物體保留的軌跡點數
+    'initial_capacity': 64, # 預先配置的追蹤物體數量
+    'id_pool_size': 65536,  # 物體 ID 循環使用的範圍
+    'position_noise': 1.0,  # 運動模型每幀位置雜訊（像素）
+    'velocity_noise': 0.5,  # 運動模型每幀速度雜訊（像素/幀）
+    'measurement_noise': 4.0  # 檢測框量測雜訊（像素）
+}
+
+# 模型快取：切換回已載入過的模型時不需重新讀取
+MODEL_CACHE_CONFIG = {
+    'max_models': 2,  # 最多保留在記憶體中的模型數量（LRU）
+    'warmup': True    # 切換前先以空白影像推論一次
+}
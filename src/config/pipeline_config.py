@@ -0,0 +1,38 @@
+"""Pipelined runtime configuration parameters"""
+
+PIPELINE_CONFIG = {
+    'enabled': True,
+    'queue_size': 2,         # 每個階段之間的佇列長度，滿了丟棄最舊的幀
+    'result_timeout': 1.0,   # 等待處理結果的秒數
+    'workers': 'thread',     # 'thread' 同一程序內的執行緒, 'process' 深度與檢測各自在獨立程序
+    'shared_slots': 6        # 'process' 模式下共享記憶體中同時處理的幀數
+}
+
+
+# 啟動設定：預設模型在背景載入，與相機啟動同時進行
+STARTUP_CONFIG = {
+    'model_type': 'yolo',    # None 表示不自動載入，由介面選擇
+    'model_name': 'yolov8n',
+    'report': True           # 顯示第一幀後列出各啟動階段耗時
+}
+
+
+# 自適應品質：依實測幀時間在執行中調整成本，維持目標幀率
+# levels 由高品質排到低品質；超過預算時往下一級，餘裕足夠時往上一級
+QUALITY_CONFIG = {
+    'enabled': False,
+    'target_fps': 30.0,
+    'window': 30,            # 以最近 N 幀的平均處理時間判斷，也攤平隔幀檢測的尖峰
+    'degrade_ratio': 1.0,    # 平均幀時間超過預算的此倍數時降一級
+    'upgrade_ratio': 0.7,    # 平均幀時間低於預算的此倍數時升一級（與 degrade_ratio 之間為不動作區間）
+    'settle_frames': 30,     # 每次調整後至少等待的幀數，讓量測反映新設定
+    'max_backoff': 8,        # 升級後立即又被降回時，下次升級的等待幀數加倍，最多到此倍數
+    'initial_level': 1,
+    'levels': [
+        {'model_name': 'yolov8s', 'imgsz': 640, 'detect_interval': 1, 'num_disparities': 112, 'depth_scale': 1.0},
+        {'model_name': 'yolov8n', 'imgsz': 640, 'detect_interval': 1, 'num_disparities': 112, 'depth_scale': 1.0},
+        {'model_name': 'yolov8n', 'imgsz': 512, 'detect_interval': 2, 'num_disparities': 96, 'depth_scale': 1.0},
+        {'model_name': 'yolov8n', 'imgsz': 416, 'detect_interval': 3, 'num_disparities': 96, 'depth_scale': 0.5},
+        {'model_name': 'yolov8n', 'imgsz': 320, 'detect_interval': 4, 'num_disparities': 64, 'depth_scale': 0.5}
+    ]
+}
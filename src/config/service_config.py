@@ -0,0 +1,11 @@
+"""Headless service configuration parameters"""
+
+# 無介面服務模式：不建立 Tk 視窗也不顯示影像，只輸出追蹤結果
+SERVICE_CONFIG = {
+    'model_type': 'yolo',
+    'model_name': 'yolov8n',
+    'zmq_endpoint': None,          # 例如 'tcp://127.0.0.1:5556'，需安裝 pyzmq
+    'udp_address': None,           # 例如 ('127.0.0.1', 5557)，每幀一個 JSON datagram
+    'jsonl_path': None,            # 例如 'results.jsonl'，逐行附加寫入
+    'topic': 'tracks'              # ZeroMQ 訊息主題
+}
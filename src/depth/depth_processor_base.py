@@ -4,4 +4,16 @@ from abc import ABC, abstractmethod
 class DepthProcessorBase(ABC):
     @abstractmethod
     def compute_depth(self, left_image, right_image):
-        pass
\ No newline at end of file
+        pass
+
+    def set_rois(self, rois):
+        """Hint the regions (x1, y1, x2, y2) that later frames need depth for"""
+        pass
+
+    def set_quality(self, num_disparities=None, scale=None):
+        """
+        Trade accuracy for speed at runtime.
+
+        Returns False when this processor has no adjustable cost knobs.
+        """
+        return False
@@ -0,0 +1,116 @@
+"""SGBM depth processor that only recomputes tiles where the scene changed"""
+import cv2
+import numpy as np
+from .sgbm_processor import SGBMProcessor
+from .region_matcher import merge_regions, compute_regions
+from ..config.depth_config import INCREMENTAL_DEPTH_CONFIG
+
+class IncrementalSGBMProcessor(SGBMProcessor):
+    """
+    Keeps the previous disparity map and recomputes only dirty tiles.
+
+    A tile is dirty when enough of its pixels differ from the reference IR
+    images by more than the threshold. A change in the right image at column
+    x affects left pixels up to x + search_range, so right-image changes also
+    dirty the tiles to their right. The reference images are only refreshed
+    where disparity was recomputed, so slow changes still accumulate until they
+    cross the threshold, and a full-frame pass every full_refresh_interval
+    frames bounds any remaining drift.
+    """
+    def __init__(self, config=None, incremental_config=None):
+        super().__init__(config)
+        incremental_config = incremental_config or INCREMENTAL_DEPTH_CONFIG
+        self.tile_size = incremental_config['tile_size']
+        self.threshold = incremental_config['threshold']
+        self.min_changed_pixels = incremental_config['min_changed_pixels']
+        self.padding = incremental_config['padding']
+        self.full_refresh_interval = incremental_config['full_refresh_interval']
+        self.search_range = self.min_disp + self.num_disp
+        self._disparity = None
+        self._ref_left = None
+        self._ref_right = None
+        self._frame_count = 0
+        self.dirty_fraction = 1.0
+
+    def set_quality(self, num_disparities=None, scale=None):
+        """Cached tiles would mix ranges and resolutions; not adjustable at runtime"""
+        return False
+
+    def _allocate(self, shape):
+        height, width = shape
+        tile = self.tile_size
+        self._tiles_y = -(-height // tile)
+        self._tiles_x = -(-width // tile)
+        self._diff = np.empty(shape, dtype=np.uint8)
+        # Changed-pixel mask padded to a whole number of tiles
+        self._mask = np.zeros((self._tiles_y * tile, self._tiles_x * tile), dtype=np.uint8)
+
+    def _needs_full_refresh(self, shape):
+        if self._disparity is None or self._disparity.shape != shape:
+            return True
+        return (self.full_refresh_interval > 0 and
+                self._frame_count % self.full_refresh_interval == 0)
+
+    def _changed_tiles(self, image, reference):
+        """Boolean (tiles_y, tiles_x) grid of tiles that differ from the reference"""
+        height, width = image.shape[:2]
+        tile = self.tile_size
+        cv2.absdiff(image, reference, dst=self._diff)
+        cv2.threshold(self._diff, self.threshold, 1, cv2.THRESH_BINARY,
+                      dst=self._mask[:height, :width])
+        counts = self._mask.reshape(self._tiles_y, tile, self._tiles_x, tile).sum(
+            axis=(1, 3), dtype=np.int32
+        )
+        return counts >= self.min_changed_pixels
+
+    def dirty_tiles(self, left_image, right_image):
+        """Tiles of the left image whose disparity may have changed"""
+        dirty = self._changed_tiles(left_image, self._ref_left)
+        right_dirty = self._changed_tiles(right_image, self._ref_right)
+        # A right-image change at tile j is seen by left tiles j .. j + span
+        span = -(-self.search_range // self.tile_size)
+        for shift in range(min(span, self._tiles_x - 1) + 1):
+            dirty[:, shift:] |= right_dirty[:, :self._tiles_x - shift]
+        return dirty
+
+    def _tile_rects(self, dirty, width, height):
+        """One rect per horizontal run of dirty tiles"""
+        tile = self.tile_size
+        rects = []
+        for ty, row in enumerate(dirty):
+            columns = np.flatnonzero(row)
+            if columns.size == 0:
+                continue
+            breaks = np.flatnonzero(np.diff(columns) > 1)
+            starts = np.concatenate(([columns[0]], columns[breaks + 1]))
+            ends = np.concatenate((columns[breaks], [columns[-1]])) + 1
+            y1, y2 = ty * tile, min((ty + 1) * tile, height)
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                rects.append((start * tile, y1, min(end * tile, width), y2))
+        return rects
+
+    def compute_depth(self, left_image, right_image):
+        shape = left_image.shape[:2]
+        if self._needs_full_refresh(shape):
+            if self._disparity is None or self._disparity.shape != shape:
+                self._allocate(shape)
+            self._disparity = self.stereo.compute(left_image, right_image).astype(np.float32) / 16.0
+            self._ref_left = left_image.copy()
+            self._ref_right = right_image.copy()
+            self.dirty_fraction = 1.0
+        else:
+            height, width = shape
+            dirty = self.dirty_tiles(left_image, right_image)
+            self.dirty_fraction = float(dirty.mean())
+            if self.dirty_fraction:
+                rects = self._tile_rects(dirty, width, height)
+                regions = merge_regions(rects, self.search_range, self.padding, width, height)
+                compute_regions(self.stereo, left_image, right_image, regions, self._disparity)
+                for (x1, y1, x2, y2), _ in regions:
+                    self._ref_left[y1:y2, x1:x2] = left_image[y1:y2, x1:x2]
+                    self._ref_right[y1:y2, x1:x2] = right_image[y1:y2, x1:x2]
+        self._frame_count += 1
+
+        # The internal map is updated in place next frame, so hand out a copy
+        disparity = self._disparity.copy()
+        return disparity, self.normalize(disparity)
@@ -0,0 +1,175 @@
+"""Vectorized disparity to point cloud reprojection"""
+import numpy as np
+
+
+def reprojection_matrix(fx, fy, cx, cy, baseline_m):
+    """
+    Build the 4x4 disparity-to-depth matrix Q for a rectified pair.
+
+    [X Y Z W]^T = Q [u v d 1]^T gives the point (X/W, Y/W, Z/W) in metres
+    in the left camera frame, matching cv2.reprojectImageTo3D.
+    """
+    return np.array([
+        [1.0, 0.0, 0.0, -cx],
+        [0.0, fx / fy, 0.0, -cy * fx / fy],
+        [0.0, 0.0, 0.0, fx],
+        [0.0, 0.0, 1.0 / baseline_m, 0.0],
+    ], dtype=np.float64)
+
+
+def voxel_downsample(points, colors, voxel_size):
+    """
+    Replace all points falling in the same voxel by their centroid.
+
+    Args:
+        points: (N, 3) float32 array
+        colors: (N, 3) uint8 array or None; averaged per voxel
+        voxel_size: voxel edge length in metres
+
+    Returns:
+        (points, colors) with one entry per occupied voxel
+    """
+    if len(points) == 0:
+        return points, colors
+    scaled = points * np.float32(1.0 / voxel_size)
+    keys = np.floor(scaled, out=scaled).astype(np.int64).T
+    keys -= keys.min(axis=1, keepdims=True)
+    dims = keys.max(axis=1) + 1
+    linear = (keys[0] * dims[1] + keys[1]) * dims[2] + keys[2]
+    # One sort groups each voxel's points into a contiguous run, numbered in order
+    order = np.argsort(linear)
+    linear = linear[order]
+    first = np.empty(len(linear), dtype=bool)
+    first[0] = True
+    np.not_equal(linear[1:], linear[:-1], out=first[1:])
+    voxel = np.empty(len(linear), dtype=np.intp)
+    voxel[order] = np.cumsum(first) - 1
+    counts = np.bincount(voxel)
+
+    def means(values):
+        return np.stack([np.bincount(voxel, weights=values[:, axis])
+                         for axis in range(3)], axis=1) / counts[:, None]
+
+    points = means(points).astype(np.float32)
+    if colors is not None:
+        colors = np.rint(means(colors)).astype(np.uint8)
+    return points, colors
+
+
+class PointCloudGenerator:
+    """
+    Turns disparity maps into XYZ(+RGB) points.
+
+    Q is applied as per-pixel x/y terms computed once, so each frame costs
+    one mask, a few flat gathers and vector multiplies instead of a full
+    4x4 transform per pixel. With stride > 1 only every
+    stride-th row and column is reprojected, which cuts every later step
+    (color lookup, voxel grid, writing) by stride squared.
+    """
+    def __init__(self, width, height, Q, min_disparity=0, max_depth=None, voxel_size=None,
+                 color_projection=None, stride=1):
+        """
+        Args:
+            width, height: disparity map resolution
+            Q: 4x4 matrix from reprojection_matrix
+            min_disparity: SGBM minDisparity; values at or below it are unmatched
+            max_depth: drop points farther than this, in metres; None keeps all
+            voxel_size: voxel edge in metres for downsampling; None keeps every point
+            color_projection: ((fx, fy, cx, cy), R, t) of the color camera relative to
+                the left IR camera, or None when the color image is pixel-aligned
+            stride: keep every stride-th row and column of the disparity map
+        """
+        Q = np.asarray(Q, dtype=np.float64)
+        self.width = width
+        self.height = height
+        self.voxel_size = voxel_size
+        self.color_projection = color_projection
+        self.stride = max(1, int(stride))
+        # Flat per-cell tables of the stride grid, gathered with np.take
+        columns = np.arange(0, width, self.stride)
+        rows = np.arange(0, height, self.stride)
+        self._x = np.broadcast_to((Q[0, 0] * columns + Q[0, 3]).astype(np.float32),
+                                  (len(rows), len(columns))).ravel()
+        self._y = np.repeat((Q[1, 1] * rows + Q[1, 3]).astype(np.float32), len(columns))
+        self._pixels = (rows[:, None] * width + columns).ravel()
+        self._z = np.float32(Q[2, 3])
+        self._w_scale = np.float32(Q[3, 2])
+        self._w_offset = np.float32(Q[3, 3])
+        # Depth falls with disparity, so max_depth becomes a disparity floor
+        self.min_valid = float(min_disparity)
+        if max_depth is not None:
+            self.min_valid = max(self.min_valid,
+                                 (Q[2, 3] / max_depth - Q[3, 3]) / Q[3, 2])
+
+    def valid_mask(self, disparity, rois=None):
+        """
+        Sampled pixels with a usable disparity, limited to the union of rois when given.
+
+        The mask covers the stride grid: entry (r, c) is pixel (r * stride, c * stride).
+        """
+        s = self.stride
+        valid = disparity[::s, ::s] > self.min_valid
+        if rois is None:
+            return valid
+        inside = np.zeros_like(valid)
+        for x1, y1, x2, y2 in rois:
+            # First and one-past-last grid cells whose pixel lies inside the roi
+            x1, y1 = -(-max(0, int(x1)) // s), -(-max(0, int(y1)) // s)
+            x2 = -(-min(self.width, int(x2)) // s)
+            y2 = -(-min(self.height, int(y2)) // s)
+            inside[y1:max(y1, y2), x1:max(x1, x2)] = True
+        valid &= inside
+        return valid
+
+    def generate(self, disparity, color_image=None, rois=None):
+        """
+        Args:
+            disparity: float32 disparity map in pixels
+            color_image: optional BGR image to color the points from
+            rois: optional sequence of (x1, y1, x2, y2); only points inside are kept
+
+        Returns:
+            (points, colors): (N, 3) float32 in metres and (N, 3) uint8 BGR,
+            colors is None without a color image
+        """
+        s = self.stride
+        cells = np.flatnonzero(self.valid_mask(disparity, rois))
+        sampled = disparity[::s, ::s].ravel()
+        inv_w = 1.0 / (np.take(sampled, cells) * self._w_scale + self._w_offset)
+        points = np.empty((len(cells), 3), dtype=np.float32)
+        np.multiply(np.take(self._x, cells), inv_w, out=points[:, 0])
+        np.multiply(np.take(self._y, cells), inv_w, out=points[:, 1])
+        np.multiply(self._z, inv_w, out=points[:, 2])
+
+        colors = None
+        if color_image is not None:
+            pixels = cells if s == 1 else np.take(self._pixels, cells)
+            colors = self.sample_colors(color_image, points, pixels)
+        if self.voxel_size:
+            points, colors = voxel_downsample(points, colors, self.voxel_size)
+        return points, colors
+
+    def sample_colors(self, color_image, points, pixels):
+        """
+        Look up the color of every point, black where it leaves the color image.
+
+        pixels are the points' flat indices into the disparity map.
+        """
+        height, width = color_image.shape[:2]
+        flat_color = color_image.reshape(-1, 3)
+        if self.color_projection is None:
+            if (height, width) != (self.height, self.width):
+                rows, cols = np.divmod(pixels, self.width)
+                pixels = rows * height // self.height * width + cols * width // self.width
+            return np.take(flat_color, pixels, axis=0)
+
+        (fx, fy, cx, cy), rotation, translation = self.color_projection
+        projected = points @ np.asarray(rotation, dtype=np.float32).T
+        projected += np.asarray(translation, dtype=np.float32)
+        inv_z = 1.0 / projected[:, 2]
+        u = np.rint(projected[:, 0] * inv_z * fx + cx).astype(np.int32)
+        v = np.rint(projected[:, 1] * inv_z * fy + cy).astype(np.int32)
+        inside = (u >= 0) & (u < width) & (v >= 0) & (v < height)
+        colors = np.zeros((len(points), 3), dtype=np.uint8)
+        colors[inside] = np.take(flat_color, v[inside] * width + u[inside], axis=0)
+        return colors
@@ -0,0 +1,116 @@
+"""Coarse-to-fine pyramid SGBM depth processor"""
+import cv2
+import numpy as np
+from .sgbm_processor import SGBMProcessor
+from ..config.depth_config import PYRAMID_CONFIG
+
+REFINEMENT_POLICIES = ('none', 'band', 'low_confidence')
+
+
+def _round_up_16(value):
+    return max(16, int(np.ceil(value / 16.0)) * 16)
+
+
+class PyramidSGBMProcessor(SGBMProcessor):
+    """
+    Runs SGBM on a downsampled pair with proportionally fewer disparities,
+    upsamples the result and optionally refines it at full resolution.
+
+    Refinement works on horizontal strips: each strip is matched again with
+    the disparity range narrowed to the coarse estimate of that strip +/- band,
+    which is far cheaper than the full num_disparities search.
+    """
+    def __init__(self, config=None, pyramid_config=None):
+        super().__init__(config)
+        pyramid_config = pyramid_config or PYRAMID_CONFIG
+        if pyramid_config['refinement'] not in REFINEMENT_POLICIES:
+            raise ValueError(f"Unknown refinement policy: {pyramid_config['refinement']}")
+        self.levels = pyramid_config['levels']
+        self.pyramid_factor = 2 ** self.levels
+        self.refinement = pyramid_config['refinement']
+        self.band = pyramid_config['band']
+        self.strip_height = pyramid_config['strip_height']
+        self.low_confidence_ratio = pyramid_config['low_confidence_ratio']
+        self.low_confidence_gradient = pyramid_config['low_confidence_gradient']
+
+        self.coarse_min_disp = self.min_disp // self.pyramid_factor
+        self.coarse_num_disp = _round_up_16(self.num_disp / self.pyramid_factor)
+        self.coarse_stereo = self.create_matcher(self.coarse_min_disp, self.coarse_num_disp)
+        self.refine_stereo = self.create_matcher(self.min_disp, self.num_disp)
+        self.max_disp = self.min_disp + self.num_disp
+
+    def set_quality(self, num_disparities=None, scale=None):
+        """Coarse and refine matchers are derived from the range; not adjustable at runtime"""
+        return False
+
+    def _downsample(self, image):
+        for _ in range(self.levels):
+            image = cv2.pyrDown(image)
+        return image
+
+    def compute_coarse(self, left_image, right_image):
+        """Disparity of the downsampled pair, in coarse-resolution pixels"""
+        raw = self.coarse_stereo.compute(
+            self._downsample(left_image), self._downsample(right_image)
+        )
+        return raw.astype(np.float32) / 16.0
+
+    def _low_confidence_mask(self, coarse, coarse_valid):
+        grad_x = np.abs(cv2.Sobel(coarse, cv2.CV_32F, 1, 0, ksize=3))
+        grad_y = np.abs(cv2.Sobel(coarse, cv2.CV_32F, 0, 1, ksize=3))
+        return ~coarse_valid | ((grad_x + grad_y) > self.low_confidence_gradient * 8)
+
+    def compute_depth(self, left_image, right_image):
+        height, width = left_image.shape[:2]
+        coarse = self.compute_coarse(left_image, right_image)
+        coarse_valid = coarse >= self.coarse_min_disp
+
+        # Nearest-neighbour upsampling keeps invalid pixels from bleeding into valid ones
+        disparity = cv2.resize(coarse, (width, height), interpolation=cv2.INTER_NEAREST)
+        disparity *= self.pyramid_factor
+        disparity[cv2.resize(coarse_valid.view(np.uint8), (width, height),
+                             interpolation=cv2.INTER_NEAREST) == 0] = self.min_disp - 1
+
+        if self.refinement != 'none':
+            low_confidence = None
+            if self.refinement == 'low_confidence':
+                low_confidence = self._low_confidence_mask(coarse, coarse_valid)
+            self._refine(left_image, right_image, coarse, coarse_valid,
+                         low_confidence, disparity)
+
+        return disparity, self.normalize(disparity)
+
+    def _refine(self, left_image, right_image, coarse, coarse_valid, low_confidence, disparity):
+        height = left_image.shape[0]
+        pad = self.window_size
+        factor = self.pyramid_factor
+        for y0 in range(0, height, self.strip_height):
+            y1 = min(height, y0 + self.strip_height)
+            cy0, cy1 = y0 // factor, max(y0 // factor + 1, y1 // factor)
+
+            strip_mask = None
+            if low_confidence is not None:
+                if low_confidence[cy0:cy1].mean() < self.low_confidence_ratio:
+                    continue
+                strip_mask = cv2.resize(
+                    low_confidence[cy0:cy1].view(np.uint8),
+                    (disparity.shape[1], y1 - y0),
+                    interpolation=cv2.INTER_NEAREST
+                ).astype(bool)
+
+            values = coarse[cy0:cy1][coarse_valid[cy0:cy1]]
+            if values.size:
+                low = max(self.min_disp, int(values.min() * factor) - self.band)
+                high = min(self.max_disp, int(np.ceil(values.max() * factor)) + self.band)
+            else:
+                low, high = self.min_disp, self.max_disp
+            self.refine_stereo.setMinDisparity(low)
+            self.refine_stereo.setNumDisparities(_round_up_16(high - low))
+
+            wy0, wy1 = max(0, y0 - pad), min(height, y1 + pad)
+            raw = self.refine_stereo.compute(left_image[wy0:wy1], right_image[wy0:wy1])
+            refined = raw[y0 - wy0:y1 - wy0].astype(np.float32) / 16.0
+            valid = refined >= low
+            if strip_mask is not None:
+                valid &= strip_mask
+            disparity[y0:y1][valid] = refined[valid]
@@ -0,0 +1,82 @@
+"""Helpers for running SGBM on sub-regions of a stereo pair"""
+import numpy as np
+
+
+def clip_rect(rect, width, height, grow=0):
+    x1, y1, x2, y2 = (int(v) for v in rect)
+    return max(0, x1 - grow), max(0, y1 - grow), min(width, x2 + grow), min(height, y2 + grow)
+
+
+def matching_window(rect, search_range, padding, width, height):
+    """
+    Region of the image pair SGBM needs to produce valid disparity inside rect.
+
+    The window extends search_range pixels to the left, because a left-image
+    pixel at x is matched against right-image pixels down to x - search_range,
+    and padding pixels on every side so path aggregation is not cut at the rect.
+    """
+    x1, y1, x2, y2 = rect
+    return (
+        max(0, x1 - search_range - padding),
+        max(0, y1 - padding),
+        min(width, x2 + padding),
+        min(height, y2 + padding)
+    )
+
+
+def _overlaps(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _area(rect):
+    return (rect[2] - rect[0]) * (rect[3] - rect[1])
+
+
+def merge_regions(rects, search_range, padding, width, height):
+    """
+    Grow rects by padding, clip them to the frame and merge those whose
+    matching windows overlap, as long as the merged window is not larger
+    than the two windows computed separately.
+
+    Returns:
+        list of (target_rect, window_rect) pairs
+    """
+    groups = []
+    for rect in rects:
+        target = clip_rect(rect, width, height, grow=padding)
+        if target[2] <= target[0] or target[3] <= target[1]:
+            continue
+        window = matching_window(target, search_range, padding, width, height)
+        merged = True
+        while merged:
+            merged = False
+            for i, (other_target, other_window) in enumerate(groups):
+                if not _overlaps(window, other_window):
+                    continue
+                union = (min(target[0], other_target[0]), min(target[1], other_target[1]),
+                         max(target[2], other_target[2]), max(target[3], other_target[3]))
+                union_window = matching_window(union, search_range, padding, width, height)
+                if _area(union_window) > _area(window) + _area(other_window):
+                    continue
+                target, window = union, union_window
+                del groups[i]
+                merged = True
+                break
+        groups.append((target, window))
+    return groups
+
+
+def compute_regions(stereo, left_image, right_image, regions, out):
+    """
+    Run the matcher on every window and write the disparity of each target into out.
+
+    Args:
+        stereo: configured cv2.StereoSGBM matcher
+        regions: (target_rect, window_rect) pairs from merge_regions
+        out: float32 full-frame disparity map updated in place
+    """
+    for (tx1, ty1, tx2, ty2), (wx1, wy1, wx2, wy2) in regions:
+        raw = stereo.compute(left_image[wy1:wy2, wx1:wx2], right_image[wy1:wy2, wx1:wx2])
+        region = raw[ty1 - wy1:ty2 - wy1, tx1 - wx1:tx2 - wx1]
+        np.multiply(region, 1.0 / 16.0, out=out[ty1:ty2, tx1:tx2], casting='unsafe')
+    return out
@@ -0,0 +1,54 @@
+"""SGBM depth processor restricted to regions of interest"""
+import threading
+import numpy as np
+from .sgbm_processor import SGBMProcessor
+from .region_matcher import merge_regions, compute_regions
+from ..config.depth_config import ROI_DEPTH_CONFIG
+
+class ROISGBMProcessor(SGBMProcessor):
+    """
+    Computes disparity only inside the detection / track boxes set with set_rois.
+
+    Pixels outside the ROIs keep the value from the last time they were computed,
+    and a full-frame pass runs every full_refresh_interval frames.
+    """
+    def __init__(self, config=None, roi_config=None):
+        super().__init__(config)
+        roi_config = roi_config or ROI_DEPTH_CONFIG
+        self.padding = roi_config['padding']
+        self.full_refresh_interval = roi_config['full_refresh_interval']
+        self.search_range = self.min_disp + self.num_disp
+        self._rois = []
+        self._lock = threading.Lock()
+        self._disparity = None
+        self._frame_count = 0
+
+    def set_quality(self, num_disparities=None, scale=None):
+        """The search range is baked into the ROI margins; not adjustable at runtime"""
+        return False
+
+    def set_rois(self, rois):
+        with self._lock:
+            self._rois = list(rois)
+
+    def _needs_full_refresh(self, shape):
+        if self._disparity is None or self._disparity.shape != shape:
+            return True
+        return (self.full_refresh_interval > 0 and
+                self._frame_count % self.full_refresh_interval == 0)
+
+    def compute_depth(self, left_image, right_image):
+        with self._lock:
+            rois = self._rois
+
+        if self._needs_full_refresh(left_image.shape[:2]):
+            self._disparity = self.stereo.compute(left_image, right_image).astype(np.float32) / 16.0
+        elif rois:
+            height, width = left_image.shape[:2]
+            regions = merge_regions(rois, self.search_range, self.padding, width, height)
+            compute_regions(self.stereo, left_image, right_image, regions, self._disparity)
+        self._frame_count += 1
+
+        # The internal map is updated in place next frame, so hand out a copy
+        disparity = self._disparity.copy()
+        return disparity, self.normalize(disparity)
@@ -2,36 +2,86 @@
 import cv2
 import numpy as np
 from .depth_processor_base import DepthProcessorBase
-from ..config.depth_config import SGBM_CONFIG
+from ..config.depth_config import SGBM_CONFIG, DEPTH_CONFIG
 
 class SGBMProcessor(DepthProcessorBase):
-    def __init__(self):
-        self.window_size = SGBM_CONFIG['window_size']
-        self.min_disp = SGBM_CONFIG['min_disparity']
-        self.num_disp = SGBM_CONFIG['num_disparities']
+    def __init__(self, config=None, normalize_output=None):
+        self.config = config or SGBM_CONFIG
+        if normalize_output is None:
+            normalize_output = DEPTH_CONFIG['normalize_output']
+        self.normalize_output = normalize_output
+        self.window_size = self.config['window_size']
+        self.min_disp = self.config['min_disparity']
+        self.num_disp = self.config['num_disparities']
+        self.scale = 1.0
         
-        self.stereo = cv2.StereoSGBM_create(
-            minDisparity=self.min_disp,
-            numDisparities=self.num_disp,
-            blockSize=self.window_size,
-            P1=8 * 3 * self.window_size ** 2,
-            P2=32 * 3 * self.window_size ** 2,
-            disp12MaxDiff=SGBM_CONFIG['disp12_max_diff'],
-            uniquenessRatio=SGBM_CONFIG['uniqueness_ratio'],
-            speckleWindowSize=SGBM_CONFIG['speckle_window_size'],
-            speckleRange=SGBM_CONFIG['speckle_range']
+        self.stereo = self.create_matcher(self.min_disp, self.num_disp)
+        
+    def create_matcher(self, min_disparity, num_disparities, window_size=None):
+        window_size = window_size or self.window_size
+        return cv2.StereoSGBM_create(
+            minDisparity=min_disparity,
+            numDisparities=num_disparities,
+            blockSize=window_size,
+            P1=8 * 3 * window_size ** 2,
+            P2=32 * 3 * window_size ** 2,
+            disp12MaxDiff=self.config['disp12_max_diff'],
+            uniquenessRatio=self.config['uniqueness_ratio'],
+            speckleWindowSize=self.config['speckle_window_size'],
+            speckleRange=self.config['speckle_range']
         )
         
+    def set_quality(self, num_disparities=None, scale=None):
+        """
+        Change the disparity search range and/or the matching resolution.
+
+        With scale < 1 the pair is downsampled before matching and the
+        disparity is upsampled back, in full-resolution pixels.
+        """
+        if num_disparities is not None:
+            self.num_disp = num_disparities
+        if scale is not None:
+            self.scale = scale
+        self.stereo = self.create_matcher(
+            int(self.min_disp * self.scale),
+            max(16, int(np.ceil(self.num_disp * self.scale / 16.0)) * 16)
+        )
+        return True
+
     def compute_depth(self, left_image, right_image):
+        if self.scale != 1.0:
+            return self._compute_scaled(left_image, right_image)
+
         # Compute disparity
         disparity = self.stereo.compute(left_image, right_image).astype(np.float32) / 16.0
         
-        # Normalize disparity for visualization
-        disparity_normalized = cv2.normalize(
+        return disparity, self.normalize(disparity)
+
+    def _compute_scaled(self, left_image, right_image):
+        height, width = left_image.shape[:2]
+        raw = self.stereo.compute(
+            cv2.resize(left_image, None, fx=self.scale, fy=self.scale,
+                       interpolation=cv2.INTER_AREA),
+            cv2.resize(right_image, None, fx=self.scale, fy=self.scale,
+                       interpolation=cv2.INTER_AREA)
+        )
+        disparity = raw.astype(np.float32) * (1.0 / (16.0 * self.scale))
+        disparity[raw < int(self.min_disp * self.scale) * 16] = self.min_disp - 1
+        disparity = cv2.resize(disparity, (width, height), interpolation=cv2.INTER_NEAREST)
+        return disparity, self.normalize(disparity)
+    
+    def normalize(self, disparity):
+        """
+        Min/max normalize disparity to uint8 for display.
+
+        Returns None when normalize_output is off; FrameRenderer colorizes
+        the raw disparity over the fixed matcher range instead.
+        """
+        if not self.normalize_output:
+            return None
+        return cv2.normalize(
             disparity, None,
             alpha=0, beta=255,
             norm_type=cv2.NORM_MINMAX,
             dtype=cv2.CV_8U
-        )
-        
-        return disparity, disparity_normalized
\ No newline at end of file
+        )
\ No newline at end of file
@@ -1,11 +1,59 @@
 """Data preparation utilities for YOLO training"""
 import os
 import shutil
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import cv2
-import random
+from .dataset_files import IMAGE_EXTENSIONS, LABEL_EXTENSIONS, scan_files
+from .label_index import LabelIndex
+from .training_config import TRAINING_CONFIG
 from ..utils.exceptions import DataPreparationError
 
+SPLIT_MODES = ('hardlink', 'symlink', 'reflink', 'copy')
+MANIFEST_NAME = 'split_manifest.json'
+FICLONE = 0x40049409  # Linux ioctl：在支援的檔案系統（btrfs、XFS）上共用資料區塊
+
+
+def assign_split(name, seed, train_ratio):
+    """依檔名與種子決定分到 train 或 val；新增檔案不會改變既有檔案的分配"""
+    digest = hashlib.blake2b(f"{seed}:{name}".encode(), digest_size=8).digest()
+    return 'train' if int.from_bytes(digest, 'big') / 2 ** 64 < train_ratio else 'val'
+
+
+def reflink(source, target):
+    import fcntl
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def place_file(source, target, mode):
+    """
+    以指定方式建立 target；連結失敗（跨裝置、不支援等）時改為複製
+
+    Returns:
+        True 表示改用了複製
+    """
+    try:
+        os.unlink(target)
+    except FileNotFoundError:
+        pass
+    try:
+        if mode == 'hardlink':
+            os.link(source, target)
+        elif mode == 'symlink':
+            os.symlink(os.path.abspath(source), target)
+        elif mode == 'reflink':
+            reflink(source, target)
+        else:
+            shutil.copy2(source, target)
+            return False
+        return False
+    except OSError:
+        shutil.copy2(source, target)
+        return True
+
 class DataPreparation:
     def __init__(self, dataset_path):
         """
@@ -31,63 +79,171 @@ class DataPreparation:
         except Exception as e:
             raise DataPreparationError(f"創建目錄結構失敗: {str(e)}")
             
-    def split_dataset(self, train_ratio=0.8):
+    def load_manifest(self):
+        """讀取上次分割的清單；不存在或損壞時返回 None"""
+        try:
+            return json.loads((self.dataset_path / MANIFEST_NAME).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+            
+    def _write_manifest(self, manifest):
+        path = self.dataset_path / MANIFEST_NAME
+        tmp = path.with_suffix('.json.tmp')
+        tmp.write_text(json.dumps(manifest))
+        os.replace(tmp, path)
+        
+    def split_dataset(self, train_ratio=0.8, mode=None, seed=None, workers=None):
         """
         分割數據集為訓練集和驗證集
         
+        每個檔案依種子與檔名決定分到哪一組，並以連結或複製放到 train/val。
+        分割結果寫入 split_manifest.json，再次執行時只處理新增、內容變更、
+        分組改變或 train/val 中目標已不存在的檔案，並移除來源已刪除的檔案。
+        
         Args:
             train_ratio (float): 訓練集比例 (0-1)
+            mode (str): 'hardlink'、'symlink'、'reflink' 或 'copy'
+            seed (int): 分割用的隨機種子
+            workers (int): 平行處理的執行緒數
+            
+        Returns:
+            dict: 各組數量與本次處理的檔案數
         """
-        try:
-            # 獲取所有圖片文件
-            image_files = list(self.images_path.glob('*.jpg')) + \
-                         list(self.images_path.glob('*.png'))
+        mode = mode or TRAINING_CONFIG['split_mode']
+        seed = TRAINING_CONFIG['split_seed'] if seed is None else seed
+        workers = workers or TRAINING_CONFIG['split_workers']
+        if mode not in SPLIT_MODES:
+            raise DataPreparationError(f"不支援的分割方式: {mode}")
             
-            # 隨機打亂
-            random.shuffle(image_files)
+        try:
+            # 圖片與標籤目錄各掃描一次
+            images = scan_files(self.images_path, IMAGE_EXTENSIONS)
+            labels = scan_files(self.labels_path, LABEL_EXTENSIONS)
             
-            # 計算分割點
-            split_idx = int(len(image_files) * train_ratio)
-            train_files = image_files[:split_idx]
-            val_files = image_files[split_idx:]
+            # 清單只記錄來源狀態，目標是否還在要看 train/val 目錄本身
+            self.setup_directory_structure()
+            placed = {
+                split: (
+                    scan_files(self.dataset_path / split / 'images', IMAGE_EXTENSIONS),
+                    scan_files(self.dataset_path / split / 'labels', LABEL_EXTENSIONS)
+                )
+                for split in ('train', 'val')
+            }
             
-            # 複製文件到對應目錄
-            for files, target_dir in [(train_files, self.train_path),
-                                    (val_files, self.val_path)]:
-                for img_path in files:
-                    # 複製圖片
-                    shutil.copy2(img_path, target_dir / 'images' / img_path.name)
+            manifest = self.load_manifest()
+            previous = manifest['files'] if manifest is not None else {}
+            # 換了建立方式時，所有檔案都要重新放置
+            relink = manifest is not None and manifest.get('mode') != mode
+                
+            files = {}
+            tasks = []   # (來源, 目標)
+            removals = []
+            for name, (path, size, mtime) in images.items():
+                stem = os.path.splitext(name)[0]
+                label = labels.get(f"{stem}.txt")
+                split = assign_split(name, seed, train_ratio)
+                entry = {
+                    'split': split,
+                    'image': [size, mtime],
+                    'label': [label[1], label[2]] if label else None
+                }
+                files[name] = entry
+                old = previous.get(name)
+                if old is not None and old['split'] != split:
+                    removals.append((old['split'], name, stem))
+                    old = None
+                if relink:
+                    old = None
+                target_dir = self.dataset_path / split
+                placed_images, placed_labels = placed[split]
+                if old is None or old['image'] != entry['image'] or name not in placed_images:
+                    tasks.append((path, target_dir / 'images' / name))
+                if label and (old is None or old['label'] != entry['label'] or
+                              f"{stem}.txt" not in placed_labels):
+                    tasks.append((label[0], target_dir / 'labels' / f"{stem}.txt"))
+                elif not label and old is not None and old['label']:
+                    removals.append((split, None, stem))
                     
-                    # 複製對應的標籤文件
-                    label_path = self.labels_path / f"{img_path.stem}.txt"
-                    if label_path.exists():
-                        shutil.copy2(label_path, target_dir / 'labels' / f"{img_path.stem}.txt")
+            for name, old in previous.items():
+                if name not in files:
+                    removals.append((old['split'], name, os.path.splitext(name)[0]))
+                    
+            for split, name, stem in removals:
+                split_path = self.dataset_path / split
+                paths = [split_path / 'labels' / f"{stem}.txt"]
+                if name is not None:
+                    paths.append(split_path / 'images' / name)
+                for path in paths:
+                    try:
+                        path.unlink()
+                    except FileNotFoundError:
+                        pass
                         
+            # 連結與複製都是 I/O，以執行緒平行處理
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                fallbacks = sum(executor.map(
+                    lambda task: place_file(task[0], task[1], mode), tasks
+                ))
+                
+            self._write_manifest({
+                'seed': seed,
+                'train_ratio': train_ratio,
+                'mode': mode,
+                'files': files
+            })
+        except DataPreparationError:
+            raise
         except Exception as e:
             raise DataPreparationError(f"分割數據集失敗: {str(e)}")
             
-    def verify_dataset(self):
-        """驗證數據集的完整性"""
+        counts = {'train': 0, 'val': 0}
+        for entry in files.values():
+            counts[entry['split']] += 1
+        print(f"分割完成: train {counts['train']} / val {counts['val']}，"
+              f"本次處理 {len(tasks)} 個檔案，移除 {len(removals)} 項")
+        if fallbacks:
+            print(f"  - 警告: {fallbacks} 個檔案無法以 {mode} 建立，已改為複製")
+        return dict(counts, processed=len(tasks), removed=len(removals), fallbacks=fallbacks)
+            
+    def verify_dataset(self, num_classes=None, workers=None):
+        """
+        驗證數據集的完整性
+        
+        以 LabelIndex 平行解析標籤內容（未變更的標籤檔沿用上次的索引），
+        檢查缺少標籤的圖片、沒有圖片的標籤、格式錯誤、座標超出範圍與類別編號。
+        
+        Args:
+            num_classes (int): 類別數量，提供時檢查類別編號
+            workers (int): 解析標籤的程序數
+            
+        Returns:
+            dict: {分割名稱: LabelIndex.report() 的結果}
+        """
+        workers = workers or TRAINING_CONFIG['index_workers']
+        reports = {}
         try:
             for split in ['train', 'val']:
-                split_path = self.dataset_path / split
-                images = list((split_path / 'images').glob('*.jpg')) + \
-                        list((split_path / 'images').glob('*.png'))
-                labels = list((split_path / 'labels').glob('*.txt'))
+                index = LabelIndex(self.dataset_path / split).build(workers)
+                report = index.report(num_classes)
+                reports[split] = report
                 
                 print(f"{split} 集合統計:")
-                print(f"  - 圖片數量: {len(images)}")
-                print(f"  - 標籤數量: {len(labels)}")
-                
-                # 檢查是否每張圖片都有對應的標籤
-                missing_labels = []
-                for img in images:
-                    label_path = split_path / 'labels' / f"{img.stem}.txt"
-                    if not label_path.exists():
-                        missing_labels.append(img.name)
+                print(f"  - 圖片數量: {report['images']}")
+                print(f"  - 標籤數量: {report['labels']}（框 {report['boxes']} 個，"
+                      f"重新解析 {index.parsed} 個檔案）")
+                print(f"  - 類別分布: {report['class_histogram']}")
                 
-                if missing_labels:
-                    print(f"  - 警告: {len(missing_labels)} 張圖片缺少標籤文件")
+                warnings = [
+                    ('missing_labels', '張圖片缺少標籤文件'),
+                    ('orphan_labels', '個標籤文件沒有對應的圖片'),
+                    ('malformed', '個標籤文件含有格式錯誤的行'),
+                    ('out_of_range', '個標籤文件含有超出範圍的座標'),
+                    ('bad_class', '個標籤文件含有無效的類別編號'),
+                ]
+                for key, message in warnings:
+                    if report[key]:
+                        print(f"  - 警告: {len(report[key])} {message}")
                     
         except Exception as e:
-            raise DataPreparationError(f"驗證數據集失敗: {str(e)}")
\ No newline at end of file
+            raise DataPreparationError(f"驗證數據集失敗: {str(e)}")
+        return reports
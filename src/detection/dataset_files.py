@@ -0,0 +1,24 @@
+"""Directory scanning shared by dataset preparation, label indexing and image caching"""
+import os
+
+IMAGE_EXTENSIONS = ('.jpg', '.png')
+LABEL_EXTENSIONS = ('.txt',)
+
+
+def scan_files(directory, extensions):
+    """
+    以單次 os.scandir 列出目錄中的檔案
+
+    Returns:
+        {檔名: (路徑, 大小, mtime_ns)}；目錄不存在時為空
+    """
+    files = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(extensions) and entry.is_file():
+                    stat = entry.stat()
+                    files[entry.name] = (entry.path, stat.st_size, stat.st_mtime_ns)
+    except FileNotFoundError:
+        pass
+    return files
@@ -0,0 +1,25 @@
+"""Decides on which frames the detector runs"""
+from ..config.detection_config import DETECTION_SCHEDULE_CONFIG
+
+
+class DetectionScheduler:
+    def __init__(self, detect_interval=None, uncertainty_threshold=None):
+        """
+        Args:
+            detect_interval: run the detector every N frames
+            uncertainty_threshold: run early when track position std (px) exceeds this
+        """
+        self.detect_interval = DETECTION_SCHEDULE_CONFIG['detect_interval'] \
+            if detect_interval is None else detect_interval
+        self.uncertainty_threshold = DETECTION_SCHEDULE_CONFIG['uncertainty_threshold'] \
+            if uncertainty_threshold is None else uncertainty_threshold
+        self._last_detect_index = None
+
+    def should_detect(self, frame_index, uncertainty=0.0):
+        if (self.detect_interval <= 1 or
+                self._last_detect_index is None or
+                frame_index - self._last_detect_index >= self.detect_interval or
+                uncertainty > self.uncertainty_threshold):
+            self._last_detect_index = frame_index
+            return True
+        return False
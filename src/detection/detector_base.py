@@ -8,4 +8,12 @@ class DetectorBase(ABC):
     
     @abstractmethod
     def draw_detections(self, image, results):
-        pass
\ No newline at end of file
+        pass
+    
+    def detect_batch(self, images):
+        """逐張檢測多張影像；支援批次推論的檢測器應覆寫此方法"""
+        return [self.detect(image) for image in images]
+    
+    def set_input_size(self, imgsz):
+        """調整推論輸入尺寸；輸入尺寸固定的檢測器返回 False"""
+        return False
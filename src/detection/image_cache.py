@@ -0,0 +1,245 @@
+"""Pre-decoded, resized training images in one memory-mapped file"""
+import argparse
+import hashlib
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import cv2
+import numpy as np
+from .dataset_files import IMAGE_EXTENSIONS, scan_files
+
+
+def resize_for_training(image, img_size):
+    """與 ultralytics 的 rect 載入相同：長邊縮放到 img_size，保持長寬比"""
+    h0, w0 = image.shape[:2]
+    r = img_size / max(h0, w0)
+    if r != 1:
+        w = min(math.ceil(w0 * r), img_size)
+        h = min(math.ceil(h0 * r), img_size)
+        image = cv2.resize(image, (w, h), interpolation=cv2.INTER_LINEAR)
+    return image
+
+
+class ImageCache:
+    """
+    一個圖片目錄解碼並縮放後的快取
+
+    所有圖片依序存放在 image_cache_<img_size>.bin，旁邊的 .npz 記錄每張圖片
+    的位移、縮放後尺寸、原始尺寸與檔名。每個程序只把整個快取檔唯讀 memmap
+    一次，讀取時從映射複製出該張圖片，不需解碼；返回的陣列屬於呼叫者，資料
+    增強就地修改也不影響快取檔或其他讀取，且不會每張圖片各佔一個檔案描述符。
+    來源檔案（檔名、大小、mtime）或 img_size 改變時需重建。
+    """
+    def __init__(self, image_dir, img_size):
+        """
+        Args:
+            image_dir: 訓練或驗證圖片目錄，例如 dataset/train/images
+            img_size: 訓練輸入尺寸
+        """
+        self.image_dir = Path(image_dir)
+        self.img_size = img_size
+        self.data_path = self.image_dir.parent / f'image_cache_{img_size}.bin'
+        self.index_path = self.image_dir.parent / f'image_cache_{img_size}.npz'
+        self._lookup = None
+        self._data = None
+
+    def _source_key(self, files):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(str(self.img_size).encode())
+        for name in sorted(files):
+            _, size, mtime = files[name]
+            digest.update(f'{name}:{size}:{mtime};'.encode())
+        return digest.hexdigest()
+
+    def _load_index(self):
+        with np.load(self.index_path) as data:
+            self.key = str(data['key'])
+            self.names = data['names']
+            self.offsets = data['offsets']
+            self.shapes = data['shapes']
+            self.original_shapes = data['original_shapes']
+
+    def is_valid(self, files=None):
+        """快取存在且與目前的來源檔案、img_size 相符"""
+        files = files if files is not None else scan_files(self.image_dir, IMAGE_EXTENSIONS)
+        try:
+            self._load_index()
+        except (FileNotFoundError, ValueError, KeyError, OSError):
+            return False
+        return self.key == self._source_key(files) and self.data_path.exists()
+
+    def _decode(self, path):
+        image = cv2.imread(path)
+        if image is None:
+            raise FileNotFoundError(f"無法讀取圖片: {path}")
+        return image.shape[:2], np.ascontiguousarray(resize_for_training(image, self.img_size))
+
+    def build(self, workers=8):
+        """平行解碼所有圖片並依序寫入快取檔（cv2 解碼時會釋放 GIL）"""
+        files = scan_files(self.image_dir, IMAGE_EXTENSIONS)
+        names = sorted(files)
+        offsets = np.zeros(len(names), dtype=np.int64)
+        shapes = np.zeros((len(names), 3), dtype=np.int32)
+        original_shapes = np.zeros((len(names), 2), dtype=np.int32)
+        tmp = self.data_path.with_name(self.data_path.name + '.tmp')
+        offset = 0
+        with open(tmp, 'wb') as f, ThreadPoolExecutor(max_workers=workers) as executor:
+            decoded = executor.map(self._decode, [files[name][0] for name in names])
+            for i, (original_shape, image) in enumerate(decoded):
+                f.write(image.data)
+                offsets[i] = offset
+                shapes[i] = image.shape
+                original_shapes[i] = original_shape
+                offset += image.nbytes
+        os.replace(tmp, self.data_path)
+
+        index_tmp = self.index_path.with_name(self.index_path.name + '.tmp')
+        with open(index_tmp, 'wb') as f:
+            np.savez(f, key=self._source_key(files), names=np.array(names, dtype=str),
+                     offsets=offsets, shapes=shapes, original_shapes=original_shapes)
+        os.replace(index_tmp, self.index_path)
+        self._load_index()
+        self._lookup = None
+        self._data = None
+        print(f"圖片快取已建立: {len(names)} 張，{offset / 2 ** 20:.0f} MB -> {self.data_path}")
+
+    def ensure(self, workers=8):
+        """快取無效時重建，返回自身"""
+        if not self.is_valid():
+            self.build(workers)
+        return self
+
+    def lookup(self, path):
+        """圖片路徑在快取中的索引，不在快取中時為 None"""
+        if self._lookup is None:
+            self._lookup = {name: i for i, name in enumerate(self.names.tolist())}
+        return self._lookup.get(os.path.basename(path))
+
+    def get(self, i):
+        """
+        Returns:
+            (影像, 原始 (h, w), 縮放後 (h, w))，與 ultralytics load_image 相同
+        """
+        if self._data is None:
+            self._data = np.memmap(self.data_path, dtype=np.uint8, mode='r')
+        shape = tuple(int(v) for v in self.shapes[i])
+        start = int(self.offsets[i])
+        image = np.array(self._data[start:start + int(np.prod(shape))]).reshape(shape)
+        return image, tuple(int(v) for v in self.original_shapes[i]), shape[:2]
+
+
+def load_cached_image(dataset, i, image_cache):
+    """
+    與 ultralytics BaseDataset.load_image 相同的流程，只把解碼換成讀取快取
+
+    訓練時（dataset.augment）影像放進 ims / im_hw0 / im_hw 並加入 buffer，
+    mosaic 從 buffer 挑選其他圖片；超過 max_buffer_length 時釋放最舊的一張。
+
+    Returns:
+        (影像, 原始 (h, w), 縮放後 (h, w))；圖片不在快取中時為 None
+    """
+    if dataset.ims[i] is not None:
+        return dataset.ims[i], dataset.im_hw0[i], dataset.im_hw[i]
+    j = image_cache.lookup(dataset.im_files[i])
+    if j is None:
+        return None
+    image, original_hw, resized_hw = image_cache.get(j)
+    if dataset.augment:
+        dataset.ims[i], dataset.im_hw0[i], dataset.im_hw[i] = image, original_hw, resized_hw
+        dataset.buffer.append(i)
+        if 1 < len(dataset.buffer) >= dataset.max_buffer_length:
+            k = dataset.buffer.pop(0)
+            if getattr(dataset, 'cache', None) != 'ram':
+                dataset.ims[k], dataset.im_hw0[k], dataset.im_hw[k] = None, None, None
+    return image, original_hw, resized_hw
+
+
+class BufferedDataset:
+    """只有 load_image 所需欄位的資料集替身，用於不安裝 ultralytics 時檢查快取"""
+    def __init__(self, im_files, augment=True, max_buffer_length=8):
+        self.im_files = list(im_files)
+        self.augment = augment
+        self.max_buffer_length = max_buffer_length
+        self.cache = None
+        self.buffer = []
+        self.ims = [None] * len(self.im_files)
+        self.im_hw0 = [None] * len(self.im_files)
+        self.im_hw = [None] * len(self.im_files)
+
+
+def check_cache(image_cache, max_buffer_length=8):
+    """
+    以 BufferedDataset 讀過快取中的每張圖片，確認內容與直接解碼相同，
+    且 buffer / ims 的維護與 ultralytics 一致
+
+    Returns:
+        檢查的圖片數
+    """
+    files = scan_files(image_cache.image_dir, IMAGE_EXTENSIONS)
+    names = sorted(files)
+    dataset = BufferedDataset([files[name][0] for name in names],
+                              max_buffer_length=max_buffer_length)
+    for i, name in enumerate(names):
+        image, original_hw, resized_hw = load_cached_image(dataset, i, image_cache)
+        decoded = cv2.imread(files[name][0])
+        expected = resize_for_training(decoded, image_cache.img_size)
+        if original_hw != decoded.shape[:2] or not np.array_equal(image, expected):
+            raise ValueError(f"快取內容與原圖不符: {name}")
+        if resized_hw != image.shape[:2] or dataset.buffer[-1] != i:
+            raise ValueError(f"buffer 維護錯誤: {name}")
+        if len(dataset.buffer) > max(max_buffer_length, 1):
+            raise ValueError("buffer 超出 max_buffer_length")
+        buffered = set(dataset.buffer)
+        if any((dataset.ims[k] is not None) != (k in buffered) for k in range(i + 1)):
+            raise ValueError("ims 與 buffer 不一致")
+    return len(names)
+
+
+def cached_trainer_class(workers=8):
+    """
+    建立讀取 ImageCache 的 DetectionTrainer 子類別
+
+    ultralytics 延後到此才匯入；傳給 YOLO.train(trainer=...) 使用。
+    """
+    from ultralytics.data import YOLODataset
+    from ultralytics.models.yolo.detect import DetectionTrainer
+
+    class CachedYOLODataset(YOLODataset):
+        image_cache = None
+
+        def load_image(self, i, rect_mode=True):
+            if rect_mode and self.image_cache is not None:
+                loaded = load_cached_image(self, i, self.image_cache)
+                if loaded is not None:
+                    return loaded
+            return super().load_image(i, rect_mode)
+
+    class CachedDetectionTrainer(DetectionTrainer):
+        def build_dataset(self, img_path, mode='train', batch=None):
+            dataset = super().build_dataset(img_path, mode, batch)
+            if isinstance(dataset, YOLODataset) and os.path.isdir(img_path):
+                # build_dataset 的參數在各版本間不同，由父類別建立後只替換類別以覆寫 load_image
+                dataset.__class__ = CachedYOLODataset
+                dataset.image_cache = ImageCache(img_path, self.args.imgsz).ensure(workers)
+            return dataset
+
+    return CachedDetectionTrainer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='建立並檢查訓練圖片快取')
+    parser.add_argument('--images', type=str, required=True, help='圖片目錄，例如 dataset/train/images')
+    parser.add_argument('--imgsz', type=int, required=True, help='訓練輸入尺寸')
+    parser.add_argument('--workers', type=int, default=8, help='解碼執行緒數')
+    parser.add_argument('--check', action='store_true',
+                        help='以資料集替身讀過所有圖片，檢查內容與 buffer 維護')
+    args = parser.parse_args()
+
+    cache = ImageCache(args.images, args.imgsz).ensure(args.workers)
+    if args.check:
+        print(f"檢查通過: {check_cache(cache)} 張圖片")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Columnar index of YOLO label files for fast dataset verification"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+from .dataset_files import IMAGE_EXTENSIONS, LABEL_EXTENSIONS, scan_files
+
+INDEX_NAME = 'label_index.npz'
+CHUNK_SIZE = 512           # 每個工作程序一次解析的檔案數
+COORD_TOLERANCE = 1e-3     # 座標允許的誤差（正規化座標）
+
+
+def parse_label_files(paths):
+    """
+    解析多個 YOLO 標籤檔（在工作程序中執行）
+
+    Returns:
+        (每檔框數, 每檔格式錯誤行數, (N, 5) float32 [class, x, y, w, h])
+    """
+    counts = np.zeros(len(paths), dtype=np.int32)
+    malformed = np.zeros(len(paths), dtype=np.int32)
+    rows = []
+    for i, path in enumerate(paths):
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if not parts:
+                    continue
+                if len(parts) != 5:
+                    malformed[i] += 1
+                    continue
+                try:
+                    values = [float(v) for v in parts]
+                except ValueError:
+                    malformed[i] += 1
+                    continue
+                if not values[0].is_integer():
+                    malformed[i] += 1
+                    continue
+                rows.append(values)
+                counts[i] += 1
+    data = np.array(rows, dtype=np.float32).reshape(-1, 5)
+    return counts, malformed, data
+
+
+class LabelIndex:
+    """
+    一個分割（train / val）所有標籤的欄式索引
+
+    每個框一列：label_id、image_id、cls、x、y、w、h；每個標籤檔一列：
+    名稱、大小、mtime、框的起始位置與數量、格式錯誤行數。索引存成
+    <split>/label_index.npz，下次建立時大小與 mtime 未變的標籤檔直接沿用。
+    """
+    def __init__(self, split_path):
+        """
+        Args:
+            split_path: 含 images/ 與 labels/ 的分割目錄
+        """
+        self.split_path = Path(split_path)
+        self.index_path = self.split_path / INDEX_NAME
+        self.images = np.empty(0, dtype=str)
+        self.label_names = np.empty(0, dtype=str)
+        self.label_stat = np.empty((0, 2), dtype=np.int64)  # size, mtime_ns
+        self.label_start = np.empty(0, dtype=np.int64)
+        self.label_count = np.empty(0, dtype=np.int32)
+        self.label_malformed = np.empty(0, dtype=np.int32)
+        self.label_image = np.empty(0, dtype=np.int32)
+        self.boxes = np.empty((0, 5), dtype=np.float32)
+        self.reused = 0
+        self.parsed = 0
+
+    @property
+    def cls(self):
+        return self.boxes[:, 0].astype(np.int32)
+
+    @property
+    def box_label(self):
+        return np.repeat(np.arange(len(self.label_names), dtype=np.int32), self.label_count)
+
+    @property
+    def box_image(self):
+        return self.label_image[self.box_label]
+
+    def _load_previous(self):
+        try:
+            with np.load(self.index_path) as data:
+                return {key: data[key] for key in data.files}
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+
+    def build(self, workers=None):
+        """掃描目錄，只解析新增或變更的標籤檔，並寫回索引"""
+        images = scan_files(self.split_path / 'images', IMAGE_EXTENSIONS)
+        labels = scan_files(self.split_path / 'labels', LABEL_EXTENSIONS)
+
+        previous = self._load_previous()
+        cached = {}
+        if previous is not None:
+            for i, name in enumerate(previous['label_names'].tolist()):
+                cached[name] = i
+
+        names = sorted(labels)
+        stats = np.array([labels[name][1:] for name in names], dtype=np.int64).reshape(-1, 2)
+        to_parse = []
+        reuse = []
+        for i, name in enumerate(names):
+            j = cached.get(name)
+            if j is not None and tuple(previous['label_stat'][j]) == tuple(stats[i]):
+                reuse.append((i, j))
+            else:
+                to_parse.append(i)
+
+        counts = np.zeros(len(names), dtype=np.int32)
+        malformed = np.zeros(len(names), dtype=np.int32)
+        pieces = {}  # 標籤檔索引 -> (N, 5) 框
+        for i, j in reuse:
+            start = previous['label_start'][j]
+            counts[i] = previous['label_count'][j]
+            malformed[i] = previous['label_malformed'][j]
+            pieces[i] = previous['boxes'][start:start + counts[i]]
+
+        chunks = [to_parse[k:k + CHUNK_SIZE] for k in range(0, len(to_parse), CHUNK_SIZE)]
+        paths = [[labels[names[i]][0] for i in chunk] for chunk in chunks]
+        if len(chunks) > 1 and workers != 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(parse_label_files, paths))
+        else:
+            results = [parse_label_files(chunk_paths) for chunk_paths in paths]
+        for chunk, (chunk_counts, chunk_malformed, data) in zip(chunks, results):
+            offsets = np.concatenate(([0], np.cumsum(chunk_counts)))
+            for k, i in enumerate(chunk):
+                counts[i] = chunk_counts[k]
+                malformed[i] = chunk_malformed[k]
+                pieces[i] = data[offsets[k]:offsets[k + 1]]
+
+        self.images = np.array(sorted(images), dtype=str)
+        image_ids = {os.path.splitext(name)[0]: i for i, name in enumerate(self.images.tolist())}
+        self.label_names = np.array(names, dtype=str)
+        self.label_stat = stats
+        self.label_count = counts
+        self.label_malformed = malformed
+        self.label_start = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))[:-1]
+        self.label_image = np.array(
+            [image_ids.get(os.path.splitext(name)[0], -1) for name in names], dtype=np.int32
+        )
+        self.boxes = (np.concatenate([pieces[i] for i in range(len(names))])
+                      if names else np.empty((0, 5), dtype=np.float32))
+        self.reused = len(reuse)
+        self.parsed = len(to_parse)
+        self.save()
+        return self
+
+    def save(self):
+        tmp = self.index_path.with_name(INDEX_NAME + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez(
+                f,
+                images=self.images,
+                label_names=self.label_names,
+                label_stat=self.label_stat,
+                label_start=self.label_start,
+                label_count=self.label_count,
+                label_malformed=self.label_malformed,
+                label_image=self.label_image,
+                boxes=self.boxes
+            )
+        os.replace(tmp, self.index_path)
+
+    def report(self, num_classes=None):
+        """
+        從索引計算驗證結果
+
+        Args:
+            num_classes: 類別數量；提供時檢查類別編號是否超出範圍
+
+        Returns:
+            dict：數量、缺少標籤的圖片、孤立標籤、超出範圍的框、類別直方圖
+        """
+        cls, x, y, w, h = self.boxes.T
+        tol = COORD_TOLERANCE
+        out_of_range = (
+            (x < -tol) | (x > 1 + tol) | (y < -tol) | (y > 1 + tol) |
+            (w <= 0) | (h <= 0) |
+            (x - w / 2 < -tol) | (x + w / 2 > 1 + tol) |
+            (y - h / 2 < -tol) | (y + h / 2 > 1 + tol)
+        )
+        classes = cls.astype(np.int64)
+        bad_class = classes < 0
+        if num_classes is not None:
+            bad_class |= classes >= num_classes
+        histogram = np.bincount(classes[~bad_class & (classes >= 0)],
+                                minlength=num_classes or 0)
+
+        has_label = np.zeros(len(self.images), dtype=bool)
+        has_label[self.label_image[self.label_image >= 0]] = True
+        box_label = self.box_label
+        return {
+            'images': len(self.images),
+            'labels': len(self.label_names),
+            'boxes': len(self.boxes),
+            'missing_labels': self.images[~has_label].tolist(),
+            'orphan_labels': self.label_names[self.label_image < 0].tolist(),
+            'out_of_range': self.label_names[np.unique(box_label[out_of_range])].tolist(),
+            'out_of_range_boxes': int(out_of_range.sum()),
+            'bad_class': self.label_names[np.unique(box_label[bad_class])].tolist(),
+            'malformed': self.label_names[self.label_malformed > 0].tolist(),
+            'class_histogram': histogram.tolist()
+        }
@@ -1,5 +1,4 @@
 """YOLO model trainer implementation"""
-from ultralytics import YOLO
 from pathlib import Path
 from .training_config import TRAINING_CONFIG
 from ..utils.exceptions import TrainingError
@@ -18,24 +17,33 @@ class YOLOTrainer:
     def setup_model(self):
         """設置和初始化 YOLO 模型"""
         try:
+            # ultralytics / torch 匯入需要數秒，延後到實際建立模型時
+            from ultralytics import YOLO
             # 載入預訓練模型或創建新模型
             self.model = YOLO(self.config['model_type'])
         except Exception as e:
             raise TrainingError(f"模型初始化失敗: {str(e)}")
             
-    def train(self, data_yaml_path):
+    def train(self, data_yaml_path, **overrides):
         """
         訓練 YOLO 模型
         
         Args:
             data_yaml_path (str): 數據配置文件路徑
+            **overrides: 直接傳給 ultralytics 的其他參數，例如 project、name
         """
         if self.model is None:
             self.setup_model()
             
         try:
+            trainer = None
+            if self.config.get('image_cache'):
+                from .image_cache import cached_trainer_class
+                trainer = cached_trainer_class(self.config['workers'])
+                
             # 開始訓練
             results = self.model.train(
+                trainer=trainer,
                 data=data_yaml_path,
                 epochs=self.config['epochs'],
                 imgsz=self.config['img_size'],
@@ -54,7 +62,8 @@ class YOLOTrainer:
                 flipud=self.config['augmentation']['flipud'],
                 fliplr=self.config['augmentation']['fliplr'],
                 mosaic=self.config['augmentation']['mosaic'],
-                mixup=self.config['augmentation']['mixup']
+                mixup=self.config['augmentation']['mixup'],
+                **overrides
             )
             return results
             
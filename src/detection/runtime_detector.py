@@ -0,0 +1,218 @@
+"""ONNX Runtime / OpenVINO CPU detector implementation"""
+import ast
+import os
+import shutil
+import cv2
+import numpy as np
+from .detector_base import DetectorBase
+from ..config.detection_config import YOLO_CONFIG, RUNTIME_CONFIG
+from ..utils.exceptions import DetectionError
+
+# 匯出格式與快取檔案位置；{} 為權重路徑去掉副檔名再加上輸入尺寸
+EXPORT_FORMATS = {
+    'onnx': '{}.onnx',
+    'openvino': '{}_openvino_model',
+}
+
+
+class Boxes:
+    """與 ultralytics Boxes 相同的 data 欄位：(N, 6) 的 x1, y1, x2, y2, conf, cls"""
+    def __init__(self, data):
+        self.data = data
+
+    def __len__(self):
+        return len(self.data)
+
+
+class DetectionResult:
+    """單張影像的檢測結果，介面與 ultralytics Results 的 boxes / names 相容"""
+    def __init__(self, data, names):
+        self.boxes = Boxes(data)
+        self.names = names
+
+
+def export_model(model_path, backend, imgsz):
+    """
+    將 .pt 權重匯出為指定格式並快取
+
+    快取檔名包含 imgsz，且只在比 .pt 新時沿用；改變輸入尺寸或重新訓練
+    權重後會重新匯出。
+
+    Returns:
+        匯出後的模型路徑（與權重放在同一目錄）
+    """
+    if backend not in EXPORT_FORMATS:
+        raise DetectionError(f"不支援的推論後端: {backend}")
+    stem = os.path.splitext(model_path)[0]
+    artifact = EXPORT_FORMATS[backend].format(f'{stem}_{imgsz}')
+    if os.path.exists(artifact) and os.path.getmtime(artifact) >= os.path.getmtime(model_path):
+        return artifact
+
+    from ultralytics import YOLO
+    # ultralytics 固定輸出到權重旁不含尺寸的路徑，匯出後改名為快取路徑
+    exported = str(YOLO(model_path).export(format=backend, imgsz=imgsz))
+    if os.path.isdir(artifact):
+        shutil.rmtree(artifact)
+    os.replace(exported, artifact)
+    return artifact
+
+
+def letterbox(image, size):
+    """等比例縮放並補邊成 size x size，返回 (影像, 縮放比例, (左, 上) 補邊)"""
+    height, width = image.shape[:2]
+    scale = min(size / height, size / width)
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    left = (size - new_w) // 2
+    top = (size - new_h) // 2
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    canvas[top:top + new_h, left:left + new_w] = cv2.resize(
+        image, (new_w, new_h), interpolation=cv2.INTER_LINEAR
+    )
+    return canvas, scale, (left, top)
+
+
+class RuntimeDetector(DetectorBase):
+    """
+    以 ONNX Runtime 或 OpenVINO 在 CPU 上執行 YOLOv8 模型
+
+    第一次使用時將 .pt 權重匯出並快取在權重旁，之後直接載入匯出的模型，
+    不需要 torch。輸出格式與 YOLODetector 相同，可直接交給 AppInterface。
+    """
+    def __init__(self, model_path=None, backend='onnx', num_threads=None, imgsz=None):
+        """
+        Args:
+            model_path: .pt 權重路徑，或已匯出的 .onnx 檔 / OpenVINO 目錄
+            backend: 'onnx' 或 'openvino'
+            num_threads: intra-op 執行緒數，None 使用 RUNTIME_CONFIG
+            imgsz: 模型輸入尺寸
+        """
+        model_path = model_path or YOLO_CONFIG['model_path']
+        self.backend = backend
+        self.imgsz = imgsz or RUNTIME_CONFIG['imgsz']
+        self.num_threads = num_threads or RUNTIME_CONFIG['num_threads']
+        self.conf_threshold = YOLO_CONFIG['confidence_threshold']
+        self.nms_threshold = YOLO_CONFIG['nms_threshold']
+
+        if model_path.endswith('.pt'):
+            model_path = export_model(model_path, backend, self.imgsz)
+        if backend == 'onnx':
+            self._load_onnx(model_path)
+        elif backend == 'openvino':
+            self._load_openvino(model_path)
+        else:
+            raise DetectionError(f"不支援的推論後端: {backend}")
+
+    def _load_onnx(self, model_path):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.num_threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            model_path, options, providers=['CPUExecutionProvider']
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata['names']) if 'names' in metadata else {}
+        self._infer = lambda blob: self.session.run(None, {self.input_name: blob})[0]
+
+    def _load_openvino(self, model_path):
+        import openvino as ov
+        if os.path.isdir(model_path):
+            xml = [f for f in os.listdir(model_path) if f.endswith('.xml')]
+            if not xml:
+                raise DetectionError(f"找不到 OpenVINO 模型: {model_path}")
+            self.names = self._read_openvino_names(model_path)
+            model_path = os.path.join(model_path, xml[0])
+        else:
+            self.names = {}
+        core = ov.Core()
+        self.compiled = core.compile_model(
+            model_path, 'CPU', {'INFERENCE_NUM_THREADS': self.num_threads}
+        )
+        self._infer = lambda blob: self.compiled(blob)[0]
+
+    @staticmethod
+    def _read_openvino_names(model_dir):
+        metadata_path = os.path.join(model_dir, 'metadata.yaml')
+        if not os.path.exists(metadata_path):
+            return {}
+        import yaml
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f).get('names', {})
+
+    def preprocess(self, image):
+        """BGR 影像 -> (1, 3, imgsz, imgsz) float32 RGB 張量"""
+        canvas, scale, pad = letterbox(image, self.imgsz)
+        blob = cv2.dnn.blobFromImage(canvas, 1 / 255.0, swapRB=True)
+        return blob, scale, pad
+
+    def postprocess(self, output, scale, pad, shape):
+        """
+        解碼 YOLOv8 輸出 (1, 4 + 類別數, 錨點數) 並做類別內 NMS
+
+        Returns:
+            (N, 6) float32: x1, y1, x2, y2, conf, cls（原始影像座標）
+        """
+        predictions = output[0].T
+        class_scores = predictions[:, 4:]
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(class_ids)), class_ids]
+        keep = scores > self.conf_threshold
+        if not keep.any():
+            return np.empty((0, 6), dtype=np.float32)
+        predictions, scores, class_ids = predictions[keep], scores[keep], class_ids[keep]
+
+        # cx, cy, w, h -> 原圖的 x1, y1, x2, y2
+        boxes = np.empty((len(predictions), 4), dtype=np.float32)
+        boxes[:, :2] = predictions[:, :2] - predictions[:, 2:4] / 2
+        boxes[:, 2:] = predictions[:, :2] + predictions[:, 2:4] / 2
+        boxes[:, [0, 2]] -= pad[0]
+        boxes[:, [1, 3]] -= pad[1]
+        boxes /= scale
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, shape[1])
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, shape[0])
+
+        # 各類別的框平移到互不重疊的區域，一次 NMSBoxes 即為類別內 NMS
+        # （NMSBoxesBatched 需要 OpenCV 4.7 以上）
+        xywh = np.concatenate([boxes[:, :2], boxes[:, 2:] - boxes[:, :2]], axis=1)
+        xywh[:, :2] += class_ids[:, None].astype(np.float32) * (max(shape) + 1)
+        indices = cv2.dnn.NMSBoxes(
+            xywh.tolist(), scores.tolist(), self.conf_threshold, self.nms_threshold
+        )
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        indices = indices[np.argsort(-scores[indices])]
+        return np.concatenate([
+            boxes[indices],
+            scores[indices, None],
+            class_ids[indices, None].astype(np.float32)
+        ], axis=1).astype(np.float32)
+
+    def detect(self, image):
+        blob, scale, pad = self.preprocess(image)
+        output = self._infer(blob)
+        data = self.postprocess(np.asarray(output), scale, pad, image.shape[:2])
+        return DetectionResult(data, self.names)
+
+    def draw_detections(self, image, results):
+        annotated_image = image.copy()
+
+        for r in results.boxes.data:
+            x1, y1, x2, y2, score, class_id = r
+            x1, y1, x2, y2 = map(int, [x1, y1, x2, y2])
+
+            # Draw bounding box
+            cv2.rectangle(annotated_image, (x1, y1), (x2, y2), (0, 255, 0), 2)
+
+            # Add label with class name and confidence
+            label = f'{results.names.get(int(class_id), int(class_id))} {score:.2f}'
+            cv2.putText(
+                annotated_image,
+                label,
+                (x1, y1 - 10),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.5,
+                (0, 255, 0),
+                2
+            )
+
+        return annotated_image
@@ -0,0 +1,304 @@
+"""Resumable hyperparameter sweep over TRAINING_CONFIG"""
+import argparse
+import copy
+import csv
+import itertools
+import json
+import multiprocessing as mp
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from .training_config import TRAINING_CONFIG, SWEEP_CONFIG
+from ..utils.exceptions import TrainingError
+
+STATE_NAME = 'sweep_state.json'
+HISTORY_NAME = 'history.json'
+MAP_KEY = 'metrics/mAP50-95(B)'
+MAP50_KEY = 'metrics/mAP50(B)'
+
+
+def generate_trials(space, method='grid', trials=None, seed=0):
+    """
+    產生參數組合
+
+    Args:
+        space: {欄位: 候選值清單}
+        method: 'grid' 全部組合；'random' 以 seed 抽樣 trials 組（不重複）
+
+    Returns:
+        [{欄位: 值}]，順序固定，同樣的設定每次產生相同的 trial
+    """
+    keys = sorted(space)
+    combos = [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+    if method == 'grid':
+        return combos
+    if method == 'random':
+        rng = random.Random(seed)
+        return rng.sample(combos, min(trials or len(combos), len(combos)))
+    raise TrainingError(f"不支援的搜尋方式: {method}")
+
+
+def trial_config(params, sweep_config):
+    """把 trial 參數套用到 TRAINING_CONFIG 的副本"""
+    config = copy.deepcopy(TRAINING_CONFIG)
+    for key, value in params.items():
+        target = config
+        *parents, field = key.split('.')
+        for parent in parents:
+            target = target[parent]
+        if field not in target:
+            raise TrainingError(f"TRAINING_CONFIG 沒有欄位: {key}")
+        target[field] = value
+    if sweep_config['epochs']:
+        config['epochs'] = sweep_config['epochs']
+    config['workers'] = sweep_config['dataloader_workers']
+    return config
+
+
+def read_json(path, default=None):
+    try:
+        return json.loads(Path(path).read_text())
+    except (FileNotFoundError, ValueError):
+        return default
+
+
+def write_json(path, data):
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+
+def should_stop(trial_id, maps, output_dir, sweep_config):
+    """
+    其他 trial 在同一 epoch 的最佳 mAP 遠高於本 trial 時返回 True
+
+    只和已經訓練到該 epoch 的 trial 比較，因此先開始的 trial 不會被尚未
+    追上的 trial 影響。
+    """
+    epoch = len(maps)
+    if epoch < sweep_config['early_stop_min_epochs']:
+        return False
+    best_other = None
+    for history_path in Path(output_dir).glob(f'*/{HISTORY_NAME}'):
+        if history_path.parent.name == trial_id:
+            continue
+        other = read_json(history_path, {}).get('maps', [])
+        if len(other) >= epoch:
+            value = max(other[:epoch])
+            best_other = value if best_other is None else max(best_other, value)
+    if not best_other:
+        return False
+    return max(maps) < best_other * sweep_config['early_stop_ratio']
+
+
+def measure_latency(weights, img_size, runs):
+    """以空白影像量測單張推論延遲的中位數（毫秒）"""
+    import numpy as np
+    from ultralytics import YOLO
+    model = YOLO(weights)
+    image = np.zeros((img_size, img_size, 3), dtype=np.uint8)
+    for _ in range(3):
+        model(image, imgsz=img_size, verbose=False)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        model(image, imgsz=img_size, verbose=False)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2] * 1000.0
+
+
+def _init_worker(core_sets, threads):
+    """工作程序初始化：綁定一組 CPU 核心並限制執行緒數（在匯入 torch 之前）"""
+    cores = core_sets.get()
+    if cores and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+    for name in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[name] = str(threads)
+
+
+def run_trial(trial_id, params, data_yaml, output_dir, sweep_config):
+    """
+    在工作程序中訓練一個 trial；中斷過的 trial 從 weights/last.pt 繼續
+
+    Returns:
+        trial 結果 dict
+    """
+    import torch
+    from ultralytics import YOLO
+    from .model_trainer import YOLOTrainer
+    torch.set_num_threads(sweep_config['threads_per_worker'])
+
+    trial_dir = Path(output_dir) / trial_id
+    history_path = trial_dir / HISTORY_NAME
+    history = read_json(history_path, {'maps': [], 'maps50': [], 'finished': False,
+                                       'stopped': False})
+    config = trial_config(params, sweep_config)
+
+    def on_fit_epoch_end(trainer):
+        metrics = trainer.metrics or {}
+        history['maps'].append(float(metrics.get(MAP_KEY, 0.0)))
+        history['maps50'].append(float(metrics.get(MAP50_KEY, 0.0)))
+        if should_stop(trial_id, history['maps'], output_dir, sweep_config):
+            history['stopped'] = True
+            trainer.stop = True  # 在本 epoch 結束時停止，last.pt 已保存
+        write_json(history_path, history)
+
+    # 被提前停止的 trial 即使在寫入 finished 前中斷，也不再繼續訓練
+    if not history['finished'] and not history['stopped']:
+        last = trial_dir / 'weights' / 'last.pt'
+        if last.exists():
+            # ultralytics 從 checkpoint 恢復時沿用原本的參數與 epoch
+            model = YOLO(str(last))
+            model.add_callback('on_fit_epoch_end', on_fit_epoch_end)
+            model.train(resume=True)
+        else:
+            trial_dir.mkdir(parents=True, exist_ok=True)
+            write_json(history_path, history)
+            trainer = YOLOTrainer(config)
+            trainer.setup_model()
+            trainer.model.add_callback('on_fit_epoch_end', on_fit_epoch_end)
+            trainer.train(data_yaml, project=str(Path(output_dir).resolve()),
+                          name=trial_id, exist_ok=True)
+        history['finished'] = True
+        write_json(history_path, history)
+
+    best = trial_dir / 'weights' / 'best.pt'
+    latency = measure_latency(str(best), config['img_size'], sweep_config['latency_runs'])
+    maps = history['maps'] or [0.0]
+    best_epoch = max(range(len(maps)), key=maps.__getitem__)
+    return {
+        'status': 'stopped' if history['stopped'] else 'done',
+        'map': maps[best_epoch],
+        'map50': history['maps50'][best_epoch] if history['maps50'] else 0.0,
+        'epochs': len(history['maps']),
+        'latency_ms': latency
+    }
+
+
+class SweepRunner:
+    """
+    依 SWEEP_CONFIG 排程所有 trial，狀態寫在 <output_dir>/sweep_state.json
+
+    重新執行時已完成的 trial 直接略過，執行到一半的 trial 從 checkpoint
+    繼續；每個 trial 結束後更新 leaderboard.csv。
+    """
+    def __init__(self, data_yaml, sweep_config=None):
+        """
+        Args:
+            data_yaml (str): data.yaml 路徑
+            sweep_config (dict, optional): 默認使用 SWEEP_CONFIG
+        """
+        self.data_yaml = str(Path(data_yaml).resolve())
+        self.config = sweep_config or SWEEP_CONFIG
+        self.output_dir = Path(self.config['output_dir'])
+        self.state_path = self.output_dir / STATE_NAME
+
+    def load_state(self):
+        """讀取或建立 sweep 狀態；搜尋空間改變時新的組合會加在後面"""
+        state = read_json(self.state_path, {'trials': {}})
+        known = {json.dumps(t['params'], sort_keys=True): tid for tid, t in state['trials'].items()}
+        for params in generate_trials(self.config['space'], self.config['method'],
+                                      self.config['trials'], self.config['seed']):
+            key = json.dumps(params, sort_keys=True)
+            if key not in known:
+                trial_id = f"trial_{len(state['trials']):03d}"
+                state['trials'][trial_id] = {'params': params, 'status': 'pending'}
+                known[key] = trial_id
+        return state
+
+    def _core_sets(self):
+        """把可用核心切成每個工作程序一組"""
+        if hasattr(os, 'sched_getaffinity'):
+            cores = sorted(os.sched_getaffinity(0))
+        else:
+            cores = list(range(os.cpu_count() or 1))
+        size = self.config['threads_per_worker']
+        sets = []
+        for i in range(self.config['workers']):
+            chunk = cores[(i * size) % len(cores):][:size]
+            sets.append(chunk or cores[:size])
+        return sets
+
+    def run(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        state = self.load_state()
+        pending = [tid for tid, t in state['trials'].items() if t['status'] not in ('done', 'stopped')]
+        write_json(self.state_path, state)
+        print(f"共 {len(state['trials'])} 個 trial，待執行 {len(pending)} 個")
+
+        context = mp.get_context('spawn')
+        core_sets = context.Queue()
+        for cores in self._core_sets():
+            core_sets.put(cores)
+        with ProcessPoolExecutor(max_workers=self.config['workers'], mp_context=context,
+                                 initializer=_init_worker,
+                                 initargs=(core_sets, self.config['threads_per_worker'])) as executor:
+            futures = {}
+            for trial_id in pending:
+                trial = state['trials'][trial_id]
+                trial['status'] = 'queued'
+                futures[executor.submit(run_trial, trial_id, trial['params'], self.data_yaml,
+                                        str(self.output_dir), self.config)] = trial_id
+            write_json(self.state_path, state)
+
+            for future in as_completed(futures):
+                trial_id = futures[future]
+                trial = state['trials'][trial_id]
+                try:
+                    trial.update(future.result())
+                except Exception as e:
+                    trial['status'] = 'failed'
+                    trial['error'] = f"{type(e).__name__}: {e}"
+                    print(f"{trial_id} 失敗: {trial['error']}")
+                else:
+                    print(f"{trial_id} {trial['status']}: mAP50-95 {trial['map']:.4f}，"
+                          f"延遲 {trial['latency_ms']:.1f} ms")
+                write_json(self.state_path, state)
+                self.write_leaderboard(state)
+        return state
+
+    def write_leaderboard(self, state):
+        """依 mAP 排序寫出 leaderboard.csv"""
+        keys = sorted(self.config['space'])
+        rows = sorted(
+            ((tid, t) for tid, t in state['trials'].items() if 'map' in t),
+            key=lambda item: item[1]['map'], reverse=True
+        )
+        with open(self.output_dir / 'leaderboard.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['rank', 'trial', 'status', 'map50_95', 'map50', 'latency_ms',
+                             'epochs'] + keys)
+            for rank, (trial_id, trial) in enumerate(rows, 1):
+                writer.writerow([rank, trial_id, trial['status'], f"{trial['map']:.4f}",
+                                 f"{trial['map50']:.4f}", f"{trial['latency_ms']:.2f}",
+                                 trial['epochs']] + [trial['params'].get(k) for k in keys])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='YOLO 超參數搜尋')
+    parser.add_argument('--data', type=str, required=True, help='data.yaml 路徑（由 train.py 產生）')
+    parser.add_argument('--workers', type=int, default=None, help='同時訓練的 trial 數')
+    parser.add_argument('--output', type=str, default=None, help='輸出目錄')
+    args = parser.parse_args()
+
+    config = dict(SWEEP_CONFIG)
+    if args.workers is not None:
+        config['workers'] = args.workers
+    if args.output is not None:
+        config['output_dir'] = args.output
+
+    try:
+        SweepRunner(args.data, config).run()
+    except TrainingError as e:
+        print(f"錯誤: {str(e)}")
+        return 1
+    print(f"\n排行榜: {Path(config['output_dir']) / 'leaderboard.csv'}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,9 +1,7 @@
 """YOLO training script"""
 import argparse
 from pathlib import Path
-from data_preparation import DataPreparation
-from model_trainer import YOLOTrainer
-from training_config import TRAINING_CONFIG
+from .training_config import TRAINING_CONFIG
 from ..utils.exceptions import DataPreparationError, TrainingError
 
 def create_data_yaml(dataset_path, num_classes, class_names):
@@ -26,13 +24,22 @@ def main():
     parser.add_argument('--names', type=str, required=True, help='類別名稱，用逗號分隔')
     args = parser.parse_args()
     
+    # 解析參數後才匯入 OpenCV / ultralytics，--help 與參數錯誤時不需等待
+    from .data_preparation import DataPreparation
+    from .model_trainer import YOLOTrainer
+    
     try:
         # 準備數據集
         print("準備數據集...")
         data_prep = DataPreparation(args.dataset)
         data_prep.setup_directory_structure()
-        data_prep.split_dataset(TRAINING_CONFIG['train_ratio'])
-        data_prep.verify_dataset()
+        data_prep.split_dataset(
+            TRAINING_CONFIG['train_ratio'],
+            mode=TRAINING_CONFIG['split_mode'],
+            seed=TRAINING_CONFIG['split_seed'],
+            workers=TRAINING_CONFIG['split_workers']
+        )
+        data_prep.verify_dataset(args.classes, workers=TRAINING_CONFIG['index_workers'])
         
         # 創建 data.yaml
         class_names = [name.strip() for name in args.names.split(',')]
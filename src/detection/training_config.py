@@ -5,12 +5,17 @@ TRAINING_CONFIG = {
     # 數據集配置
     'dataset_path': 'dataset',
     'train_ratio': 0.8,
+    'split_mode': 'hardlink',  # 可選: hardlink, symlink, reflink, copy；連結失敗時改為複製
+    'split_seed': 0,           # 分割用的隨機種子，相同種子下每個檔案的分配固定不變
+    'split_workers': 8,        # 平行建立連結或複製的執行緒數
+    'index_workers': 8,        # 驗證數據集時平行解析標籤的程序數
     
     # 訓練參數
     'epochs': 100,
     'batch_size': 16,
     'img_size': 640,
     'workers': 8,
+    'image_cache': False,  # 預先解碼並縮放圖片存成 memmap 快取，避免每個 epoch 重新解碼
     
     # 模型配置
     'model_type': 'yolov8n.pt',  # 可選: yolov8n.pt, yolov8s.pt, yolov8m.pt, yolov8l.pt, yolov8x.pt
@@ -35,4 +40,25 @@ TRAINING_CONFIG = {
         'mosaic': 1.0,   # Mosaic augmentation
         'mixup': 0.0     # Mixup augmentation
     }
-}
\ No newline at end of file
+}
+
+# 超參數搜尋：每組參數是一個 trial，在多個工作程序中平行訓練
+SWEEP_CONFIG = {
+    'method': 'grid',           # 'grid' 全部組合, 'random' 隨機抽樣 trials 組
+    'trials': 16,               # random 模式的 trial 數量
+    'seed': 0,
+    'space': {                  # TRAINING_CONFIG 欄位，augmentation 內的欄位寫成 'augmentation.<名稱>'
+        'lr0': [0.001, 0.01],
+        'batch_size': [8, 16],
+        'img_size': [480, 640],
+        'augmentation.mosaic': [0.5, 1.0]
+    },
+    'epochs': None,             # None 沿用 TRAINING_CONFIG['epochs']
+    'workers': 2,               # 同時訓練的 trial 數
+    'threads_per_worker': 4,    # 每個工作程序綁定的 CPU 核心與執行緒數
+    'dataloader_workers': 2,    # 每個 trial 的資料載入程序數
+    'early_stop_min_epochs': 10,  # 至少訓練幾個 epoch 後才可能被提前停止
+    'early_stop_ratio': 0.7,    # mAP 低於其他 trial 同一 epoch 最佳值的此比例時停止
+    'latency_runs': 50,         # 量測推論延遲的次數
+    'output_dir': 'runs/sweep'
+}
@@ -1,21 +1,43 @@
 """YOLO detector implementation"""
-from ultralytics import YOLO
 import cv2
 from .detector_base import DetectorBase
 from ..config.detection_config import YOLO_CONFIG
 
 class YOLODetector(DetectorBase):
-    def __init__(self):
-        self.model = YOLO(YOLO_CONFIG['model_path'])
+    def __init__(self, model_path=None):
+        # ultralytics / torch 匯入需要數秒，延後到實際建立模型時
+        from ultralytics import YOLO
+        self.model = YOLO(model_path or YOLO_CONFIG['model_path'])
         self.conf_threshold = YOLO_CONFIG['confidence_threshold']
+        self.imgsz = None  # None 使用模型訓練時的輸入尺寸
+        
+    def set_input_size(self, imgsz):
+        """調整推論輸入尺寸（32 的倍數），較小的尺寸較快但小物體較難檢測"""
+        self.imgsz = imgsz
+        return True
+        
+    def _inference_args(self):
+        args = {'conf': self.conf_threshold}
+        if self.imgsz is not None:
+            args['imgsz'] = self.imgsz
+        return args
         
     def detect(self, image):
         results = self.model(
             image,
-            conf=self.conf_threshold
+            **self._inference_args()
         )
         return results[0]
     
+    def detect_batch(self, images):
+        """一次推論多張影像（例如多台相機的同一組幀），返回每張影像的結果"""
+        if not images:
+            return []
+        return list(self.model(
+            list(images),
+            **self._inference_args()
+        ))
+    
     def draw_detections(self, image, results):
         annotated_image = image.copy()
         
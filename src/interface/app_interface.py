@@ -1,19 +1,16 @@
 """Main application interface"""
-import cv2
-import numpy as np
 import tkinter as tk
 from tkinter import ttk
-from ..tracking.tracker import ObjectTracker
-from ..config.model_config import TRACKER_CONFIG
+from .frame_processor import FrameProcessor
 from .model_manager import ModelManager
 
+# 檢查背景模型載入狀態的間隔（毫秒）
+MODEL_POLL_INTERVAL_MS = 100
+
 class AppInterface:
     def __init__(self):
         self.model_manager = ModelManager()
-        self.tracker = ObjectTracker(
-            max_disappeared=TRACKER_CONFIG['max_disappeared'],
-            max_distance=TRACKER_CONFIG['max_distance']
-        )
+        self.processor = FrameProcessor()
         self.setup_gui()
         
     def setup_gui(self):
@@ -84,66 +81,105 @@ class AppInterface:
             self.model_name_combo['values'] = list(models.keys())
             
     def load_selected_model(self):
-        """載入選擇的模型"""
-        try:
-            model_type = self.model_type_var.get()
-            model_name = self.model_name_var.get()
+        """在背景載入選擇的模型，載入期間影像迴圈繼續使用目前的模型"""
+        model_type = self.model_type_var.get()
+        model_name = self.model_name_var.get()
+        
+        if not model_type or not model_name:
+            self.status_var.set("錯誤：請選擇模型類型和模型")
+            return
             
-            if not model_type or not model_name:
-                self.status_var.set("錯誤：請選擇模型類型和模型")
-                return
-                
-            self.model_manager.load_model(model_type, model_name)
+        self.start_model_load(model_type, model_name)
+        
+    def start_model_load(self, model_type, model_name, on_ready=None):
+        """
+        提交背景模型載入，並由 Tk 事件迴圈更新狀態欄
+
+        Args:
+            on_ready: 新模型切換為目前模型之前在載入執行緒中呼叫
+
+        Returns:
+            concurrent.futures.Future
+        """
+        future = self.model_manager.load_model_async(model_type, model_name, on_ready)
+        self.status_var.set(f"正在載入模型：{model_name}...")
+        self.root.after(MODEL_POLL_INTERVAL_MS, self._poll_model_load, future, model_name)
+        return future
+        
+    def _poll_model_load(self, future, model_name):
+        """由 Tk 事件迴圈定期檢查背景載入是否完成"""
+        if not future.done():
+            self.root.after(MODEL_POLL_INTERVAL_MS, self._poll_model_load, future, model_name)
+            return
+        try:
+            future.result()
             self.status_var.set(f"成功載入模型：{model_name}")
-            
         except Exception as e:
             self.status_var.set(f"錯誤：{str(e)}")
             
+    @property
+    def tracker(self):
+        return self.processor.tracker
+        
+    @property
+    def last_bboxes(self):
+        return self.processor.last_bboxes
+        
+    @property
+    def track_uncertainty(self):
+        return self.processor.track_uncertainty
+        
+    def set_stereo_calibration(self, focal_length_px, baseline_m):
+        """使用相機實際內參更新視差轉距離的查找表"""
+        self.processor.set_stereo_calibration(focal_length_px, baseline_m)
+        
     def calculate_distance(self, depth_map, bbox):
-        """計算物體到相機的距離"""
-        x1, y1, x2, y2 = map(int, bbox)
-        roi = depth_map[y1:y2, x1:x2]
-        # 使用中位數來減少噪聲影響
-        distance = np.median(roi)
-        return distance
-        
-    def process_frame(self, frame, depth_map, detections):
-        """處理每一幀圖像"""
-        # 獲取檢測框
-        bboxes = []
-        for det in detections.boxes.data:
-            x1, y1, x2, y2, conf, cls = det
-            if conf > TRACKER_CONFIG['min_confidence']:
-                bboxes.append((int(x1), int(y1), int(x2), int(y2)))
-                
-        # 更新追蹤器
-        objects = self.tracker.update(bboxes)
-        
-        # 繪製追蹤結果
-        if self.show_tracks_var.get():
-            frame = self.tracker.draw_tracks(frame)
-            
-        # 顯示距離信息
-        if self.show_distance_var.get():
-            for object_id, centroid in objects.items():
-                # 找到對應的邊界框
-                for bbox in bboxes:
-                    cx = (bbox[0] + bbox[2]) // 2
-                    cy = (bbox[1] + bbox[3]) // 2
-                    if abs(cx - centroid[0]) < 10 and abs(cy - centroid[1]) < 10:
-                        distance = self.calculate_distance(depth_map, bbox)
-                        cv2.putText(
-                            frame,
-                            f"ID {object_id}: {distance:.2f}m",
-                            (centroid[0] - 10, centroid[1] + 20),
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            0.5,
-                            (0, 255, 0),
-                            2
-                        )
-                        break
-                        
-        return frame
+        """計算物體到相機的距離（公尺）"""
+        return self.processor.calculate_distance(depth_map, bbox)
+        
+    def calculate_distances(self, depth_map, tracked_bboxes):
+        """批次計算所有追蹤物體到相機的距離 {ID: 公尺}"""
+        return self.processor.calculate_distances(depth_map, tracked_bboxes)
+        
+    def update_tracking(self, depth_map, detections, processor=None, timings=None,
+                        frame_index=None):
+        """
+        以一幀的檢測結果更新追蹤與距離，不做任何繪圖
+        
+        Args:
+            depth_map: 視差圖
+            detections: 檢測結果；為 None 時以追蹤器運動模型預測物體位置
+            processor: 使用的 FrameProcessor，多相機時每台相機各一個
+            timings: 啟用效能統計時寫入追蹤與距離計算耗時的 dict
+            frame_index: 擷取端的幀編號，丟幀時運動模型依差距推進
+        
+        Returns:
+            追蹤中的物體 {ID: centroid}
+        """
+        processor = processor or self.processor
+        return processor.update(depth_map, detections, timings, frame_index)
+        
+    def draw(self, frame, objects, processor=None):
+        """依介面選項在 frame 上繪製追蹤軌跡與距離"""
+        processor = processor or self.processor
+        return processor.draw(
+            frame, objects,
+            show_tracks=self.show_tracks_var.get(),
+            show_distance=self.show_distance_var.get()
+        )
+        
+    def process_frame(self, frame, depth_map, detections, processor=None):
+        """
+        處理每一幀圖像：更新追蹤並繪製結果
+        
+        Args:
+            frame: 用於繪製的彩色影像
+            depth_map: 視差圖
+            detections: 檢測結果；為 None 時以追蹤器運動模型預測物體位置
+            processor: 使用的 FrameProcessor，多相機時每台相機各一個
+        """
+        objects = self.update_tracking(depth_map, detections, processor)
+        return self.draw(frame, objects, processor)
         
     def run(self):
         """運行主循環"""
@@ -0,0 +1,148 @@
+"""Per-camera tracking and distance processing"""
+import cv2
+import math
+import time
+from ..tracking.tracker import ObjectTracker
+from ..config.model_config import TRACKER_CONFIG
+from ..config.camera_config import CAMERA_CONFIG
+from ..depth.distance_estimator import DistanceEstimator
+
+class FrameProcessor:
+    """單一相機的追蹤與距離計算，不含任何 GUI 元件"""
+    def __init__(self):
+        self.tracker = ObjectTracker(
+            max_disappeared=TRACKER_CONFIG['max_disappeared'],
+            max_distance=TRACKER_CONFIG['max_distance'],
+            cost_metric=TRACKER_CONFIG['cost_metric'],
+            assignment=TRACKER_CONFIG['assignment'],
+            min_iou=TRACKER_CONFIG['min_iou'],
+            depth_weight=TRACKER_CONFIG['depth_weight'],
+            history_length=TRACKER_CONFIG['history_length'],
+            initial_capacity=TRACKER_CONFIG['initial_capacity'],
+            id_pool_size=TRACKER_CONFIG['id_pool_size'],
+            position_noise=TRACKER_CONFIG['position_noise'],
+            velocity_noise=TRACKER_CONFIG['velocity_noise'],
+            measurement_noise=TRACKER_CONFIG['measurement_noise']
+        )
+        self.distance_estimator = DistanceEstimator(
+            CAMERA_CONFIG['focal_length_px'],
+            CAMERA_CONFIG['baseline_m']
+        )
+        self.last_bboxes = []  # 最近一次處理的檢測框，供 ROI 深度計算使用
+        self.track_uncertainty = 0.0  # 追蹤位置的最大標準差，供檢測排程使用
+        self.last_frame_index = None  # 上次更新的幀編號，用來計算運動模型的步長
+
+    def set_stereo_calibration(self, focal_length_px, baseline_m):
+        """使用相機實際內參更新視差轉距離的查找表"""
+        self.distance_estimator.set_calibration(focal_length_px, baseline_m)
+
+    def calculate_distance(self, depth_map, bbox):
+        """計算物體到相機的距離（公尺）"""
+        return float(self.distance_estimator.estimate(depth_map, [bbox])[0])
+
+    def calculate_distances(self, depth_map, tracked_bboxes):
+        """
+        批次計算所有追蹤物體到相機的距離
+
+        Args:
+            depth_map: 視差圖
+            tracked_bboxes: {ID: (x1, y1, x2, y2)}
+
+        Returns:
+            {ID: 距離（公尺），無有效視差時為 NaN}
+        """
+        object_ids = list(tracked_bboxes.keys())
+        distances = self.distance_estimator.estimate(
+            depth_map, list(tracked_bboxes.values())
+        )
+        return dict(zip(object_ids, distances.tolist()))
+
+    def frame_step(self, frame_index):
+        """距離上次更新的幀數；管線的丟棄佇列略過幀時大於 1"""
+        last, self.last_frame_index = self.last_frame_index, frame_index
+        if frame_index is None or last is None:
+            return 1
+        return max(1, frame_index - last)
+
+    def update(self, depth_map, detections, timings=None, frame_index=None):
+        """
+        以一幀的檢測結果更新追蹤與距離
+
+        Args:
+            depth_map: 視差圖
+            detections: 檢測結果；為 None 時以追蹤器運動模型預測物體位置
+            timings: 啟用效能統計時傳入的 dict，寫入 'tracking' 與 'distance' 耗時
+            frame_index: 擷取端的幀編號；運動模型依與上次的差距推進，未提供時每次一幀
+
+        Returns:
+            追蹤中的物體 {ID: centroid}
+        """
+        timed = timings is not None
+        if timed:
+            start = time.perf_counter()
+        dt = self.frame_step(frame_index)
+        if detections is None:
+            # 未執行檢測的幀：推進追蹤並在預測框上量測距離
+            objects = self.tracker.predict(dt)
+            predicted = self.tracker.visible_bboxes()
+            if timed:
+                distance_start = time.perf_counter()
+            distances = self.calculate_distances(depth_map, predicted)
+            if timed:
+                distance_time = time.perf_counter() - distance_start
+            self.tracker.set_depths(distances)
+            self.last_bboxes = list(predicted.values())
+        else:
+            # 獲取檢測框
+            bboxes = []
+            for det in detections.boxes.data:
+                x1, y1, x2, y2, conf, cls = det
+                if conf > TRACKER_CONFIG['min_confidence']:
+                    bboxes.append((int(x1), int(y1), int(x2), int(y2)))
+            self.last_bboxes = bboxes
+
+            # 批次計算每個檢測框的距離，並隨檢測一起交給追蹤器
+            if timed:
+                distance_start = time.perf_counter()
+            distances = self.distance_estimator.estimate(depth_map, bboxes)
+            if timed:
+                distance_time = time.perf_counter() - distance_start
+
+            # 更新追蹤器
+            objects = self.tracker.update(bboxes, distances, dt)
+        self.track_uncertainty = self.tracker.max_uncertainty()
+        if timed:
+            timings['distance'] = distance_time
+            timings['tracking'] = time.perf_counter() - start - distance_time
+        return objects
+
+    def draw(self, frame, objects, show_tracks=True, show_distance=True):
+        """在影像上繪製追蹤軌跡與距離資訊"""
+        # 繪製追蹤結果
+        if show_tracks:
+            frame = self.tracker.draw_tracks(frame)
+
+        # 顯示距離信息
+        if show_distance:
+            for object_id, distance in self.tracker.visible_depths().items():
+                centroid = objects[object_id]
+                if math.isnan(distance):
+                    text = f"ID {object_id}: --"
+                else:
+                    text = f"ID {object_id}: {distance:.2f}m"
+                cv2.putText(
+                    frame,
+                    text,
+                    (centroid[0] - 10, centroid[1] + 20),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.5,
+                    (0, 255, 0),
+                    2
+                )
+
+        return frame
+
+    def process_frame(self, frame, depth_map, detections, show_tracks=True, show_distance=True):
+        """更新追蹤並繪製結果"""
+        objects = self.update(depth_map, detections)
+        return self.draw(frame, objects, show_tracks, show_distance)
@@ -1,13 +1,31 @@
 """Model management and switching interface"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from ..detection.yolo_detector import YOLODetector
-from ..config.model_config import SUPPORTED_MODELS
+from ..detection.runtime_detector import RuntimeDetector
+from ..config.model_config import SUPPORTED_MODELS, MODEL_CACHE_CONFIG
+from ..config.camera_config import CAMERA_CONFIG
 from ..utils.exceptions import DetectionError
 
 class ModelManager:
-    def __init__(self):
+    def __init__(self, max_cached_models=None, warmup=None):
+        """
+        Args:
+            max_cached_models: LRU 快取保留的模型數量
+            warmup: 切換前是否先以空白影像推論一次
+        """
         self.current_model = None
         self.current_model_name = None
         self.supported_models = SUPPORTED_MODELS
+        self.max_cached_models = max_cached_models or MODEL_CACHE_CONFIG['max_models']
+        self.warmup = MODEL_CACHE_CONFIG['warmup'] if warmup is None else warmup
+        self._cache = OrderedDict()  # (model_type, model_name) -> 檢測器
+        self.input_size = None  # 自適應品質設定的推論尺寸，套用到之後切換的每個模型
+        self._lock = threading.Lock()
+        # 單一背景執行緒依序載入，避免同時載入多個模型
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix='model-loader')
         
     def list_models(self):
         """列出所有支援的模型"""
@@ -17,31 +35,113 @@ class ModelManager:
             for name, info in models.items():
                 print(f"  - {name}: {info['description']}")
                 
-    def load_model(self, model_type, model_name):
-        """載入指定的模型"""
-        try:
-            if model_type not in self.supported_models:
-                raise DetectionError(f"不支援的模型類型: {model_type}")
-                
-            if model_name not in self.supported_models[model_type]:
-                raise DetectionError(f"找不到模型: {model_name}")
-                
-            model_path = self.supported_models[model_type][model_name]['path']
+    def _create_model(self, model_type, model_name):
+        """檢查設定並建立模型（不經過快取）"""
+        if model_type not in self.supported_models:
+            raise DetectionError(f"不支援的模型類型: {model_type}")
             
-            if model_type == 'yolo':
-                self.current_model = YOLODetector(model_path)
-            elif model_type == 'unet':
-                # TODO: 實現 U-Net 模型載入
-                raise NotImplementedError("U-Net 模型支援即將推出")
-                
-            self.current_model_name = f"{model_type}_{model_name}"
-            print(f"\n成功載入模型: {model_name}")
+        if model_name not in self.supported_models[model_type]:
+            raise DetectionError(f"找不到模型: {model_name}")
             
+        model_info = self.supported_models[model_type][model_name]
+        model_path = model_info['path']
+        
+        if model_type == 'yolo':
+            model = self.create_detector(
+                model_path, model_info.get('backend', 'torch')
+            )
+        elif model_type == 'unet':
+            # TODO: 實現 U-Net 模型載入
+            raise NotImplementedError("U-Net 模型支援即將推出")
+            
+        if self.warmup:
+            model.detect(np.zeros(
+                (CAMERA_CONFIG['height'], CAMERA_CONFIG['width'], 3), dtype=np.uint8
+            ))
+        return model
+        
+    def _get_model(self, model_type, model_name):
+        """從快取取得模型，不存在時載入並放入快取"""
+        key = (model_type, model_name)
+        with self._lock:
+            model = self._cache.get(key)
+            if model is not None:
+                self._cache.move_to_end(key)
+                return model
+                
+        model = self._create_model(model_type, model_name)
+        with self._lock:
+            self._cache[key] = model
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cached_models:
+                self._cache.popitem(last=False)
+        return model
+        
+    def _swap(self, model_type, model_name, on_ready=None):
+        """
+        載入（或取自快取）後一次性切換目前模型
+
+        on_ready 在新模型發布為 current_model 之前呼叫，例如記錄載入時間
+        """
+        try:
+            model = self._get_model(model_type, model_name)
+        except DetectionError:
+            raise
         except Exception as e:
             raise DetectionError(f"載入模型失敗: {str(e)}")
-            
+        if self.input_size is not None:
+            model.set_input_size(self.input_size)
+        if on_ready is not None:
+            on_ready()
+        with self._lock:
+            self.current_model = model
+            self.current_model_name = f"{model_type}_{model_name}"
+        print(f"\n成功載入模型: {model_name}")
+        return model
+        
+    def load_model(self, model_type, model_name):
+        """載入指定的模型（同步，載入完成後才返回）"""
+        return self._swap(model_type, model_name)
+        
+    def load_model_async(self, model_type, model_name, on_ready=None):
+        """
+        在背景執行緒載入模型，載入與暖機完成後才切換
+
+        切換前 current_model 維持舊模型，影像迴圈不會中斷。Future 的
+        done callback 可能在影像迴圈已使用新模型之後才執行，需要在切換
+        之前完成的工作改用 on_ready。
+
+        Returns:
+            concurrent.futures.Future，結果為新模型或 DetectionError
+        """
+        return self._loader.submit(self._swap, model_type, model_name, on_ready)
+        
+    def set_input_size(self, imgsz):
+        """設定目前與之後載入的模型的推論輸入尺寸"""
+        self.input_size = imgsz
+        model = self.current_model
+        if model is not None:
+            model.set_input_size(imgsz)
+        
+    def is_cached(self, model_type, model_name):
+        with self._lock:
+            return (model_type, model_name) in self._cache
+        
+    @staticmethod
+    def create_detector(model_path, backend='torch'):
+        """依推論後端建立檢測器"""
+        if backend == 'torch':
+            return YOLODetector(model_path)
+        if backend in ('onnx', 'openvino'):
+            return RuntimeDetector(model_path, backend=backend)
+        raise DetectionError(f"不支援的推論後端: {backend}")
+        
     def get_current_model(self):
         """獲取當前使用的模型"""
         if self.current_model is None:
             raise DetectionError("尚未載入任何模型")
-        return self.current_model
\ No newline at end of file
+        return self.current_model
+        
+    def shutdown(self):
+        """停止背景載入執行緒"""
+        self._loader.shutdown(wait=False)
@@ -1,79 +1,446 @@
 """Main application entry point"""
+import time
+STARTUP_ORIGIN = time.perf_counter()
 import cv2
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from camera.realsense_camera import RealSenseCamera
-from depth.sgbm_processor import SGBMProcessor
+from camera.multi_camera_manager import MultiCameraManager
+from camera.frame_buffer_pool import release_frames
 from interface.app_interface import AppInterface
-from utils.visualization import create_depth_visualization, show_images
+from interface.frame_processor import FrameProcessor
+from detection.detection_scheduler import DetectionScheduler
+from pipeline.frame_pipeline import FramePipeline
+from pipeline.process_pipeline import ProcessPipeline
+from pipeline.components import create_camera, create_depth_processor, create_point_cloud_writer
+from pipeline.quality_controller import QualityController, QualityKnobs, frame_cost
+from config.pipeline_config import PIPELINE_CONFIG, STARTUP_CONFIG, QUALITY_CONFIG
+from config.camera_config import CAMERA_CONFIG, MULTI_CAMERA_CONFIG
+from config.depth_config import SGBM_CONFIG
+from utils.visualization import FrameRenderer, draw_metrics_overlay
+from utils.metrics import create_metrics
 from utils.exceptions import CameraError, DepthProcessingError, DetectionError
+from utils.startup_timer import StartupTimer
+
+IMPORT_SECONDS = time.perf_counter() - STARTUP_ORIGIN
+
+def create_startup_timer():
+    """建立啟動計時器並記錄匯入耗時；關閉報告時返回 None"""
+    if not STARTUP_CONFIG['report']:
+        return None
+    startup = StartupTimer(origin=STARTUP_ORIGIN)
+    startup.record('import', IMPORT_SECONDS)
+    return startup
+
+def load_startup_model(app, startup):
+    """在背景載入預設模型，讓模型載入與相機啟動同時進行"""
+    if not STARTUP_CONFIG['model_type']:
+        return
+    start = time.perf_counter()
+
+    def on_ready():
+        # 在模型成為 current_model 之前記錄，第一幀的報告一定包含載入時間
+        if startup is not None:
+            startup.record('model_load', time.perf_counter() - start)
+
+    future = app.start_model_load(
+        STARTUP_CONFIG['model_type'], STARTUP_CONFIG['model_name'], on_ready
+    )
+
+    def on_loaded(future):
+        if future.exception() is not None:
+            print(f"錯誤: {str(future.exception())}")
+
+    future.add_done_callback(on_loaded)
+
+def report_first_frame(startup):
+    """第一幀顯示後列出啟動時間"""
+    if startup is not None and not startup.reported:
+        startup.mark('first_frame')
+        startup.report()
+
+def create_renderer(window_name='Depth Measurement', show_ir=None):
+    """建立以 SGBM 視差範圍固定色彩對應的顯示器"""
+    return FrameRenderer(
+        SGBM_CONFIG['min_disparity'],
+        SGBM_CONFIG['num_disparities'],
+        window_name=window_name,
+        show_ir=show_ir
+    )
+
+def create_quality_controller(depth_target, scheduler, model_manager):
+    """依設定建立自適應品質控制器並套用初始等級；關閉時返回 None"""
+    if not QUALITY_CONFIG['enabled']:
+        return None
+    controller = QualityController(QualityKnobs(depth_target, scheduler, model_manager))
+    controller.apply_initial()
+    return controller
+
+def timed_call(timings, stage, fn, *args):
+    """呼叫 fn；timings 不為 None 時記錄耗時到 timings[stage]"""
+    if timings is None:
+        return fn(*args)
+    start = time.perf_counter()
+    result = fn(*args)
+    timings[stage] = time.perf_counter() - start
+    return result
+
+def render_frame(app, renderer, left_ir, right_ir, color_image, disparity,
+                 detections, processor=None, timings=None, metrics=None, frame_index=None):
+    """
+    更新追蹤與距離，並在顯示更新率允許時繪製與顯示
+
+    追蹤每幀都更新；繪圖畫在顯示器預先配置的畫布上，不修改輸入影像。
+    frame_index 為擷取端幀編號，管線丟幀時運動模型依差距推進
+    """
+    objects = app.update_tracking(disparity, detections, processor, timings, frame_index)
+    if renderer.due():
+        if timings is not None:
+            start = time.perf_counter()
+        frame = renderer.begin(color_image)
+        app.draw(frame, objects, processor)
+        if metrics is not None and metrics.overlay:
+            draw_metrics_overlay(frame, metrics.summary())
+        renderer.finish(disparity, left_ir, right_ir)
+        if timings is not None:
+            timings['render'] = time.perf_counter() - start
+
+def run_sequential(camera, depth_processor, app, startup=None, metrics=None, point_cloud=None):
+    """逐幀依序執行擷取、深度計算、檢測與顯示"""
+    scheduler = DetectionScheduler()
+    renderer = create_renderer()
+    quality = create_quality_controller(depth_processor, scheduler, app.model_manager)
+    frame_index = 0
+    timings = None
+    while True:
+        if metrics is not None or quality is not None:
+            timings = {}
+
+        # 獲取相機幀；與管線模式的 FramePacket 相同，在擷取完成後標記時間
+        frames = timed_call(timings, 'capture', camera.get_frames)
+        timestamp = time.time()
+        left_ir, right_ir, color_image = frames
+
+        # 計算深度
+        disparity, _ = timed_call(timings, 'depth', depth_processor.compute_depth,
+                                  left_ir, right_ir)
+
+        # 執行目標檢測（模型在背景載入時沿用目前的模型）
+        current_model = app.model_manager.current_model
+        if current_model:
+            detections = None
+            if scheduler.should_detect(frame_index, app.track_uncertainty):
+                detections = timed_call(timings, 'detection', current_model.detect, color_image)
+            render_frame(app, renderer, left_ir, right_ir, color_image,
+                         disparity, detections, timings=timings, metrics=metrics,
+                         frame_index=frame_index)
+            depth_processor.set_rois(app.last_bboxes)
+            if point_cloud is not None:
+                point_cloud.submit(frame_index, timestamp, disparity, color_image,
+                                   app.last_bboxes)
+            report_first_frame(startup)
+            if metrics is not None:
+                metrics.end_frame(frame_index, timestamp, timings)
+            if quality is not None:
+                quality.update(frame_cost(timings))
+        release_frames(frames)
+        frame_index += 1
+
+        # 更新GUI
+        app.root.update()
+
+        # 按 'q' 退出
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            print("\n正在關閉程式...")
+            break
+
+def run_pipelined(camera, depth_processor, app, startup=None, metrics=None, point_cloud=None):
+    """擷取、深度計算與檢測各自在獨立執行緒中執行，主執行緒負責顯示"""
+    def compute_depth(packet):
+        packet.disparity, _ = depth_processor.compute_depth(
+            packet.left_ir, packet.right_ir
+        )
+
+    scheduler = DetectionScheduler()
+    renderer = create_renderer()
+    quality = create_quality_controller(depth_processor, scheduler, app.model_manager)
+
+    def detect(packet):
+        current_model = app.model_manager.current_model
+        if current_model and scheduler.should_detect(packet.index, app.track_uncertainty):
+            packet.detections = current_model.detect(packet.color_image)
+
+    pipeline = FramePipeline(
+        camera.get_frames,
+        [('depth', compute_depth), ('detection', detect)],
+        queue_size=PIPELINE_CONFIG['queue_size'],
+        metrics=metrics,
+        timed=quality is not None
+    )
+    pipeline.start()
+
+    try:
+        while True:
+            packet = pipeline.get_result(timeout=PIPELINE_CONFIG['result_timeout'])
+            if packet is not None and app.model_manager.current_model:
+                render_frame(app, renderer, packet.left_ir, packet.right_ir,
+                             packet.color_image, packet.disparity, packet.detections,
+                             timings=packet.timings, metrics=metrics,
+                             frame_index=packet.index)
+                depth_processor.set_rois(app.last_bboxes)
+                if point_cloud is not None:
+                    point_cloud.submit(packet.index, packet.timestamp, packet.disparity,
+                                       packet.color_image, app.last_bboxes)
+                report_first_frame(startup)
+                if metrics is not None:
+                    metrics.end_frame(packet.index, packet.timestamp, packet.timings)
+                if quality is not None:
+                    quality.update(frame_cost(packet.timings, parallel=True))
+            if packet is not None:
+                packet.release()
+
+            # 更新GUI
+            app.root.update()
+
+            # 按 'q' 退出
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                print("\n正在關閉程式...")
+                break
+    finally:
+        pipeline.stop()
+        pipeline.join(timeout=1.0)
+        if pipeline.dropped_frames:
+            print(f"管線丟棄幀數: {pipeline.dropped_frames}")
+
+def create_process_pipeline(camera, app, scheduler, metrics=None):
+    """
+    建立多程序管線並先啟動工作程序，讓模型在相機啟動期間載入
+
+    模型在檢測程序中載入，介面的模型選擇改由 pipeline.models 轉送
+    """
+    pipeline = ProcessPipeline(
+        camera.get_frames,
+        create_depth_processor,
+        CAMERA_CONFIG['width'],
+        CAMERA_CONFIG['height'],
+        slot_count=PIPELINE_CONFIG['shared_slots'],
+        queue_size=PIPELINE_CONFIG['queue_size'],
+        detect_filter=lambda index: scheduler.should_detect(index, app.track_uncertainty),
+        metrics=metrics,
+        timed=QUALITY_CONFIG['enabled']
+    )
+    app.model_manager.shutdown()
+    app.model_manager = pipeline.models
+    pipeline.start_workers()
+    return pipeline
+
+def run_multiprocess(pipeline, app, scheduler, startup=None, metrics=None, point_cloud=None):
+    """深度與檢測在獨立程序中執行，主程序負責擷取、追蹤與顯示"""
+    renderer = create_renderer()
+    quality = create_quality_controller(pipeline, scheduler, app.model_manager)
+    pipeline.start()
+    try:
+        while True:
+            packet = pipeline.get_result(timeout=PIPELINE_CONFIG['result_timeout'])
+            if packet is not None:
+                # 影像位於共享記憶體的 slot 中，release 之前不會被覆寫
+                render_frame(app, renderer, packet.left_ir, packet.right_ir,
+                             packet.color_image, packet.disparity, packet.detections,
+                             timings=packet.timings, metrics=metrics,
+                             frame_index=packet.index)
+                pipeline.set_rois(app.last_bboxes)
+                if point_cloud is not None:
+                    point_cloud.submit(packet.index, packet.timestamp, packet.disparity,
+                                       packet.color_image, app.last_bboxes)
+                report_first_frame(startup)
+                if metrics is not None:
+                    metrics.end_frame(packet.index, packet.timestamp, packet.timings)
+                if quality is not None:
+                    quality.update(frame_cost(packet.timings, parallel=True))
+                packet.release()
+
+            # 更新GUI
+            app.root.update()
+
+            # 按 'q' 退出
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                print("\n正在關閉程式...")
+                break
+    finally:
+        pipeline.stop()
+        pipeline.join(timeout=1.0)
+        if pipeline.dropped_frames:
+            print(f"管線丟棄幀數: {pipeline.dropped_frames}")
+
+class CameraSession:
+    """多相機模式下每台相機各自的深度處理器、追蹤器與檢測排程"""
+    def __init__(self, name):
+        self.name = name
+        self.depth_processor = create_depth_processor()
+        self.processor = FrameProcessor()
+        self.scheduler = DetectionScheduler()
+        self.renderer = create_renderer(f'Camera {name}', show_ir=False)
+
+def run_multi_camera(manager, sessions, app, startup=None):
+    """
+    多相機模式：各相機的深度計算平行執行，需要檢測的彩色影像合併成一個批次推論
+    """
+    frame_index = 0
+    with ThreadPoolExecutor(max_workers=len(sessions)) as executor:
+        while True:
+            frame_set = manager.get_frame_set(timeout=PIPELINE_CONFIG['result_timeout'])
+            current_model = app.model_manager.current_model
+            if frame_set is not None and current_model:
+                # 平行計算每台相機的深度
+                depth_results = list(executor.map(
+                    lambda session, frames: session.depth_processor.compute_depth(
+                        frames[0], frames[1]
+                    ),
+                    sessions, frame_set
+                ))
+
+                # 只把需要檢測的相機合併成一個批次
+                detect_indices = [
+                    i for i, session in enumerate(sessions)
+                    if session.scheduler.should_detect(
+                        frame_index, session.processor.track_uncertainty
+                    )
+                ]
+                detections = [None] * len(sessions)
+                batch = current_model.detect_batch(
+                    [frame_set[i][2] for i in detect_indices]
+                )
+                for i, result in zip(detect_indices, batch):
+                    detections[i] = result
+
+                for session, frames, (disparity, _), result in zip(
+                        sessions, frame_set, depth_results, detections):
+                    render_frame(app, session.renderer, frames[0], frames[1], frames[2],
+                                 disparity, result, processor=session.processor,
+                                 frame_index=frame_index)
+                    session.depth_processor.set_rois(session.processor.last_bboxes)
+                frame_index += 1
+                report_first_frame(startup)
+            if frame_set is not None:
+                for frames in frame_set:
+                    release_frames(frames)
+
+            # 更新GUI
+            app.root.update()
+
+            # 按 'q' 退出
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                print("\n正在關閉程式...")
+                break
+
+    if manager.dropped_frames:
+        print(f"多相機丟棄幀數: {manager.dropped_frames}")
+
+def main_multi_camera(serials):
+    """依序號開啟多台相機並共用同一個檢測模型"""
+    startup = create_startup_timer()
+    try:
+        manager = MultiCameraManager(
+            [RealSenseCamera(serial=serial) for serial in serials],
+            sync_tolerance_ms=MULTI_CAMERA_CONFIG['sync_tolerance_ms']
+        )
+        sessions = [CameraSession(serial) for serial in serials]
+        app = AppInterface()
+        load_startup_model(app, startup)
+
+        print(f"正在啟動 {len(serials)} 台相機...")
+        start = time.perf_counter()
+        manager.start()
+        if startup is not None:
+            startup.record('camera_start', time.perf_counter() - start)
+        for session, calibration in zip(sessions, manager.get_stereo_calibrations()):
+            session.processor.set_stereo_calibration(*calibration)
+        print("相機啟動成功！")
+        print("\n按 'q' 鍵退出程式")
+
+        try:
+            run_multi_camera(manager, sessions, app, startup)
+        except (CameraError, DepthProcessingError, DetectionError) as e:
+            print(f"錯誤: {str(e)}")
+
+    except Exception as e:
+        print(f"嚴重錯誤: {str(e)}")
+        sys.exit(1)
+
+    finally:
+        if 'manager' in locals():
+            manager.stop()
+        if 'app' in locals():
+            app.model_manager.shutdown()
+        cv2.destroyAllWindows()
+        print("程式已安全關閉")
 
 def main():
     print("初始化深度測量系統...")
-    
+    if MULTI_CAMERA_CONFIG['serials']:
+        return main_multi_camera(MULTI_CAMERA_CONFIG['serials'])
+
+    startup = create_startup_timer()
+    metrics = create_metrics()
+    point_cloud = None
     try:
         # 初始化組件
-        camera = RealSenseCamera()
-        depth_processor = SGBMProcessor()
+        camera = create_camera()
         app = AppInterface()
-        
+        process_pipeline = None
+        if PIPELINE_CONFIG['enabled'] and PIPELINE_CONFIG['workers'] == 'process':
+            # 深度處理器在深度工作程序中建立，主程序不需要
+            scheduler = DetectionScheduler()
+            process_pipeline = create_process_pipeline(camera, app, scheduler, metrics)
+        else:
+            depth_processor = create_depth_processor()
+
+        # 模型在背景載入，同時啟動相機
+        load_startup_model(app, startup)
+
         print("正在啟動相機...")
+        start = time.perf_counter()
         camera.start()
+        if startup is not None:
+            startup.record('camera_start', time.perf_counter() - start)
+        app.set_stereo_calibration(*camera.get_stereo_calibration())
+        point_cloud = create_point_cloud_writer(camera, metrics=metrics)
         print("相機啟動成功！")
         print("\n按 'q' 鍵退出程式")
-        
-        while True:
-            try:
-                # 獲取相機幀
-                left_ir, right_ir, color_image = camera.get_frames()
-                
-                # 計算深度
-                disparity, disparity_normalized = depth_processor.compute_depth(
-                    left_ir, right_ir
-                )
-                
-                # 執行目標檢測
-                current_model = app.model_manager.get_current_model()
-                if current_model:
-                    detections = current_model.detect(color_image)
-                    
-                    # 處理檢測結果
-                    processed_frame = app.process_frame(
-                        color_image.copy(),
-                        disparity,
-                        detections
-                    )
-                    
-                    # 創建可視化
-                    visualization = create_depth_visualization(
-                        disparity_normalized,
-                        processed_frame,
-                        detections
-                    )
-                    
-                    # 顯示結果
-                    show_images(left_ir, right_ir, visualization)
-                    
-                # 更新GUI
-                app.root.update()
-                
-                # 按 'q' 退出
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    print("\n正在關閉程式...")
-                    break
-                    
-            except (CameraError, DepthProcessingError, DetectionError) as e:
-                print(f"錯誤: {str(e)}")
-                break
-                
+
+        try:
+            if process_pipeline is not None:
+                run_multiprocess(process_pipeline, app, scheduler, startup, metrics, point_cloud)
+            elif PIPELINE_CONFIG['enabled']:
+                run_pipelined(camera, depth_processor, app, startup, metrics, point_cloud)
+            else:
+                run_sequential(camera, depth_processor, app, startup, metrics, point_cloud)
+
+        except (CameraError, DepthProcessingError, DetectionError) as e:
+            print(f"錯誤: {str(e)}")
+
     except Exception as e:
         print(f"嚴重錯誤: {str(e)}")
         sys.exit(1)
-        
+
     finally:
+        if locals().get('process_pipeline') is not None and not process_pipeline.stopped:
+            process_pipeline.stop()
+            process_pipeline.join(timeout=1.0)
         if 'camera' in locals():
             camera.stop()
+        if 'app' in locals():
+            app.model_manager.shutdown()
+        if metrics is not None:
+            metrics.close()
+        if point_cloud is not None:
+            try:
+                point_cloud.close()
+            except Exception as e:
+                print(f"點雲輸出錯誤: {str(e)}")
+            print(f"點雲輸出: {point_cloud.written} 幀，丟棄 {point_cloud.dropped} 幀")
         cv2.destroyAllWindows()
         print("程式已安全關閉")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,67 @@
+"""Factories for the configured camera, depth processor and point cloud writer"""
+from ..camera.realsense_camera import RealSenseCamera
+from ..camera.replay_camera import ReplayCamera
+from ..depth.sgbm_processor import SGBMProcessor
+from ..depth.roi_sgbm_processor import ROISGBMProcessor
+from ..depth.pyramid_sgbm_processor import PyramidSGBMProcessor
+from ..depth.incremental_sgbm_processor import IncrementalSGBMProcessor
+from ..depth.point_cloud import PointCloudGenerator, reprojection_matrix
+from .point_cloud_writer import PointCloudWriter
+from ..config.camera_config import CAMERA_CONFIG, RECORD_CONFIG, REPLAY_CONFIG
+from ..config.depth_config import DEPTH_CONFIG, SGBM_CONFIG, POINT_CLOUD_CONFIG
+
+
+def create_camera():
+    """依設定建立實體相機或回放相機"""
+    if CAMERA_CONFIG['source'] == 'replay':
+        return ReplayCamera(
+            REPLAY_CONFIG['path'],
+            mode=REPLAY_CONFIG['mode'],
+            loop=REPLAY_CONFIG['loop']
+        )
+    return RealSenseCamera(record_path=RECORD_CONFIG['path'])
+
+
+def create_depth_processor():
+    """依設定建立深度處理器"""
+    if DEPTH_CONFIG['mode'] == 'roi':
+        return ROISGBMProcessor()
+    if DEPTH_CONFIG['mode'] == 'pyramid':
+        return PyramidSGBMProcessor()
+    if DEPTH_CONFIG['mode'] == 'incremental':
+        return IncrementalSGBMProcessor()
+    return SGBMProcessor()
+
+
+def create_point_cloud_writer(camera, config=None, metrics=None):
+    """
+    依設定建立背景點雲輸出；關閉時返回 None
+
+    須在相機啟動後呼叫，Q 矩陣只以裝置內參與基線建立一次；
+    提供 metrics 時匯出寫入佇列的長度與丟棄幀數
+    """
+    config = config or POINT_CLOUD_CONFIG
+    if not config['enabled']:
+        return None
+    fx, fy, cx, cy = camera.get_intrinsics()
+    _, baseline_m = camera.get_stereo_calibration()
+    generator = PointCloudGenerator(
+        CAMERA_CONFIG['width'],
+        CAMERA_CONFIG['height'],
+        reprojection_matrix(fx, fy, cx, cy, baseline_m),
+        min_disparity=SGBM_CONFIG['min_disparity'],
+        max_depth=config['max_depth'],
+        voxel_size=config['voxel_size'],
+        color_projection=camera.get_color_projection() if config['color'] else None,
+        stride=config['stride']
+    )
+    return PointCloudWriter(
+        generator,
+        config['output_dir'],
+        fmt=config['format'],
+        queue_size=config['queue_size'],
+        every_n_frames=config['every_n_frames'],
+        color=config['color'],
+        crop_to_rois=config['crop_to_rois'],
+        metrics=metrics
+    )
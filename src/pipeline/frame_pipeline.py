@@ -0,0 +1,207 @@
+"""Pipelined multi-threaded frame loop"""
+import threading
+import time
+from collections import deque
+from queue import Empty
+
+
+class FramePacket:
+    """Data for a single frame as it moves through the pipeline stages"""
+    def __init__(self, index, timestamp, left_ir, right_ir, color_image, frames=None,
+                 timings=None):
+        self.index = index
+        self.timestamp = timestamp
+        self.left_ir = left_ir
+        self.right_ir = right_ir
+        self.color_image = color_image
+        self.frames = frames
+        self.disparity = None
+        self.detections = None
+        self.timings = timings  # {stage: seconds} when metrics are enabled
+
+    def release(self):
+        """Return pooled camera buffers; safe to call more than once"""
+        frames, self.frames = self.frames, None
+        release = getattr(frames, 'release', None)
+        if release is not None:
+            release()
+
+
+class DropOldestQueue:
+    """Bounded queue that discards the oldest item instead of blocking the producer"""
+    def __init__(self, maxsize, on_drop=None):
+        """
+        Args:
+            maxsize: capacity before the oldest item is discarded
+            on_drop: optional callable invoked with every discarded item
+        """
+        self._items = deque()
+        self._maxsize = maxsize
+        self._cond = threading.Condition()
+        self._closed = False
+        self._on_drop = on_drop
+        self.dropped = 0
+
+    def put(self, item):
+        dropped = None
+        with self._cond:
+            if len(self._items) >= self._maxsize:
+                dropped = self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+        if dropped is not None and self._on_drop is not None:
+            self._on_drop(dropped)
+
+    def get(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                raise Empty
+            if not self._items:
+                raise Empty
+            return self._items.popleft()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def qsize(self):
+        with self._cond:
+            return len(self._items)
+
+
+class PipelineStage(threading.Thread):
+    """Worker thread that applies one processing function to every packet"""
+    def __init__(self, name, process_fn, in_queue, out_queue, pipeline):
+        super().__init__(name=name, daemon=True)
+        self.process_fn = process_fn
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.pipeline = pipeline
+
+    def run(self):
+        while not self.pipeline.stopped:
+            try:
+                packet = self.in_queue.get(timeout=0.1)
+            except Empty:
+                continue
+            try:
+                if packet.timings is None:
+                    self.process_fn(packet)
+                else:
+                    start = time.perf_counter()
+                    self.process_fn(packet)
+                    packet.timings[self.name] = time.perf_counter() - start
+            except Exception as e:
+                self.pipeline.fail(e)
+                return
+            self.out_queue.put(packet)
+
+
+class CaptureStage(threading.Thread):
+    """Worker thread that reads frames from the camera and numbers them"""
+    def __init__(self, capture_fn, out_queue, pipeline, timed=False):
+        super().__init__(name='capture', daemon=True)
+        self.capture_fn = capture_fn
+        self.out_queue = out_queue
+        self.pipeline = pipeline
+        self.timed = timed
+
+    def run(self):
+        index = 0
+        timings = None
+        while not self.pipeline.stopped:
+            try:
+                if self.timed:
+                    start = time.perf_counter()
+                    frames = self.capture_fn()
+                    timings = {'capture': time.perf_counter() - start}
+                else:
+                    frames = self.capture_fn()
+            except Exception as e:
+                self.pipeline.fail(e)
+                return
+            left_ir, right_ir, color_image = frames
+            self.out_queue.put(
+                FramePacket(index, time.time(), left_ir, right_ir, color_image, frames, timings)
+            )
+            index += 1
+
+
+class FramePipeline:
+    """
+    Runs capture and each processing stage in its own thread.
+
+    Stages are connected with bounded drop-oldest queues, so a slow stage
+    never stalls the ones before it and throughput is bounded by the
+    slowest stage rather than the sum of all stages.
+    """
+    def __init__(self, capture_fn, stages, queue_size=2, metrics=None, timed=False):
+        """
+        Args:
+            capture_fn: callable returning (left_ir, right_ir, color_image)
+            stages: list of (name, fn) pairs; fn(packet) fills fields in place
+            queue_size: capacity of every inter-stage queue
+            metrics: optional FrameMetrics; stage times go into packet.timings
+            timed: fill packet.timings even without metrics, e.g. for QualityController
+        """
+        self.queues = [
+            DropOldestQueue(queue_size, on_drop=FramePacket.release)
+            for _ in range(len(stages) + 1)
+        ]
+        self._stopped = threading.Event()
+        self._error = None
+        timed = timed or metrics is not None
+        self._threads = [CaptureStage(capture_fn, self.queues[0], self, timed)]
+        for i, (name, fn) in enumerate(stages):
+            self._threads.append(
+                PipelineStage(name, fn, self.queues[i], self.queues[i + 1], self)
+            )
+        if metrics is not None:
+            # Each queue is named after the stage that consumes it
+            names = [name for name, _ in stages] + ['output']
+            for name, q in zip(names, self.queues):
+                metrics.watch('queue_depth', q.qsize, queue=name)
+                metrics.watch('queue_dropped', lambda q=q: q.dropped, queue=name)
+
+    @property
+    def stopped(self):
+        return self._stopped.is_set()
+
+    @property
+    def dropped_frames(self):
+        return sum(q.dropped for q in self.queues)
+
+    def fail(self, error):
+        """Record the first error raised by a worker and stop the pipeline"""
+        if self._error is None:
+            self._error = error
+        self.stop()
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def get_result(self, timeout=None):
+        """
+        Return the next fully processed packet, or None on timeout.
+
+        Re-raises any exception raised inside a worker thread.
+        """
+        try:
+            return self.queues[-1].get(timeout=timeout)
+        except Empty:
+            if self._error is not None:
+                raise self._error
+            return None
+
+    def stop(self):
+        self._stopped.set()
+        for q in self.queues:
+            q.close()
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
@@ -0,0 +1,185 @@
+"""Background point cloud generation and export"""
+import os
+import struct
+import threading
+from queue import Empty
+import numpy as np
+from .frame_pipeline import DropOldestQueue
+
+# Per-frame record of the f16 stream: magic, frame index, timestamp, point count, flags
+RECORD_HEADER = struct.Struct('<4sQdIB3x')
+RECORD_MAGIC = b'PCF1'
+FLAG_COLOR = 1
+
+PLY_VERTEX = np.dtype([
+    ('x', '<f4'), ('y', '<f4'), ('z', '<f4'),
+    ('red', 'u1'), ('green', 'u1'), ('blue', 'u1'),
+])
+
+
+def write_ply(path, points, colors=None):
+    """
+    Write a binary little-endian PLY file.
+
+    Args:
+        points: (N, 3) float32 array in metres
+        colors: optional (N, 3) uint8 BGR array, stored as RGB
+    """
+    count = len(points)
+    header = ['ply', 'format binary_little_endian 1.0', f'element vertex {count}',
+              'property float x', 'property float y', 'property float z']
+    if colors is None:
+        body = np.ascontiguousarray(points, dtype='<f4')
+    else:
+        header += ['property uchar red', 'property uchar green', 'property uchar blue']
+        body = np.empty(count, dtype=PLY_VERTEX)
+        body['x'], body['y'], body['z'] = points[:, 0], points[:, 1], points[:, 2]
+        body['red'], body['green'], body['blue'] = colors[:, 2], colors[:, 1], colors[:, 0]
+    header.append('end_header\n')
+    with open(path, 'wb') as f:
+        f.write('\n'.join(header).encode('ascii'))
+        f.write(body.tobytes())
+
+
+def write_f16_record(f, index, timestamp, points, colors=None):
+    """
+    Append one frame to an open f16 stream.
+
+    Coordinates are stored as float16 (about 2-4 mm resolution at 2-5 m)
+    followed by RGB bytes when colors are given: 6 or 9 bytes per point
+    versus 15 for the PLY layout.
+    """
+    flags = FLAG_COLOR if colors is not None else 0
+    f.write(RECORD_HEADER.pack(RECORD_MAGIC, index, timestamp, len(points), flags))
+    # Contiguous arrays are written straight from their buffers, without a bytes copy
+    f.write(np.ascontiguousarray(points, dtype='<f2'))
+    if colors is not None:
+        f.write(np.ascontiguousarray(colors[:, ::-1]))
+
+
+def read_f16_stream(path):
+    """
+    Iterate over the frames of an f16 stream.
+
+    Yields:
+        (index, timestamp, points, colors) with float32 points and RGB uint8
+        colors, or None for frames written without color
+    """
+    with open(path, 'rb') as f:
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            magic, index, timestamp, count, flags = RECORD_HEADER.unpack(header)
+            if magic != RECORD_MAGIC:
+                raise ValueError(f"Corrupt point cloud stream at byte {f.tell() - len(header)}")
+            points = np.frombuffer(f.read(count * 6), dtype='<f2').reshape(count, 3)
+            colors = None
+            if flags & FLAG_COLOR:
+                colors = np.frombuffer(f.read(count * 3), dtype=np.uint8).reshape(count, 3)
+            yield index, timestamp, points.astype(np.float32), colors
+
+
+class PointCloudWriter:
+    """
+    Generates and writes point clouds on a background thread.
+
+    submit() only copies the frame's disparity (and color image) into a
+    bounded drop-oldest queue, so the frame loop never waits on
+    reprojection or disk; when the writer falls behind, the oldest pending
+    frames are skipped and counted in dropped.
+    """
+    def __init__(self, generator, output_dir, fmt='f16', queue_size=4, every_n_frames=1,
+                 color=True, crop_to_rois=False, metrics=None):
+        """
+        Args:
+            generator: PointCloudGenerator
+            output_dir: directory for frame_XXXXXX.ply files or the stream.pcf16 file
+            fmt: 'f16' for one appended float16 stream, 'ply' for one file per frame
+            queue_size: frames that may wait for the writer
+            every_n_frames: export every Nth submitted frame
+            color: attach colors from the color image
+            crop_to_rois: keep only points inside the submitted ROIs
+            metrics: optional FrameMetrics; exports the queue depth and dropped frames
+        """
+        if fmt not in ('f16', 'ply'):
+            raise ValueError(f"Unsupported point cloud format: {fmt}")
+        os.makedirs(output_dir, exist_ok=True)
+        self.generator = generator
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.every_n_frames = max(1, int(every_n_frames))
+        self.color = color
+        self.crop_to_rois = crop_to_rois
+        self.written = 0
+        self._queue = DropOldestQueue(queue_size)
+        self._stream = None
+        if fmt == 'f16':
+            self._stream = open(os.path.join(output_dir, 'stream.pcf16'), 'ab')
+        self._stopped = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='point-cloud', daemon=True)
+        self._thread.start()
+        if metrics is not None:
+            metrics.watch('queue_depth', self._queue.qsize, queue='point_cloud')
+            metrics.watch('queue_dropped', lambda: self.dropped, queue='point_cloud')
+
+    @property
+    def dropped(self):
+        return self._queue.dropped
+
+    def submit(self, index, timestamp, disparity, color_image=None, rois=None):
+        """Queue one frame for export; returns immediately"""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+        if index % self.every_n_frames:
+            return
+        if self.crop_to_rois:
+            rois = [tuple(roi) for roi in rois or ()]
+            if not rois:
+                return
+        else:
+            rois = None
+        if not self.color:
+            color_image = None
+        # Frame buffers are pooled or shared and are reused once released
+        self._queue.put((index, timestamp, disparity.copy(),
+                         None if color_image is None else color_image.copy(), rois))
+
+    def _run(self):
+        try:
+            while True:
+                try:
+                    index, timestamp, disparity, color_image, rois = self._queue.get(timeout=0.1)
+                except Empty:
+                    if self._stopped.is_set():
+                        return
+                    continue
+                points, colors = self.generator.generate(disparity, color_image, rois)
+                if self.fmt == 'ply':
+                    write_ply(os.path.join(self.output_dir, f'frame_{index:06d}.ply'),
+                              points, colors)
+                else:
+                    write_f16_record(self._stream, index, timestamp, points, colors)
+                self.written += 1
+        except Exception as e:
+            self._error = e
+        finally:
+            # Only the writer thread touches the stream, so it also closes it
+            if self._stream is not None:
+                self._stream.close()
+
+    def close(self, timeout=5.0):
+        """
+        Write out the frames still queued, then close the output.
+
+        If the writer is still busy after timeout it finishes and closes the
+        stream on its own; an error raised after the last submit() is re-raised here.
+        """
+        self._stopped.set()
+        self._queue.close()
+        self._thread.join(timeout)
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
@@ -0,0 +1,373 @@
+"""Depth and detection in worker processes with shared-memory frame transport"""
+import multiprocessing as mp
+import threading
+import time
+from concurrent.futures import Future
+from queue import Empty
+import numpy as np
+from .frame_pipeline import FramePacket, DropOldestQueue
+from .shared_ring import SharedFrameRing, frame_fields
+from ..config.model_config import SUPPORTED_MODELS
+from ..detection.runtime_detector import DetectionResult
+from ..utils.exceptions import DepthProcessingError, DetectionError
+
+
+def _depth_worker(ring_spec, tasks, results, depth_factory, timed=False):
+    """Worker process: computes disparity for each slot into the shared ring"""
+    ring = SharedFrameRing.attach(ring_spec)
+    try:
+        processor = depth_factory()
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            if task[0] == 'rois':
+                processor.set_rois(task[1])
+                continue
+            if task[0] == 'quality':
+                processor.set_quality(**task[1])
+                continue
+            slot = task[1]
+            views = ring.slot(slot)
+            start = time.perf_counter() if timed else None
+            disparity, _ = processor.compute_depth(views['left_ir'], views['right_ir'])
+            views['disparity'][...] = disparity
+            elapsed = time.perf_counter() - start if timed else None
+            results.put(('depth', slot, None, elapsed))
+    except Exception as e:
+        results.put(('error', 'depth', f"{type(e).__name__}: {e}"))
+    finally:
+        ring.close()
+
+
+def detection_arrays(result):
+    """Reduce a detector result to a picklable (N, 6) float32 array and class names"""
+    data = result.boxes.data
+    if hasattr(data, 'cpu'):
+        data = data.cpu().numpy()
+    return np.asarray(data, dtype=np.float32), dict(result.names)
+
+
+def _detection_worker(ring_spec, tasks, results, timed=False):
+    """Worker process: owns the models and runs detection on requested slots"""
+    from ..interface.model_manager import ModelManager
+    ring = SharedFrameRing.attach(ring_spec)
+    try:
+        # Models load on the manager's background thread, so detection keeps
+        # running on the previous model until the new one is ready
+        manager = ModelManager()
+
+        def report_loaded(request_id):
+            def done(future):
+                error = future.exception()
+                results.put(('model', request_id, None if error is None else str(error)))
+            return done
+
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            if task[0] == 'model':
+                _, request_id, model_type, model_name = task
+                future = manager.load_model_async(model_type, model_name)
+                future.add_done_callback(report_loaded(request_id))
+                continue
+            if task[0] == 'input_size':
+                manager.set_input_size(task[1])
+                continue
+            slot = task[1]
+            model = manager.current_model
+            start = time.perf_counter() if timed else None
+            detections = None
+            if model is not None:
+                detections = detection_arrays(model.detect(ring.slot(slot)['color_image']))
+            elapsed = time.perf_counter() - start if timed else None
+            results.put(('detect', slot, detections, elapsed))
+        manager.shutdown()
+    except Exception as e:
+        results.put(('error', 'detection', f"{type(e).__name__}: {e}"))
+    finally:
+        ring.close()
+
+
+class RemoteModelManager:
+    """
+    Stand-in for ModelManager when the models live in the detection process.
+
+    Offers the subset AppInterface uses: supported_models, load_model_async
+    returning a Future, and current_model_name.
+    """
+    def __init__(self, tasks):
+        self.supported_models = SUPPORTED_MODELS
+        self.current_model = None
+        self.current_model_name = None
+        self._tasks = tasks
+        self._requests = {}
+        self._next_request = 0
+        self._lock = threading.Lock()
+
+    def list_models(self):
+        print("\n可用的模型：")
+        for model_type, models in self.supported_models.items():
+            print(f"\n{model_type.upper()}:")
+            for name, info in models.items():
+                print(f"  - {name}: {info['description']}")
+
+    def load_model_async(self, model_type, model_name, on_ready=None):
+        future = Future()
+        with self._lock:
+            request_id = self._next_request
+            self._next_request += 1
+            self._requests[request_id] = (future, model_type, model_name, on_ready)
+        self._tasks.put(('model', request_id, model_type, model_name))
+        return future
+
+    def resolve(self, request_id, error):
+        with self._lock:
+            future, model_type, model_name, on_ready = self._requests.pop(request_id)
+        if error is not None:
+            future.set_exception(DetectionError(error))
+            return
+        if on_ready is not None:
+            on_ready()
+        self.current_model_name = f"{model_type}_{model_name}"
+        future.set_result(self.current_model_name)
+
+    def set_input_size(self, imgsz):
+        self._tasks.put(('input_size', imgsz))
+
+    def get_current_model(self):
+        raise DetectionError("模型在檢測程序中執行，無法在主程序取得")
+
+    def shutdown(self):
+        with self._lock:
+            requests, self._requests = self._requests, {}
+        for future, _, _, _ in requests.values():
+            future.cancel()
+
+
+class _SlotLease:
+    """Ownership of one ring slot; release() hands it back exactly once"""
+    owned = True
+
+    def __init__(self, pipeline, slot):
+        self._pipeline = pipeline
+        self.slot = slot
+
+    def release(self):
+        pipeline, self._pipeline = self._pipeline, None
+        if pipeline is not None:
+            pipeline._release_slot(self.slot)
+
+
+class ProcessPipeline:
+    """
+    Runs depth and detection in separate worker processes.
+
+    A capture thread copies every frame once into a free slot of a
+    SharedFrameRing and sends only the slot index to the workers. The depth
+    worker writes its disparity maps back into the same slot, the detection
+    worker returns its small box array through the result queue, and a
+    collector thread emits completed packets in frame order. Packets view the
+    shared slot directly and must be released after use.
+    """
+    def __init__(self, capture_fn, depth_factory, width, height,
+                 slot_count=6, queue_size=2, detect_filter=None, metrics=None, timed=False):
+        """
+        Args:
+            capture_fn: callable returning (left_ir, right_ir, color_image)
+            depth_factory: picklable callable building a depth processor in the worker
+            width, height: camera resolution
+            slot_count: frames that can be in flight at once
+            queue_size: capacity of the completed-packet queue
+            detect_filter: optional fn(frame_index) -> bool choosing frames to detect on
+            metrics: optional FrameMetrics; worker times come back with the results
+            timed: fill packet.timings even without metrics, e.g. for QualityController
+        """
+        context = mp.get_context('spawn')  # never fork the Tk / camera handles
+        self.ring = SharedFrameRing(frame_fields(width, height), slot_count)
+        self.capture_fn = capture_fn
+        self.detect_filter = detect_filter
+        self.timed = timed or metrics is not None
+        self.depth_tasks = context.Queue()
+        self.detect_tasks = context.Queue()
+        self.results = context.Queue()
+        spec = self.ring.spec()
+        self._processes = [
+            context.Process(target=_depth_worker, name='depth', daemon=True,
+                            args=(spec, self.depth_tasks, self.results, depth_factory,
+                                  self.timed)),
+            context.Process(target=_detection_worker, name='detection', daemon=True,
+                            args=(spec, self.detect_tasks, self.results, self.timed)),
+        ]
+        self.models = RemoteModelManager(self.detect_tasks)
+        self.output = DropOldestQueue(queue_size, on_drop=FramePacket.release)
+        self._free_slots = list(range(slot_count - 1, -1, -1))
+        self._pending = {}    # slot -> [packet, outstanding results]
+        self._completed = {}  # frame index -> packet waiting for earlier frames
+        self._next_index = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._error = None
+        self._workers_started = False
+        self._threads = [
+            threading.Thread(target=self._capture, name='capture', daemon=True),
+            threading.Thread(target=self._collect, name='collector', daemon=True),
+        ]
+        self.capture_dropped = 0
+        if metrics is not None:
+            metrics.watch('queue_depth', self.output.qsize, queue='output')
+            metrics.watch('queue_dropped', lambda: self.output.dropped, queue='output')
+            metrics.watch('queue_dropped', lambda: self.capture_dropped, queue='capture')
+            metrics.watch('free_slots', lambda: len(self._free_slots))
+
+    @property
+    def stopped(self):
+        return self._stopped.is_set()
+
+    @property
+    def dropped_frames(self):
+        return self.capture_dropped + self.output.dropped
+
+    def start_workers(self):
+        """Start the worker processes, e.g. so models load while the camera starts"""
+        if not self._workers_started:
+            for process in self._processes:
+                process.start()
+            self._threads[1].start()
+            self._workers_started = True
+
+    def start(self):
+        self.start_workers()
+        self._threads[0].start()
+
+    def fail(self, error):
+        if self._error is None:
+            self._error = error
+        self.stop()
+
+    def _acquire_slot(self):
+        with self._lock:
+            return self._free_slots.pop() if self._free_slots else None
+
+    def _release_slot(self, slot):
+        with self._lock:
+            self._free_slots.append(slot)
+
+    def _capture(self):
+        index = 0
+        timings = None
+        while not self.stopped:
+            try:
+                if self.timed:
+                    start = time.perf_counter()
+                    frames = self.capture_fn()
+                    timings = {'capture': time.perf_counter() - start}
+                else:
+                    frames = self.capture_fn()
+            except Exception as e:
+                self.fail(e)
+                return
+            slot = self._acquire_slot()
+            if slot is not None:
+                views = self.ring.slot(slot)
+                for field, image in zip(('left_ir', 'right_ir', 'color_image'), frames):
+                    np.copyto(views[field], image)
+            release = getattr(frames, 'release', None)
+            if release is not None:
+                release()
+            if slot is None:
+                # Every slot is still being processed or displayed
+                self.capture_dropped += 1
+                continue
+
+            packet = FramePacket(index, time.time(), views['left_ir'], views['right_ir'],
+                                 views['color_image'], _SlotLease(self, slot), timings)
+            detect = self.detect_filter is None or self.detect_filter(index)
+            with self._lock:
+                self._pending[slot] = [packet, 2 if detect else 1]
+            self.depth_tasks.put(('frame', slot))
+            if detect:
+                self.detect_tasks.put(('frame', slot))
+            index += 1
+
+    def _collect(self):
+        while not self.stopped:
+            try:
+                message = self.results.get(timeout=0.1)
+            except Empty:
+                continue
+            kind = message[0]
+            if kind == 'error':
+                error_type = DepthProcessingError if message[1] == 'depth' else DetectionError
+                self.fail(error_type(message[2]))
+                return
+            if kind == 'model':
+                self.models.resolve(message[1], message[2])
+                continue
+
+            slot = message[1]
+            with self._lock:
+                entry = self._pending[slot]
+                packet = entry[0]
+                if kind == 'depth':
+                    packet.disparity = self.ring.arrays['disparity'][slot]
+                elif message[2] is not None:
+                    packet.detections = DetectionResult(*message[2])
+                if packet.timings is not None:
+                    packet.timings['depth' if kind == 'depth' else 'detection'] = message[3]
+                entry[1] -= 1
+                if entry[1]:
+                    continue
+                del self._pending[slot]
+                # Emit in frame order so the tracker never sees frames out of sequence
+                self._completed[packet.index] = packet
+                ready = []
+                while self._next_index in self._completed:
+                    ready.append(self._completed.pop(self._next_index))
+                    self._next_index += 1
+            for packet in ready:
+                self.output.put(packet)
+
+    def set_rois(self, rois):
+        """Forward ROIs to depth processors that support them"""
+        self.depth_tasks.put(('rois', [tuple(int(v) for v in roi) for roi in rois]))
+
+    def set_quality(self, num_disparities=None, scale=None):
+        """Forward cost knobs to the depth worker's processor"""
+        self.depth_tasks.put(('quality', {'num_disparities': num_disparities, 'scale': scale}))
+        return True
+
+    def get_result(self, timeout=None):
+        """
+        Return the next completed packet, or None on timeout.
+
+        Re-raises any error raised in a worker process or thread.
+        """
+        try:
+            return self.output.get(timeout=timeout)
+        except Empty:
+            if self._error is not None:
+                raise self._error
+            return None
+
+    def stop(self):
+        self._stopped.set()
+        self.output.close()
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            if thread.is_alive() and thread is not threading.current_thread():
+                thread.join(timeout)
+        for tasks in (self.depth_tasks, self.detect_tasks):
+            tasks.put(None)
+        for process in self._processes:
+            if process.pid is None:
+                continue
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        for q in (self.depth_tasks, self.detect_tasks, self.results):
+            q.cancel_join_thread()
+        self.models.shutdown()
+        self.ring.close()
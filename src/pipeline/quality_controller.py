@@ -0,0 +1,203 @@
+"""Runtime quality adaptation towards a frame-time budget"""
+from collections import deque
+from ..config.pipeline_config import QUALITY_CONFIG
+
+# Stages that run on the main thread after depth and detection have finished
+MAIN_THREAD_STAGES = ('tracking', 'distance', 'render')
+
+
+def frame_cost(timings, parallel=False):
+    """
+    Processing time of one frame from its stage timings, excluding capture wait.
+
+    Sequential loops pay for every stage; in the pipelined modes stages overlap,
+    so throughput is bounded by the slowest of depth, detection and the main thread.
+    """
+    if not parallel:
+        return sum(seconds for stage, seconds in timings.items() if stage != 'capture')
+    main = sum(timings.get(stage, 0.0) for stage in MAIN_THREAD_STAGES)
+    return max(timings.get('depth', 0.0), timings.get('detection', 0.0), main)
+
+
+class QualityController:
+    """
+    Picks a quality level from a list ordered best to cheapest.
+
+    The mean frame cost over a window is compared with the budget: above
+    degrade_ratio * budget moves one level cheaper, below upgrade_ratio *
+    budget one level better, anything in between keeps the level. After every
+    change the window restarts and at least settle_frames pass before the next
+    decision. If an upgrade is undone by a degrade within that time, the wait
+    before retrying the upgrade doubles (up to max_backoff).
+
+    A level that had to be left remembers how much more it cost than the
+    level below it (its mean before the degrade minus the first full window
+    after it). It is only retried once the current mean plus that difference
+    fits the budget, so a level that does not fit is not reloaded in a cycle
+    however long the backoff.
+    """
+    def __init__(self, knobs=None, levels=None, target_fps=None, config=None):
+        """
+        Args:
+            knobs: QualityKnobs that every level change is applied to
+            levels: list of level dicts, best quality first
+            target_fps: frame rate whose frame time is the budget
+            config: QUALITY_CONFIG-style dict with the thresholds
+        """
+        config = config or QUALITY_CONFIG
+        self.knobs = knobs
+        self.levels = levels or config['levels']
+        self.budget = 1.0 / (target_fps or config['target_fps'])
+        self.degrade_ratio = config['degrade_ratio']
+        self.upgrade_ratio = config['upgrade_ratio']
+        self.settle_frames = config['settle_frames']
+        self.max_backoff = config['max_backoff']
+        self.index = min(config['initial_level'], len(self.levels) - 1)
+        self._costs = deque(maxlen=config['window'])
+        self._total = 0.0
+        self._frames_since_change = 0
+        self._upgraded_from = None
+        self._backoff = 1
+        self._failed_cost = {}   # level index -> mean cost when it was left
+        self._extra_cost = {}    # level index -> cost above the level below it
+        self._measuring = None   # level whose extra cost awaits the next full window
+        self.changes = 0
+
+    @property
+    def level(self):
+        return self.levels[self.index]
+
+    def apply_initial(self):
+        """Apply the initial level, keeping whatever model is already loading"""
+        if self.knobs is not None:
+            self.knobs.apply(self.level, switch_model=False)
+
+    def mean_cost(self):
+        return self._total / len(self._costs) if self._costs else 0.0
+
+    def update(self, seconds):
+        """
+        Record one frame cost.
+
+        Returns:
+            the new level dict when the level changed, otherwise None
+        """
+        if len(self._costs) == self._costs.maxlen:
+            self._total -= self._costs[0]
+        self._costs.append(seconds)
+        self._total += seconds
+        self._frames_since_change += 1
+        if len(self._costs) < self._costs.maxlen:
+            return None
+
+        mean = self.mean_cost()
+        if self._measuring is not None:
+            self._extra_cost[self._measuring] = self._failed_cost.pop(self._measuring) - mean
+            self._measuring = None
+
+        if (mean > self.budget * self.degrade_ratio and
+                self._frames_since_change >= self.settle_frames and
+                self.index < len(self.levels) - 1):
+            if self._upgraded_from == self.index + 1:
+                # The upgrade did not fit; wait longer before trying it again
+                self._backoff = min(self._backoff * 2, self.max_backoff)
+            else:
+                self._backoff = 1
+            self._upgraded_from = None
+            self._failed_cost[self.index] = mean
+            self._measuring = self.index
+            return self._change(self.index + 1)
+
+        if (mean < self.budget * self.upgrade_ratio and
+                self._frames_since_change >= self.settle_frames * self._backoff and
+                self.index > 0 and self._fits(self.index - 1, mean)):
+            self._upgraded_from = self.index
+            return self._change(self.index - 1)
+
+        if self._upgraded_from is not None and self._frames_since_change >= self.settle_frames * 2:
+            # The upgrade held for two settle periods, so it fits the budget
+            self._extra_cost.pop(self.index, None)
+            self._upgraded_from = None
+            self._backoff = 1
+        return None
+
+    def _fits(self, index, mean):
+        """Whether a level left before would fit, given the current mean cost"""
+        extra = self._extra_cost.get(index)
+        return extra is None or mean + extra <= self.budget * self.degrade_ratio
+
+    def _change(self, index):
+        print(f"品質等級 {self.index} -> {index}（平均幀時間 {self.mean_cost() * 1000.0:.1f} ms，"
+              f"預算 {self.budget * 1000.0:.1f} ms）")
+        self.index = index
+        self._costs.clear()
+        self._total = 0.0
+        self._frames_since_change = 0
+        self.changes += 1
+        if self.knobs is not None:
+            self.knobs.apply(self.level)
+        return self.level
+
+
+def _report_load_error(future):
+    if not future.cancelled() and future.exception() is not None:
+        print(f"錯誤: {str(future.exception())}")
+
+
+class QualityKnobs:
+    """
+    Applies a quality level to the components that own each knob.
+
+    Only knobs that differ from the last applied value are touched; the model
+    variant switches through load_model_async, so detection keeps running on
+    the previous model until the new one is warmed up.
+    """
+    def __init__(self, depth_processor=None, scheduler=None, model_manager=None,
+                 model_type='yolo'):
+        """
+        Args:
+            depth_processor: object with set_quality(num_disparities, scale)
+            scheduler: DetectionScheduler whose detect_interval is adjusted
+            model_manager: ModelManager or RemoteModelManager
+            model_type: SUPPORTED_MODELS group the model_name knob refers to
+        """
+        self.depth_processor = depth_processor
+        self.scheduler = scheduler
+        self.model_manager = model_manager
+        self.model_type = model_type
+        self._applied = {}
+
+    def _changed(self, level, key):
+        value = level.get(key)
+        if value is None or self._applied.get(key) == value:
+            return False
+        self._applied[key] = value
+        return True
+
+    def apply(self, level, switch_model=True):
+        """
+        Args:
+            level: dict with any of num_disparities, depth_scale, imgsz,
+                detect_interval, model_name
+            switch_model: False applies everything except the model variant,
+                e.g. while the startup model is still loading
+        """
+        depth_changed = self._changed(level, 'num_disparities')
+        depth_changed = self._changed(level, 'depth_scale') or depth_changed
+        if depth_changed and self.depth_processor is not None:
+            self.depth_processor.set_quality(
+                num_disparities=self._applied.get('num_disparities'),
+                scale=self._applied.get('depth_scale')
+            )
+        if self._changed(level, 'detect_interval') and self.scheduler is not None:
+            self.scheduler.detect_interval = level['detect_interval']
+        if self.model_manager is None:
+            return
+        if self._changed(level, 'imgsz'):
+            self.model_manager.set_input_size(level['imgsz'])
+        model_name = level.get('model_name')
+        if (switch_model and model_name and
+                self.model_manager.current_model_name != f"{self.model_type}_{model_name}" and
+                self._changed(level, 'model_name')):
+            future = self.model_manager.load_model_async(self.model_type, model_name)
+            future.add_done_callback(_report_load_error)
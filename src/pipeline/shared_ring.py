@@ -0,0 +1,76 @@
+"""Fixed-slot frame ring buffer in multiprocessing shared memory"""
+from multiprocessing import shared_memory
+import numpy as np
+
+
+def frame_fields(width, height):
+    """Arrays stored for every frame: camera images plus the depth results"""
+    return [
+        ('left_ir', (height, width), np.uint8),
+        ('right_ir', (height, width), np.uint8),
+        ('color_image', (height, width, 3), np.uint8),
+        ('disparity', (height, width), np.float32),
+    ]
+
+
+class SharedFrameRing:
+    """
+    One shared memory block holding slot_count copies of every field.
+
+    The creating process owns the block and unlinks it on close; worker
+    processes attach by name through spec(). Only slot indices travel through
+    queues, the frame data itself is never pickled.
+    """
+    def __init__(self, fields, slot_count, name=None):
+        """
+        Args:
+            fields: list of (name, shape, dtype)
+            slot_count: number of frames held at once
+            name: existing block to attach to; None creates a new block
+        """
+        self.fields = [(field, tuple(shape), np.dtype(dtype)) for field, shape, dtype in fields]
+        self.slot_count = slot_count
+        layout = []
+        offset = 0
+        for field, shape, dtype in self.fields:
+            offset = -(-offset // 64) * 64  # keep every array cache-line aligned
+            nbytes = slot_count * int(np.prod(shape)) * dtype.itemsize
+            layout.append((field, shape, dtype, offset))
+            offset += nbytes
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        else:
+            # Worker processes share the creator's resource tracker, so
+            # attaching does not take over the block's lifetime
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.arrays = {
+            field: np.ndarray((slot_count,) + shape, dtype=dtype, buffer=self.shm.buf, offset=start)
+            for field, shape, dtype, start in layout
+        }
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(spec['fields'], spec['slot_count'], name=spec['name'])
+
+    def spec(self):
+        """Picklable description used by worker processes to attach"""
+        return {
+            'name': self.shm.name,
+            'fields': [(field, shape, dtype.str) for field, shape, dtype in self.fields],
+            'slot_count': self.slot_count,
+        }
+
+    def slot(self, index):
+        """Views of every field for one slot"""
+        return {field: array[index] for field, array in self.arrays.items()}
+
+    def close(self):
+        self.arrays = {}
+        try:
+            self.shm.close()
+        except BufferError:
+            # A caller still holds a view; the mapping goes away with the process
+            pass
+        if self.owner:
+            self.shm.unlink()
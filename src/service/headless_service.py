@@ -0,0 +1,153 @@
+"""Headless tracking service: no Tk window, no OpenCV display"""
+import argparse
+import signal
+import threading
+from .result_publisher import ResultPublisher, frame_message
+from ..config.service_config import SERVICE_CONFIG
+from ..config.pipeline_config import PIPELINE_CONFIG, QUALITY_CONFIG
+from ..detection.detection_scheduler import DetectionScheduler
+from ..interface.frame_processor import FrameProcessor
+from ..interface.model_manager import ModelManager
+from ..pipeline.components import create_camera, create_depth_processor, create_point_cloud_writer
+from ..pipeline.frame_pipeline import FramePipeline
+from ..pipeline.quality_controller import QualityController, QualityKnobs, frame_cost
+from ..utils.metrics import create_metrics
+from ..utils.exceptions import CameraError, DepthProcessingError, DetectionError
+
+
+class HeadlessService:
+    """
+    擷取、深度、檢測與追蹤，每幀的追蹤結果交給 ResultPublisher 輸出
+
+    不匯入 tkinter，也不做任何繪圖或視窗更新，適合在無螢幕的節點上執行。
+    """
+    def __init__(self, config=None):
+        self.config = config or SERVICE_CONFIG
+        self.camera = create_camera()
+        self.depth_processor = create_depth_processor()
+        self.processor = FrameProcessor()
+        self.model_manager = ModelManager()
+        self.scheduler = DetectionScheduler()
+        self.publisher = ResultPublisher.from_config(self.config)
+        self.metrics = create_metrics()
+        self.point_cloud = None
+        self.quality = None
+        if QUALITY_CONFIG['enabled']:
+            self.quality = QualityController(
+                QualityKnobs(self.depth_processor, self.scheduler, self.model_manager)
+            )
+        self._stop = threading.Event()
+        self.frames_published = 0
+
+    def stop(self):
+        """要求主迴圈結束，可由訊號處理函式呼叫"""
+        self._stop.set()
+
+    def _compute_depth(self, packet):
+        packet.disparity, _ = self.depth_processor.compute_depth(
+            packet.left_ir, packet.right_ir
+        )
+
+    def _detect(self, packet):
+        model = self.model_manager.current_model
+        if model and self.scheduler.should_detect(packet.index, self.processor.track_uncertainty):
+            packet.detections = model.detect(packet.color_image)
+
+    def run(self):
+        # 模型在背景載入，同時啟動相機
+        loading = self.model_manager.load_model_async(
+            self.config['model_type'], self.config['model_name']
+        )
+        self.camera.start()
+        self.processor.set_stereo_calibration(*self.camera.get_stereo_calibration())
+        self.point_cloud = create_point_cloud_writer(self.camera, metrics=self.metrics)
+        loading.result()
+        if self.quality is not None:
+            self.quality.apply_initial()
+
+        pipeline = FramePipeline(
+            self.camera.get_frames,
+            [('depth', self._compute_depth), ('detection', self._detect)],
+            queue_size=PIPELINE_CONFIG['queue_size'],
+            metrics=self.metrics,
+            timed=self.quality is not None
+        )
+        pipeline.start()
+        try:
+            while not self._stop.is_set():
+                packet = pipeline.get_result(timeout=PIPELINE_CONFIG['result_timeout'])
+                if packet is None:
+                    continue
+                self.processor.update(packet.disparity, packet.detections, packet.timings,
+                                      packet.index)
+                self.depth_processor.set_rois(self.processor.last_bboxes)
+                if self.point_cloud is not None:
+                    self.point_cloud.submit(packet.index, packet.timestamp, packet.disparity,
+                                            packet.color_image, self.processor.last_bboxes)
+                self.publisher.publish(
+                    frame_message(packet.index, packet.timestamp, self.processor)
+                )
+                if self.metrics is not None:
+                    self.metrics.end_frame(packet.index, packet.timestamp, packet.timings)
+                if self.quality is not None:
+                    self.quality.update(frame_cost(packet.timings, parallel=True))
+                self.frames_published += 1
+                packet.release()
+        finally:
+            pipeline.stop()
+            pipeline.join(timeout=1.0)
+            if pipeline.dropped_frames:
+                print(f"管線丟棄幀數: {pipeline.dropped_frames}")
+
+    def close(self):
+        try:
+            self.camera.stop()
+        finally:
+            self.publisher.close()
+            self.model_manager.shutdown()
+            if self.metrics is not None:
+                self.metrics.close()
+            if self.point_cloud is not None:
+                self.point_cloud.close()
+
+
+def parse_address(value):
+    host, port = value.rsplit(':', 1)
+    return host, int(port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='無介面追蹤服務')
+    parser.add_argument('--zmq', type=str, default=None, help='ZeroMQ PUB 端點，例如 tcp://127.0.0.1:5556')
+    parser.add_argument('--udp', type=parse_address, default=None, help='UDP 目的位址 host:port')
+    parser.add_argument('--jsonl', type=str, default=None, help='逐行附加寫入結果的檔案')
+    args = parser.parse_args()
+
+    config = dict(SERVICE_CONFIG)
+    if args.zmq is not None:
+        config['zmq_endpoint'] = args.zmq
+    if args.udp is not None:
+        config['udp_address'] = args.udp
+    if args.jsonl is not None:
+        config['jsonl_path'] = args.jsonl
+    if not (config['zmq_endpoint'] or config['udp_address'] or config['jsonl_path']):
+        parser.error("至少需要設定一個輸出：--zmq、--udp 或 --jsonl")
+
+    service = HeadlessService(config)
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: service.stop())
+
+    print("無介面追蹤服務啟動中...")
+    try:
+        service.run()
+    except (CameraError, DepthProcessingError, DetectionError) as e:
+        print(f"錯誤: {str(e)}")
+        return 1
+    finally:
+        service.close()
+        print(f"已輸出 {service.frames_published} 幀，服務已關閉")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,103 @@
+"""Publishers for per-frame tracking results"""
+import json
+import math
+import socket
+
+
+def frame_message(frame_index, timestamp, processor):
+    """
+    Build the per-frame result record from a FrameProcessor.
+
+    Returns:
+        dict with frame index, capture timestamp and one entry per visible
+        track: id, bbox (x1, y1, x2, y2) and distance in metres (None if unknown)
+    """
+    tracker = processor.tracker
+    depths = tracker.visible_depths()
+    tracks = []
+    for object_id, bbox in tracker.visible_bboxes().items():
+        distance = depths.get(object_id)
+        if distance is not None and math.isnan(distance):
+            distance = None
+        tracks.append({'id': object_id, 'bbox': list(bbox), 'distance': distance})
+    return {'frame': frame_index, 'timestamp': timestamp, 'tracks': tracks}
+
+
+class JsonlPublisher:
+    """Appends one JSON line per frame to a file"""
+    def __init__(self, path):
+        self.file = open(path, 'a', encoding='utf-8', buffering=1)
+
+    def publish(self, message):
+        self.file.write(json.dumps(message, separators=(',', ':')) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class UdpPublisher:
+    """Sends one JSON datagram per frame; never blocks the frame loop"""
+    def __init__(self, address):
+        self.address = tuple(address)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.dropped = 0
+
+    def publish(self, message):
+        try:
+            self.sock.sendto(json.dumps(message, separators=(',', ':')).encode('utf-8'),
+                             self.address)
+        except (BlockingIOError, ConnectionRefusedError):
+            self.dropped += 1
+
+    def close(self):
+        self.sock.close()
+
+
+class ZmqPublisher:
+    """ZeroMQ PUB socket; messages are dropped instead of queued when no one keeps up"""
+    def __init__(self, endpoint, topic='tracks'):
+        import zmq  # optional dependency, only needed when an endpoint is configured
+        self._zmq = zmq
+        self.context = zmq.Context.instance()
+        self.sock = self.context.socket(zmq.PUB)
+        self.sock.setsockopt(zmq.SNDHWM, 100)
+        self.sock.setsockopt(zmq.LINGER, 0)
+        self.sock.bind(endpoint)
+        self.topic = topic.encode('utf-8')
+        self.dropped = 0
+
+    def publish(self, message):
+        payload = json.dumps(message, separators=(',', ':')).encode('utf-8')
+        try:
+            self.sock.send_multipart([self.topic, payload], flags=self._zmq.NOBLOCK)
+        except self._zmq.Again:
+            self.dropped += 1
+
+    def close(self):
+        self.sock.close()
+
+
+class ResultPublisher:
+    """Fans each frame result out to every configured publisher"""
+    def __init__(self, publishers):
+        self.publishers = list(publishers)
+
+    @classmethod
+    def from_config(cls, config):
+        publishers = []
+        if config.get('zmq_endpoint'):
+            publishers.append(ZmqPublisher(config['zmq_endpoint'], config.get('topic', 'tracks')))
+        if config.get('udp_address'):
+            publishers.append(UdpPublisher(config['udp_address']))
+        if config.get('jsonl_path'):
+            publishers.append(JsonlPublisher(config['jsonl_path']))
+        return cls(publishers)
+
+    def publish(self, message):
+        for publisher in self.publishers:
+            publisher.publish(message)
+
+    def close(self):
+        for publisher in self.publishers:
+            publisher.close()
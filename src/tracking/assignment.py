@@ -0,0 +1,153 @@
+"""Cost matrices and optimal assignment for track / detection association"""
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment as _scipy_linear_sum_assignment
+except ImportError:  # scipy 為選用套件，缺少時使用下方的 numpy 實作
+    _scipy_linear_sum_assignment = None
+
+
+def centroid_distances(track_centroids, det_centroids):
+    """所有追蹤物體與檢測質心之間的歐氏距離矩陣 (N, M)"""
+    track_centroids = np.asarray(track_centroids, dtype=np.float64)
+    det_centroids = np.asarray(det_centroids, dtype=np.float64)
+    dx = track_centroids[:, 0, None] - det_centroids[None, :, 0]
+    dy = track_centroids[:, 1, None] - det_centroids[None, :, 1]
+    dx *= dx
+    dy *= dy
+    dx += dy
+    return np.sqrt(dx, out=dx)
+
+
+def iou_matrix(track_boxes, det_boxes):
+    """所有追蹤框與檢測框之間的 IoU 矩陣 (N, M)"""
+    t = track_boxes[:, None, :].astype(np.float64)
+    d = det_boxes[None, :, :].astype(np.float64)
+    inter_w = np.clip(np.minimum(t[..., 2], d[..., 2]) - np.maximum(t[..., 0], d[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(t[..., 3], d[..., 3]) - np.maximum(t[..., 1], d[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_t = (t[..., 2] - t[..., 0]) * (t[..., 3] - t[..., 1])
+    area_d = (d[..., 2] - d[..., 0]) * (d[..., 3] - d[..., 1])
+    union = area_t + area_d - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def _hungarian(cost):
+    """
+    最短增廣路徑匈牙利演算法，內層對所有列向量化
+
+    cost 的列數必須不大於行數
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)    # p[j]: 指派到第 j 行的列（1 起算，0 表示未指派）
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    cols = np.nonzero(p[1:])[0]
+    rows = p[1:][cols] - 1
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def _greedy(cost):
+    """依最小代價由小到大貪婪匹配"""
+    order = np.argsort(cost, axis=None)
+    rows, cols = np.unravel_index(order, cost.shape)
+    used_rows = np.zeros(cost.shape[0], dtype=bool)
+    used_cols = np.zeros(cost.shape[1], dtype=bool)
+    matched_rows, matched_cols = [], []
+    for row, col in zip(rows.tolist(), cols.tolist()):
+        if used_rows[row] or used_cols[col]:
+            continue
+        used_rows[row] = used_cols[col] = True
+        matched_rows.append(row)
+        matched_cols.append(col)
+        if len(matched_rows) == min(cost.shape):
+            break
+    return np.array(matched_rows, dtype=np.int64), np.array(matched_cols, dtype=np.int64)
+
+
+def linear_assignment(cost, method='hungarian'):
+    """
+    求解最小代價指派
+
+    Args:
+        cost: (N, M) 代價矩陣
+        method: 'hungarian' 最佳指派, 'greedy' 貪婪匹配
+
+    Returns:
+        (rows, cols): 匹配的列與行索引
+    """
+    if cost.size == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    if method == 'greedy':
+        return _greedy(cost)
+    if _scipy_linear_sum_assignment is not None:
+        return _scipy_linear_sum_assignment(cost)
+    if cost.shape[0] > cost.shape[1]:
+        cols, rows = _hungarian(cost.T)
+        order = np.argsort(rows)
+        return rows[order], cols[order]
+    return _hungarian(cost)
+
+
+def gated_assignment(cost, gate, method='hungarian'):
+    """
+    只在門檻內的配對上求解指派
+
+    只有唯一可行配對的追蹤與檢測（彼此孤立的連通分量）直接配對，
+    其餘列與行組成的子矩陣再交給 linear_assignment，結果與整體求解相同。
+
+    Returns:
+        (rows, cols): 代價低於 gate 的匹配
+    """
+    empty = np.empty(0, dtype=np.int64)
+    if cost.size == 0:
+        return empty, empty
+    feasible = cost < gate
+    row_degree = feasible.sum(axis=1)
+    col_degree = feasible.sum(axis=0)
+    col_of_row = feasible.argmax(axis=1)
+    isolated = (row_degree == 1) & (col_degree[col_of_row] == 1)
+
+    rows = [np.flatnonzero(isolated)]
+    cols = [col_of_row[isolated]]
+
+    rest_rows = np.flatnonzero((row_degree > 0) & ~isolated)
+    if rest_rows.size:
+        taken = np.zeros(cost.shape[1], dtype=bool)
+        taken[cols[0]] = True
+        rest_cols = np.flatnonzero((col_degree > 0) & ~taken)
+        sub = cost[np.ix_(rest_rows, rest_cols)]
+        sub_rows, sub_cols = linear_assignment(sub, method)
+        accepted = sub[sub_rows, sub_cols] < gate
+        rows.append(rest_rows[sub_rows[accepted]])
+        cols.append(rest_cols[sub_cols[accepted]])
+    return np.concatenate(rows), np.concatenate(cols)
@@ -0,0 +1,125 @@
+"""Struct-of-arrays storage for tracked objects"""
+import numpy as np
+
+
+class TrackStore:
+    """
+    以預先配置的 numpy 陣列儲存所有追蹤物體的狀態
+
+    每個追蹤物體佔用一個 slot，刪除後 slot 與 ID 都會回收重用。
+    軌跡使用長度為 2 * history_length 的雙寫環形緩衝：每個點同時寫入
+    head 與 head + history_length，因此任何時刻最近的軌跡都是一段
+    連續的切片，繪圖時不需要複製或重排。
+    """
+    def __init__(self, capacity=64, history_length=64, id_pool_size=65536):
+        """
+        Args:
+            capacity: 初始 slot 數量，不足時自動倍增
+            history_length: 每個物體保留的軌跡點數
+            id_pool_size: ID 在 [0, id_pool_size) 內循環使用
+        """
+        self.history_length = history_length
+        self.id_pool_size = id_pool_size
+        self.capacity = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.active = np.empty(0, dtype=bool)
+        self.centroids = np.empty((0, 2), dtype=np.int32)
+        self.bboxes = np.empty((0, 4), dtype=np.int32)
+        self.depths = np.empty(0, dtype=np.float32)
+        self.disappeared = np.empty(0, dtype=np.int32)
+        self.kf_mean = np.empty((0, 8), dtype=np.float64)
+        self.kf_cov = np.empty((0, 4, 3), dtype=np.float64)  # 每軸 (pp, pv, vv)
+        self.paths = np.empty((0, 2 * history_length, 2), dtype=np.int32)
+        self.path_len = np.empty(0, dtype=np.int32)
+        self.path_head = np.empty(0, dtype=np.int32)
+        self._free_slots = []
+        self._slot_of_id = {}
+        self._next_id = 0
+        self._grow(capacity)
+
+    def __len__(self):
+        return len(self._slot_of_id)
+
+    def _grow(self, capacity):
+        """擴充 slot 數量，只在同時追蹤的物體數超過目前容量時發生"""
+        extra = capacity - self.capacity
+        if extra <= 0:
+            return
+
+        def extend(array, fill):
+            grown = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            grown[:self.capacity] = array
+            return grown
+
+        self.ids = extend(self.ids, -1)
+        self.active = extend(self.active, False)
+        self.centroids = extend(self.centroids, 0)
+        self.bboxes = extend(self.bboxes, 0)
+        self.depths = extend(self.depths, np.nan)
+        self.disappeared = extend(self.disappeared, 0)
+        self.kf_mean = extend(self.kf_mean, 0)
+        self.kf_cov = extend(self.kf_cov, 0)
+        self.paths = extend(self.paths, 0)
+        self.path_len = extend(self.path_len, 0)
+        self.path_head = extend(self.path_head, 0)
+        self._free_slots.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def _allocate_id(self):
+        if len(self._slot_of_id) >= self.id_pool_size:
+            raise RuntimeError("追蹤 ID 已用盡")
+        while self._next_id in self._slot_of_id:
+            self._next_id = (self._next_id + 1) % self.id_pool_size
+        object_id = self._next_id
+        self._next_id = (self._next_id + 1) % self.id_pool_size
+        return object_id
+
+    def active_slots(self):
+        return np.flatnonzero(self.active)
+
+    def slot_of(self, object_id):
+        return self._slot_of_id[object_id]
+
+    def add(self, centroids, bboxes, depths):
+        """新增多個物體，返回其 slot 索引"""
+        count = len(centroids)
+        if count > len(self._free_slots):
+            self._grow(max(self.capacity * 2, len(self) + count))
+        slots = np.array([self._free_slots.pop() for _ in range(count)], dtype=np.int64)
+        for slot in slots.tolist():
+            object_id = self._allocate_id()
+            self.ids[slot] = object_id
+            self._slot_of_id[object_id] = slot
+        self.active[slots] = True
+        self.disappeared[slots] = 0
+        self.path_len[slots] = 0
+        self.path_head[slots] = 0
+        self.set_state(slots, centroids, bboxes, depths)
+        return slots
+
+    def set_state(self, slots, centroids, bboxes, depths):
+        """更新多個物體的位置與距離，並將質心加入軌跡"""
+        self.centroids[slots] = centroids
+        self.bboxes[slots] = bboxes
+        self.depths[slots] = depths
+        self.append_points(slots, centroids)
+
+    def append_points(self, slots, points):
+        head = self.path_head[slots]
+        self.paths[slots, head] = points
+        self.paths[slots, head + self.history_length] = points
+        self.path_head[slots] = (head + 1) % self.history_length
+        self.path_len[slots] = np.minimum(self.path_len[slots] + 1, self.history_length)
+
+    def remove(self, slots):
+        """刪除物體並回收 slot 與 ID"""
+        for slot in slots.tolist():
+            del self._slot_of_id[int(self.ids[slot])]
+            self._free_slots.append(slot)
+        self.active[slots] = False
+        self.ids[slots] = -1
+
+    def path(self, slot):
+        """返回 slot 的軌跡（由舊到新），為內部緩衝的視圖，呼叫端不可修改"""
+        end = self.path_head[slot] + self.history_length
+        return self.paths[slot, end - self.path_len[slot]:end]
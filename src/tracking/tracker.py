@@ -2,113 +2,197 @@
 import numpy as np
 from collections import OrderedDict
 import cv2
+from .assignment import centroid_distances, iou_matrix, gated_assignment
+from .track_store import TrackStore
+from .motion_model import ConstantVelocityModel, measurements_to_boxes
+
+# 超出匹配門檻的代價，讓指派演算法避開這些配對
+GATED_COST = 1e6
 
 class ObjectTracker:
-    def __init__(self, max_disappeared=30, max_distance=50):
-        self.next_object_id = 0
-        self.objects = OrderedDict()  # 儲存追蹤的物體 {ID: centroid}
-        self.disappeared = OrderedDict()  # 記錄物體消失的幀數
-        self.object_paths = OrderedDict()  # 記錄物體的運動軌跡
+    def __init__(self, max_disappeared=30, max_distance=50, cost_metric='centroid',
+                 assignment='hungarian', min_iou=0.1, depth_weight=100.0,
+                 history_length=64, initial_capacity=64, id_pool_size=65536,
+                 position_noise=1.0, velocity_noise=0.5, measurement_noise=4.0):
+        """
+        Args:
+            max_disappeared: 物體消失多少幀後停止追蹤
+            max_distance: 質心 / 3D 代價的最大匹配距離（像素）
+            cost_metric: 'centroid' 質心距離, 'iou' 1 - IoU, '3d' 質心距離加上深度差
+            assignment: 'hungarian' 最佳指派, 'greedy' 貪婪匹配
+            min_iou: 'iou' 模式下的最小匹配 IoU
+            depth_weight: '3d' 模式下每公尺深度差換算的像素代價
+            history_length: 每個物體保留的軌跡點數
+            initial_capacity: 預先配置的追蹤 slot 數量
+            id_pool_size: 物體 ID 循環使用的範圍
+            position_noise, velocity_noise, measurement_noise: 運動模型雜訊（像素）
+        """
+        self.store = TrackStore(initial_capacity, history_length, id_pool_size)
+        self.motion_model = ConstantVelocityModel(position_noise, velocity_noise, measurement_noise)
         self.max_disappeared = max_disappeared
         self.max_distance = max_distance
-        
-    def register(self, centroid):
+        self.cost_metric = cost_metric
+        self.assignment = assignment
+        self.min_iou = min_iou
+        self.depth_weight = depth_weight
+
+    @property
+    def objects(self):
+        """追蹤中的物體 {ID: centroid}"""
+        slots = self.store.active_slots()
+        return OrderedDict(zip(self.store.ids[slots].tolist(), self.store.centroids[slots]))
+
+    def register(self, centroids, bboxes, depths):
         """註冊新物體"""
-        self.objects[self.next_object_id] = centroid
-        self.disappeared[self.next_object_id] = 0
-        self.object_paths[self.next_object_id] = [centroid]
-        self.next_object_id += 1
-        
-    def deregister(self, object_id):
+        slots = self.store.add(centroids, bboxes, depths)
+        self.store.kf_mean[slots], self.store.kf_cov[slots] = self.motion_model.initiate(bboxes)
+        return slots
+
+    def deregister(self, slots):
         """取消註冊消失的物體"""
-        del self.objects[object_id]
-        del self.disappeared[object_id]
-        del self.object_paths[object_id]
-        
-    def update(self, rects):
+        self.store.remove(slots)
+
+    def _cost_matrix(self, slots, rects, centroids, depths):
+        """計算追蹤物體 (列) 與檢測 (行) 的代價矩陣，超出門檻者設為 GATED_COST"""
+        if self.cost_metric == 'iou':
+            cost = 1.0 - iou_matrix(self.store.bboxes[slots], rects)
+            cost[cost > 1.0 - self.min_iou] = GATED_COST
+            return cost
+
+        cost = centroid_distances(self.store.centroids[slots], centroids)
+        if self.cost_metric == '3d':
+            track_depths = self.store.depths[slots].astype(np.float64)
+            depth_diff = np.nan_to_num(np.abs(track_depths[:, None] - depths[None, :]))
+            cost = np.hypot(cost, depth_diff * self.depth_weight)
+        cost[cost > self.max_distance] = GATED_COST
+        return cost
+
+    def _age(self, slots):
+        """未匹配的物體消失幀數加一，超過上限則刪除"""
+        self.store.disappeared[slots] += 1
+        expired = slots[self.store.disappeared[slots] > self.max_disappeared]
+        if expired.size:
+            self.deregister(expired)
+
+    def _predict(self, slots, dt=1):
+        """以運動模型將物體推進 dt 幀，並以預測框更新位置"""
+        store = self.store
+        store.kf_mean[slots], store.kf_cov[slots] = self.motion_model.predict(
+            store.kf_mean[slots], store.kf_cov[slots], dt
+        )
+        store.bboxes[slots] = measurements_to_boxes(store.kf_mean[slots])
+        store.centroids[slots] = np.rint(store.kf_mean[slots, :2]).astype(np.int32)
+
+    def predict(self, dt=1):
+        """
+        沒有檢測結果的幀：只以運動模型推進所有物體
+
+        Args:
+            dt: 距離上次更新的幀數
+
+        Returns:
+            追蹤中的物體 {ID: centroid}
+        """
+        slots = self.store.active_slots()
+        if slots.size:
+            self._predict(slots, dt)
+            self.store.append_points(slots, self.store.centroids[slots])
+        return self.objects
+
+    def max_uncertainty(self):
+        """可見物體中心位置標準差的最大值（像素），沒有物體時為 0"""
+        slots = self.store.active_slots()
+        slots = slots[self.store.disappeared[slots] == 0]
+        if slots.size == 0:
+            return 0.0
+        return float(self.motion_model.position_uncertainty(self.store.kf_cov[slots]).max())
+
+    def set_depths(self, depths):
+        """以 {ID: 公尺} 更新物體距離"""
+        for object_id, depth in depths.items():
+            self.store.depths[self.store.slot_of(object_id)] = depth
+
+    def update(self, rects, depths=None, dt=1):
         """
         更新追蹤狀態
-        
+
         Args:
             rects: 檢測到的物體邊界框列表 [(x1, y1, x2, y2), ...]
+            depths: 每個檢測框的距離（公尺），'3d' 代價使用
+            dt: 距離上次更新的幀數；管線丟幀時大於 1，速度仍以每幀估計
         """
+        slots = self.store.active_slots()
+        if slots.size:
+            # 先預測，再以預測位置與檢測框匹配
+            self._predict(slots, dt)
         if len(rects) == 0:
             # 所有物體都消失了
-            for object_id in list(self.disappeared.keys()):
-                self.disappeared[object_id] += 1
-                if self.disappeared[object_id] > self.max_disappeared:
-                    self.deregister(object_id)
+            self._age(slots)
             return self.objects
-            
+
         # 計算當前幀中物體的質心
-        centroids = np.zeros((len(rects), 2), dtype="int")
-        for (i, (x1, y1, x2, y2)) in enumerate(rects):
-            cx = int((x1 + x2) / 2)
-            cy = int((y1 + y2) / 2)
-            centroids[i] = (cx, cy)
-            
-        if len(self.objects) == 0:
-            # 如果沒有追蹤的物體，註冊所有檢測到的物體
-            for i in range(len(centroids)):
-                self.register(centroids[i])
+        boxes = np.asarray(rects, dtype=np.int32).reshape(-1, 4)
+        centroids = (boxes[:, :2] + boxes[:, 2:]) // 2
+        if depths is None:
+            depths = np.full(len(boxes), np.nan)
         else:
-            object_ids = list(self.objects.keys())
-            object_centroids = list(self.objects.values())
-            
-            # 計算所有物體之間的距離
-            distances = np.zeros((len(object_centroids), len(centroids)))
-            for i in range(len(object_centroids)):
-                for j in range(len(centroids)):
-                    distances[i, j] = np.linalg.norm(object_centroids[i] - centroids[j])
-                    
-            # 找到最佳匹配
-            rows = distances.min(axis=1).argsort()
-            cols = distances.argmin(axis=1)[rows]
-            used_rows = set()
-            used_cols = set()
-            
-            for (row, col) in zip(rows, cols):
-                if row in used_rows or col in used_cols:
-                    continue
-                if distances[row, col] > self.max_distance:
-                    continue
-                    
-                object_id = object_ids[row]
-                self.objects[object_id] = centroids[col]
-                self.disappeared[object_id] = 0
-                self.object_paths[object_id].append(centroids[col])
-                used_rows.add(row)
-                used_cols.add(col)
-                
-            unused_rows = set(range(len(object_centroids))) - used_rows
-            unused_cols = set(range(len(centroids))) - used_cols
-            
+            depths = np.asarray(depths, dtype=np.float64)
+
+        matched_cols = np.zeros(len(boxes), dtype=bool)
+        if slots.size:
+            cost = self._cost_matrix(slots, boxes, centroids, depths)
+            rows, cols = gated_assignment(cost, GATED_COST, self.assignment)
+            matched_cols[cols] = True
+            matched_rows = np.zeros(len(slots), dtype=bool)
+            matched_rows[rows] = True
+
+            matched = slots[rows]
+            store = self.store
+            store.kf_mean[matched], store.kf_cov[matched] = self.motion_model.update(
+                store.kf_mean[matched], store.kf_cov[matched], boxes[cols]
+            )
+            store.set_state(matched, centroids[cols], boxes[cols], depths[cols])
+            store.disappeared[matched] = 0
+
             # 處理消失的物體
-            if len(object_centroids) >= len(centroids):
-                for row in unused_rows:
-                    object_id = object_ids[row]
-                    self.disappeared[object_id] += 1
-                    if self.disappeared[object_id] > self.max_disappeared:
-                        self.deregister(object_id)
-            else:
-                # 註冊新物體
-                for col in unused_cols:
-                    self.register(centroids[col])
-                    
+            self._age(slots[~matched_rows])
+
+        # 註冊新物體
+        new = ~matched_cols
+        if new.any():
+            self.register(centroids[new], boxes[new], depths[new])
+
         return self.objects
-        
+
+    def visible_bboxes(self):
+        """返回最近一次檢測有匹配到的物體邊界框 {ID: bbox}，預測幀為預測框"""
+        slots = self.store.active_slots()
+        slots = slots[self.store.disappeared[slots] == 0]
+        return OrderedDict(zip(self.store.ids[slots].tolist(),
+                               map(tuple, self.store.bboxes[slots].tolist())))
+
+    def visible_depths(self):
+        """返回最近一次檢測有匹配到的物體距離 {ID: 公尺}"""
+        slots = self.store.active_slots()
+        slots = slots[self.store.disappeared[slots] == 0]
+        return OrderedDict(zip(self.store.ids[slots].tolist(),
+                               self.store.depths[slots].tolist()))
+
     def draw_tracks(self, frame):
         """繪製追蹤軌跡"""
-        for object_id, path in self.object_paths.items():
-            if len(path) > 1:
-                # 繪製軌跡
-                path_array = np.array(path, dtype=np.int32)
-                cv2.polylines(frame, [path_array], False, (0, 255, 0), 2)
-                
-                # 在當前位置顯示ID
-                if object_id in self.objects:
-                    current_pos = self.objects[object_id]
-                    cv2.putText(frame, f"ID {object_id}",
-                              (current_pos[0] - 10, current_pos[1] - 10),
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-        return frame
\ No newline at end of file
+        slots = self.store.active_slots()
+        slots = slots[self.store.path_len[slots] > 1]
+        if slots.size == 0:
+            return frame
+
+        # 所有軌跡以一次 polylines 呼叫繪製
+        paths = [self.store.path(slot) for slot in slots.tolist()]
+        cv2.polylines(frame, paths, False, (0, 255, 0), 2)
+
+        # 在當前位置顯示ID
+        for object_id, (cx, cy) in zip(self.store.ids[slots].tolist(),
+                                       self.store.centroids[slots].tolist()):
+            cv2.putText(frame, f"ID {object_id}",
+                        (cx - 10, cy - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+        return frame
@@ -0,0 +1,265 @@
+"""Per-stage frame timing with rolling histograms and Prometheus/CSV export"""
+import csv
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from ..config.metrics_config import METRICS_CONFIG
+
+STAGES = ('capture', 'depth', 'detection', 'tracking', 'distance', 'render')
+
+
+class RollingHistogram:
+    """
+    Fixed-bucket histogram of durations plus a ring of the most recent samples.
+
+    Bucket counts are cumulative over the whole run as Prometheus expects;
+    percentiles come from the last `window` samples only.
+    """
+    def __init__(self, bounds, window):
+        """
+        Args:
+            bounds: sorted bucket upper bounds in seconds
+            window: number of recent samples kept for percentiles
+        """
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._samples = np.zeros(window, dtype=np.float64)
+        self._next = 0
+
+    def observe(self, seconds):
+        self.buckets[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self._samples[self._next % len(self._samples)] = seconds
+        self._next += 1
+
+    def window(self):
+        """Recent samples, oldest order not preserved"""
+        return self._samples[:min(self._next, len(self._samples))]
+
+    def percentile(self, q):
+        samples = self.window()
+        return float(np.percentile(samples, q)) if len(samples) else float('nan')
+
+
+class FrameMetrics:
+    """
+    Collects stage durations per frame and exposes them as histograms.
+
+    Stages write their durations into a per-frame `timings` dict wherever they
+    run; end_frame() folds the dict into the histograms on the consuming
+    thread, so the hot path never takes a lock. Queue depths and drop counters
+    are registered as callables with watch() and only read at export time.
+    """
+    def __init__(self, window=None, buckets_ms=None, csv_path=None, overlay=False):
+        window = window or METRICS_CONFIG['window']
+        buckets_ms = buckets_ms or METRICS_CONFIG['buckets_ms']
+        self.bounds = [ms / 1000.0 for ms in sorted(buckets_ms)]
+        self.window_size = window
+        self.histograms = {}
+        self._gauges = []  # (name, labels, fn)
+        self._frame_ends = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.overlay = overlay
+        self.exporter = None
+        self._csv_file = None
+        self._csv = None
+        if csv_path:
+            self._csv_file = open(csv_path, 'w', newline='')
+            self._csv = csv.writer(self._csv_file)
+            self._csv.writerow(['frame', 'timestamp', 'latency_ms'] + [f'{s}_ms' for s in STAGES])
+
+    def _histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = RollingHistogram(self.bounds, self.window_size)
+        return histogram
+
+    def watch(self, name, fn, **labels):
+        """Register fn() -> number, sampled as a gauge at export time"""
+        self._gauges.append((name, tuple(sorted(labels.items())), fn))
+
+    def end_frame(self, index, timestamp, timings):
+        """
+        Record one completed frame.
+
+        Args:
+            index: frame number
+            timestamp: time.time() at capture, used for end-to-end latency
+            timings: {stage: seconds} filled in by the stages
+        """
+        now = time.time()
+        latency = now - timestamp
+        with self._lock:
+            for stage, seconds in timings.items():
+                self._histogram(stage).observe(seconds)
+            self._histogram('latency').observe(latency)
+            self._frame_ends.append(now)
+            self.frames += 1
+        if self._csv is not None:
+            self._csv.writerow(
+                [index, f'{timestamp:.6f}', f'{latency * 1000.0:.3f}'] +
+                [f'{timings[s] * 1000.0:.3f}' if s in timings else '' for s in STAGES]
+            )
+
+    def fps(self):
+        ends = self._frame_ends
+        if len(ends) < 2 or ends[-1] == ends[0]:
+            return 0.0
+        return (len(ends) - 1) / (ends[-1] - ends[0])
+
+    def summary(self):
+        """FPS and recent latency percentiles in milliseconds, for the overlay"""
+        with self._lock:
+            latency = self.histograms.get('latency')
+            p50 = latency.percentile(50) * 1000.0 if latency else float('nan')
+            p95 = latency.percentile(95) * 1000.0 if latency else float('nan')
+            stages = {
+                stage: self.histograms[stage].percentile(50) * 1000.0
+                for stage in STAGES if stage in self.histograms
+            }
+        return {'fps': self.fps(), 'latency_p50_ms': p50, 'latency_p95_ms': p95,
+                'stage_p50_ms': stages}
+
+    def render_prometheus(self):
+        """Current metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            histograms = [(name, h, list(h.buckets), h.count, h.sum,
+                           h.percentile(50), h.percentile(95), h.percentile(99))
+                          for name, h in self.histograms.items()]
+            fps = self.fps()
+            frames = self.frames
+        edges = [f'{b:g}' for b in self.bounds] + ['+Inf']
+
+        lines.append('# HELP stereo_stage_seconds Per-frame processing time of each stage')
+        lines.append('# TYPE stereo_stage_seconds histogram')
+        for name, _, buckets, count, total, *_ in histograms:
+            cumulative = 0
+            for edge, n in zip(edges, buckets):
+                cumulative += n
+                lines.append(f'stereo_stage_seconds_bucket{{stage="{name}",le="{edge}"}} {cumulative}')
+            lines.append(f'stereo_stage_seconds_sum{{stage="{name}"}} {total:.9g}')
+            lines.append(f'stereo_stage_seconds_count{{stage="{name}"}} {count}')
+
+        lines.append(f'# HELP stereo_stage_window_seconds Stage time percentiles over the last {self.window_size} frames')
+        lines.append('# TYPE stereo_stage_window_seconds gauge')
+        for name, _, _, _, _, p50, p95, p99 in histograms:
+            for quantile, value in (('0.5', p50), ('0.95', p95), ('0.99', p99)):
+                lines.append(f'stereo_stage_window_seconds{{stage="{name}",quantile="{quantile}"}} {value:.9g}')
+
+        lines.append('# TYPE stereo_frames_total counter')
+        lines.append(f'stereo_frames_total {frames}')
+        lines.append('# TYPE stereo_fps gauge')
+        lines.append(f'stereo_fps {fps:.3f}')
+
+        # Samples of one metric family must be contiguous in the exposition format
+        declared = None
+        for name, labels, fn in sorted(self._gauges, key=lambda gauge: gauge[0]):
+            if name != declared:
+                lines.append(f'# TYPE stereo_{name} gauge')
+                declared = name
+            label_text = ','.join(f'{k}="{v}"' for k, v in labels)
+            label_text = f'{{{label_text}}}' if label_text else ''
+            lines.append(f'stereo_{name}{label_text} {fn()}')
+        return '\n'.join(lines) + '\n'
+
+    def close(self):
+        if self.exporter is not None:
+            self.exporter.stop()
+            self.exporter = None
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+            self._csv = None
+
+
+class MetricsExporter:
+    """
+    Publishes FrameMetrics as Prometheus text: periodically rewritten file
+    (atomic rename, suitable for the node_exporter textfile collector) and/or
+    a local HTTP endpoint at /metrics.
+    """
+    def __init__(self, metrics, prometheus_file=None, http_port=None, interval=1.0):
+        self.metrics = metrics
+        self.prometheus_file = prometheus_file
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+        if http_port:
+            self._server = ThreadingHTTPServer(('127.0.0.1', http_port), self._handler())
+            self._server.daemon_threads = True
+
+    def _handler(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def write_file(self):
+        tmp = f'{self.prometheus_file}.tmp'
+        with open(tmp, 'w') as f:
+            f.write(self.metrics.render_prometheus())
+        os.replace(tmp, self.prometheus_file)
+
+    def _run_file(self):
+        while not self._stop.wait(self.interval):
+            self.write_file()
+
+    def start(self):
+        if self._server is not None:
+            threading.Thread(target=self._server.serve_forever, name='metrics-http',
+                             daemon=True).start()
+        if self.prometheus_file:
+            self._thread = threading.Thread(target=self._run_file, name='metrics-file',
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1.0)
+            self.write_file()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+def create_metrics(config=None):
+    """
+    Build FrameMetrics with its exporters from METRICS_CONFIG.
+
+    Returns None when metrics are disabled, so callers skip every timing call.
+    """
+    config = config or METRICS_CONFIG
+    if not config['enabled']:
+        return None
+    metrics = FrameMetrics(config['window'], config['buckets_ms'], config['csv_path'],
+                           overlay=config['overlay'])
+    if config['prometheus_file'] or config['http_port']:
+        metrics.exporter = MetricsExporter(metrics, config['prometheus_file'],
+                                           config['http_port'], config['export_interval'])
+        metrics.exporter.start()
+    return metrics
@@ -0,0 +1,46 @@
+"""Startup phase timing"""
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """Collects the duration of named startup phases and prints a breakdown"""
+    def __init__(self, origin=None):
+        """
+        Args:
+            origin: time.perf_counter() value treated as process start
+        """
+        self.origin = time.perf_counter() if origin is None else origin
+        self.phases = OrderedDict()
+        self._lock = threading.Lock()
+        self.reported = False
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.phases[name] = seconds
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as one phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def mark(self, name):
+        """Record the time elapsed since origin, e.g. for first-frame latency"""
+        self.record(name, time.perf_counter() - self.origin)
+
+    def report(self):
+        """Print all phases once"""
+        if self.reported:
+            return
+        self.reported = True
+        with self._lock:
+            phases = list(self.phases.items())
+        print("\n啟動時間:")
+        for name, seconds in phases:
+            print(f"  {name:<16}{seconds * 1000.0:9.1f} ms")
@@ -1,6 +1,8 @@
 """Visualization utilities"""
+import time
 import cv2
 import numpy as np
+from ..config.display_config import DISPLAY_CONFIG
 
 def create_depth_visualization(disparity_normalized, color_image, detections):
     """Create visualization combining depth map and detections"""
@@ -20,6 +22,85 @@ def show_images(left_ir, right_ir, depth_vis, window_name='Depth Measurement'):
     cv2.imshow('Right IR', right_ir)
     cv2.imshow(window_name, depth_vis)
 
+def make_colormap_lut(name='JET'):
+    """256-entry BGR lookup table for cv2.applyColorMap"""
+    ramp = np.arange(256, dtype=np.uint8).reshape(256, 1)
+    return cv2.applyColorMap(ramp, getattr(cv2, f'COLORMAP_{name.upper()}'))
+
+class FrameRenderer:
+    """
+    Rate-limited display of the color image next to the colorized disparity.
+
+    All output images are allocated once and every OpenCV call writes into
+    them with dst=. Disparity is mapped to colors over the fixed matcher range
+    [min_disparity, min_disparity + num_disparities) instead of a per-frame
+    min/max normalization, so colors are stable and no normalization pass runs.
+    """
+    def __init__(self, min_disparity, num_disparities, window_name='Depth Measurement',
+                 fps=None, scale=None, show_ir=None, colormap=None, enabled=None):
+        self.window_name = window_name
+        self.enabled = DISPLAY_CONFIG['enabled'] if enabled is None else enabled
+        fps = DISPLAY_CONFIG['fps'] if fps is None else fps
+        self.interval = 1.0 / fps if fps else 0.0
+        self.scale = scale or DISPLAY_CONFIG['scale']
+        self.show_ir = DISPLAY_CONFIG['show_ir'] if show_ir is None else show_ir
+        self.lut = make_colormap_lut(colormap or DISPLAY_CONFIG['colormap'])
+        self.alpha = 255.0 / num_disparities
+        self.beta = -min_disparity * self.alpha
+        self._next_time = 0.0
+        self._shape = None
+        self.frames_shown = 0
+
+    def _allocate(self, height, width):
+        self._shape = (height, width)
+        scaled = (int(round(height * self.scale)), int(round(width * self.scale)))
+        self.canvas = np.empty((height, 2 * width, 3), dtype=np.uint8)
+        self.color_view = self.canvas[:, :width]
+        self.depth_view = self.canvas[:, width:]
+        self.depth_u8 = np.empty((height, width), dtype=np.uint8)
+        self.canvas_scaled = np.empty((scaled[0], 2 * scaled[1], 3), dtype=np.uint8)
+        self.left_scaled = np.empty(scaled, dtype=np.uint8)
+        self.right_scaled = np.empty(scaled, dtype=np.uint8)
+
+    def due(self):
+        """True when the display rate allows showing the current frame"""
+        if not self.enabled:
+            return False
+        now = time.perf_counter()
+        if now < self._next_time:
+            return False
+        # Schedule from now rather than the previous slot so a stall does not cause a burst
+        self._next_time = now + self.interval
+        return True
+
+    def begin(self, color_image):
+        """Copy the color image into the canvas and return the view to draw on"""
+        height, width = color_image.shape[:2]
+        if self._shape != (height, width):
+            self._allocate(height, width)
+        np.copyto(self.color_view, color_image)
+        return self.color_view
+
+    def compose(self, disparity):
+        """Colorize the disparity next to the drawn color view and scale the canvas"""
+        cv2.convertScaleAbs(disparity, dst=self.depth_u8, alpha=self.alpha, beta=self.beta)
+        cv2.applyColorMap(self.depth_u8, self.lut, dst=self.depth_view)
+        size = (self.canvas_scaled.shape[1], self.canvas_scaled.shape[0])
+        cv2.resize(self.canvas, size, dst=self.canvas_scaled, interpolation=cv2.INTER_AREA)
+        return self.canvas_scaled
+
+    def finish(self, disparity, left_ir=None, right_ir=None):
+        """Compose the canvas and show it, plus the scaled IR images if enabled"""
+        cv2.imshow(self.window_name, self.compose(disparity))
+        if self.show_ir and left_ir is not None and right_ir is not None:
+            size = (self.left_scaled.shape[1], self.left_scaled.shape[0])
+            cv2.resize(left_ir, size, dst=self.left_scaled, interpolation=cv2.INTER_AREA)
+            cv2.resize(right_ir, size, dst=self.right_scaled, interpolation=cv2.INTER_AREA)
+            cv2.imshow('Left IR', self.left_scaled)
+            cv2.imshow('Right IR', self.right_scaled)
+        self.frames_shown += 1
+        return self.canvas_scaled
+
 def draw_text_info(image, text, position=(30, 30)):
     """Draw text information on image"""
     cv2.putText(
@@ -30,4 +111,17 @@ def draw_text_info(image, text, position=(30, 30)):
         1,
         (0, 255, 0),
         2
-    )
\ No newline at end of file
+    )
+
+def draw_metrics_overlay(image, summary, position=(10, 20)):
+    """Draw FPS, end-to-end latency and per-stage median times from FrameMetrics.summary()"""
+    lines = [
+        f"FPS {summary['fps']:.1f}  latency p50 {summary['latency_p50_ms']:.1f} ms"
+        f"  p95 {summary['latency_p95_ms']:.1f} ms"
+    ]
+    lines.extend(f"{stage} {ms:.1f} ms" for stage, ms in summary['stage_p50_ms'].items())
+    x, y = position
+    for line in lines:
+        cv2.putText(image, line, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 0, 0), 3)
+        cv2.putText(image, line, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 255), 1)
+        y += 18